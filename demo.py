@@ -5,6 +5,7 @@ Runs all 5 test cases through the pipeline.
 
 import asyncio
 import sys
+from qualifyai.llm_client import get_client_manager
 from qualifyai.stages import Stage1, Stage2, Stage3
 from qualifyai.pipeline import LeadQualifyPipeline
 from qualifyai.test_cases import TEST_CASES
@@ -59,18 +60,24 @@ async def run_all_cases():
 
 async def main():
     """Main entry point."""
-    if len(sys.argv) > 1:
-        # Run specific case
-        case_name = sys.argv[1]
-        if case_name in TEST_CASES:
-            case = TEST_CASES[case_name]
-            await run_single_case(case_name, case["data"], case["expected"])
+    manager = get_client_manager()
+    await manager.warmup()
+
+    try:
+        if len(sys.argv) > 1:
+            # Run specific case
+            case_name = sys.argv[1]
+            if case_name in TEST_CASES:
+                case = TEST_CASES[case_name]
+                await run_single_case(case_name, case["data"], case["expected"])
+            else:
+                print(f"Unknown case: {case_name}")
+                print(f"Available: {', '.join(TEST_CASES.keys())}")
         else:
-            print(f"Unknown case: {case_name}")
-            print(f"Available: {', '.join(TEST_CASES.keys())}")
-    else:
-        # Run all cases
-        await run_all_cases()
+            # Run all cases
+            await run_all_cases()
+    finally:
+        await manager.aclose()
 
 
 if __name__ == "__main__":
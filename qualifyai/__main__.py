@@ -0,0 +1,257 @@
+"""
+Command line entry point.
+
+    python -m qualifyai run leads.csv -o results.jsonl --concurrency 20
+    python -m qualifyai batch leads.csv --job-dir jobs/nightly -o results.jsonl
+    python -m qualifyai trace-summary traces/spans.jsonl
+    python -m qualifyai mock-server --port 8089 --latency-ms 300
+    python -m qualifyai generate 1000000 -o leads.jsonl.gz --seed 7 --duplicate-rate 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import yaml
+from .batch_jobs import BatchQualifier, LocalBatchBackend, OpenAIBatchBackend
+from .lead_generator import LeadGenerator
+from .lead_io import FORMATS, LeadWriter, ResultWriter, SkippedRows, iter_leads
+from .metrics import serve_metrics
+from .mock_server import MockLLMServer
+from .llm_client import enable_tracing, get_client_manager, use_cassette
+from .microbatch import enable_micro_batching
+from .models import Lead
+from .pipeline import SPECULATION_POLICIES, LeadQualifyPipeline, has_pending_reasoning, resolve_reasoning
+from .stages import Stage1, Stage2, Stage3
+from .tracing import summarize_spans
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m qualifyai", description="QualifyAI lead qualification")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Qualify leads from a CSV / JSONL file (optionally .gz)")
+    run.add_argument("input", help="Input file, or - for JSONL on stdin")
+    run.add_argument("-o", "--output", default="-", help="Output file (.jsonl / .csv, optionally .gz); default stdout")
+    run.add_argument("--input-format", choices=FORMATS, help="Override format detection for the input")
+    run.add_argument("--output-format", choices=FORMATS, help="Override format detection for the output")
+    run.add_argument("-c", "--concurrency", type=int, default=10, help="Leads in flight at once (default 10)")
+    run.add_argument("--ordered", action="store_true", help="Write results in input order")
+    run.add_argument("--speculation", choices=SPECULATION_POLICIES, default="never")
+    run.add_argument("--speculation-min-deal-size", type=int, default=0)
+    run.add_argument("--deadline", type=float, help="Seconds each lead may take; slower leads are reported as TIMEOUT")
+    run.add_argument("--fused", action="store_true", help="One combined LLM request per stage for its LLM agents")
+    run.add_argument("--decision-only", action="store_true",
+                     help="LLM agents return only a score; narratives are generated for QUALIFIED leads only")
+    run.add_argument("--stream-playbook", action="store_true",
+                     help="Decide Stage 3 as soon as the strategy score streams in; playbooks finish in the background")
+    run.add_argument("--parallel-playbook", action="store_true",
+                     help="Write strategy playbooks one section per request, all sections at once")
+    run.add_argument("--micro-batch", action="store_true",
+                     help="Score several leads per ICP / Market Intelligence request (see micro_batch: in config.yml)")
+    run.add_argument("--micro-batch-size", type=int, help="Leads per micro-batched request")
+    run.add_argument("--trace", nargs="?", const="", metavar="PATH",
+                     help="Record lead / stage / agent / LLM spans to JSONL (default path from tracing: in config.yml)")
+    run.add_argument("--record", metavar="CASSETTE", help="Record every LLM response to this cassette file")
+    run.add_argument("--replay", metavar="CASSETTE",
+                     help="Answer LLM requests from this cassette file (no API calls; a missing request is an error)")
+    run.add_argument("--metrics-port", type=int,
+                     help="Serve Prometheus metrics at http://127.0.0.1:PORT/metrics during the run")
+    run.add_argument("--progress-every", type=int, default=1000, help="Print progress to stderr every N leads (0 = off)")
+
+    batch = commands.add_parser("batch", help="Qualify leads as a resumable offline batch job")
+    batch.add_argument("input", nargs="?", help="Input file (omit to resume the job in --job-dir)")
+    batch.add_argument("--job-dir", required=True, help="Directory holding the job state")
+    batch.add_argument("-o", "--output", default="-", help="Output file (.jsonl / .csv, optionally .gz); default stdout")
+    batch.add_argument("--input-format", choices=FORMATS, help="Override format detection for the input")
+    batch.add_argument("--output-format", choices=FORMATS, help="Override format detection for the output")
+    batch.add_argument("--backend", choices=["openai", "local"], default="openai",
+                       help="openai = Batch API; local = file-based stand-in (canned answers)")
+    batch.add_argument("--poll-interval", type=float, default=60.0, help="Seconds between status checks")
+
+    trace_summary = commands.add_parser("trace-summary", help="Critical-path breakdown of a span trace file")
+    trace_summary.add_argument("path", help="JSONL span file written with run --trace")
+
+    mock = commands.add_parser("mock-server", help="Local OpenAI-compatible stand-in (set llm.base_url to use it)")
+    mock.add_argument("--host", default="127.0.0.1")
+    mock.add_argument("--port", type=int, default=8089)
+    mock.add_argument("--latency-ms", type=float, default=300, help="Median response time")
+    mock.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread of the response time")
+    mock.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 500")
+    mock.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with a 429")
+    mock.add_argument("--seed", type=int)
+
+    generate = commands.add_parser("generate", help="Write seeded synthetic leads (CSV / JSONL, optionally .gz)")
+    generate.add_argument("count", type=int, help="Number of leads")
+    generate.add_argument("-o", "--output", default="-", help="Output file (.jsonl / .csv, optionally .gz); default stdout")
+    generate.add_argument("--output-format", choices=FORMATS, help="Override format detection for the output")
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--duplicate-rate", type=float, default=0.0, help="Share of exact repeats of earlier leads")
+    generate.add_argument("--near-duplicate-rate", type=float, default=0.0,
+                          help="Share of repeats with CRM-style differences (name spelling, rounding, order)")
+    generate.add_argument("--distributions", metavar="FILE",
+                          help="YAML / JSON overrides of lead_generator.DEFAULT_DISTRIBUTIONS by field")
+    return parser
+
+
+async def run_command(args) -> int:
+    """Stream leads through the pipeline and write results as they finish."""
+    stages = [Stage1(fused=args.fused, decision_only=args.decision_only),
+              Stage2(fused=args.fused, decision_only=args.decision_only),
+              Stage3(fused=args.fused, stream_strategy=args.stream_playbook, decision_only=args.decision_only,
+                     parallel_playbook=args.parallel_playbook)]
+    pipeline = LeadQualifyPipeline(
+        stages,
+        verbose=False,
+        speculation=args.speculation,
+        speculation_min_deal_size=args.speculation_min_deal_size,
+        defer_reasoning=args.stream_playbook or args.decision_only,
+        narratives="qualified" if args.decision_only else "all",
+    )
+
+    if args.micro_batch:
+        enable_micro_batching(**({"max_batch_size": args.micro_batch_size} if args.micro_batch_size else {}))
+
+    if args.trace is not None:
+        enable_tracing(args.trace or None)
+    if args.record or args.replay:
+        use_cassette(args.record or args.replay, "record" if args.record else "replay")
+    metrics_server = serve_metrics(args.metrics_port) if args.metrics_port else None
+
+    input_format = args.input_format or ("jsonl" if args.input == "-" else None)
+    in_flight = {}  # index -> lead, only for leads not yet written
+    skipped = SkippedRows(args.input)  # malformed rows: warned about, not qualified
+
+    def leads():
+        for index, lead_data in enumerate(iter_leads(args.input, input_format, on_error=skipped)):
+            lead = Lead.from_dict(lead_data)
+            in_flight[index] = lead
+            yield lead
+
+    manager = get_client_manager()
+    await manager.warmup()
+
+    counts = {}
+    start = time.perf_counter()
+    finishing = set()  # results waiting for their playbook (--stream-playbook)
+    # At most --concurrency of them, so open streams and leads held stay bounded
+    finishing_slots = asyncio.Semaphore(args.concurrency)
+    try:
+        with ResultWriter(args.output, stages, args.output_format) as writer:
+
+            def write(index, result):
+                writer.write(index, in_flight.pop(index), result)
+                counts[result["final_decision"]] = counts.get(result["final_decision"], 0) + 1
+                if args.progress_every and writer.count % args.progress_every == 0:
+                    rate = writer.count / (time.perf_counter() - start)
+                    print(f"{writer.count:,} leads ({rate:.1f}/s)", file=sys.stderr)
+
+            async def write_when_complete(index, result):
+                try:
+                    write(index, await resolve_reasoning(result))
+                finally:
+                    finishing_slots.release()
+
+            async for index, result in pipeline.qualify_iter(leads(), args.concurrency, args.ordered, args.deadline):
+                if has_pending_reasoning(result) and not args.ordered:
+                    # The lead's slot is free already; it is written once its playbook is in.
+                    # Waiting for a free writer slot holds back new leads (backpressure).
+                    await finishing_slots.acquire()
+                    task = asyncio.create_task(write_when_complete(index, result))
+                    finishing.add(task)
+                    task.add_done_callback(finishing.discard)
+                else:
+                    write(index, await resolve_reasoning(result))
+            if finishing:
+                await asyncio.gather(*finishing)
+    finally:
+        await manager.aclose()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+
+    total = sum(counts.values())
+    summary = ", ".join(f"{decision}: {n:,}" for decision, n in sorted(counts.items()))
+    skipped_note = f"; {skipped.count:,} malformed rows skipped" if skipped.count else ""
+    print(f"Done: {total:,} leads in {time.perf_counter() - start:.1f}s ({summary}{skipped_note})", file=sys.stderr)
+    return 0
+
+
+async def batch_command(args) -> int:
+    """Run (or resume) an offline batch job and write its results."""
+    stages = [Stage1(), Stage2(), Stage3()]
+    if args.backend == "local":
+        backend = LocalBatchBackend(os.path.join(args.job_dir, "local_backend"))
+    else:
+        backend = OpenAIBatchBackend()
+
+    leads = None
+    if args.input:
+        leads = list(iter_leads(args.input, args.input_format, on_error=SkippedRows(args.input)))
+    qualifier = BatchQualifier(stages, backend, args.job_dir, poll_interval=args.poll_interval)
+
+    try:
+        results = await qualifier.run(leads)
+    finally:
+        await get_client_manager().aclose()
+
+    leads = qualifier.load_leads()
+    with ResultWriter(args.output, stages, args.output_format) as writer:
+        for index, (lead_data, result) in enumerate(zip(leads, results)):
+            writer.write(index, lead_data, result)
+    print(f"Done: {len(results):,} leads", file=sys.stderr)
+    return 0
+
+
+async def mock_server_command(args) -> int:
+    """Serve the mock chat completions API until interrupted."""
+    server = MockLLMServer(args.latency_ms, args.latency_sigma, args.error_rate, args.rate_limit_rate,
+                           seed=args.seed)
+    base_url = await server.start(args.host, args.port)
+    print(f"Mock OpenAI API at {base_url} (set llm.base_url in cfg/config.yml)", file=sys.stderr)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+        print(f"Served: {server.stats()}", file=sys.stderr)
+    return 0
+
+
+def generate_command(args) -> int:
+    """Stream synthetic leads to a file."""
+    distributions = None
+    if args.distributions:
+        with open(args.distributions) as f:
+            distributions = yaml.safe_load(f)
+    generator = LeadGenerator(args.seed, distributions, args.duplicate_rate, args.near_duplicate_rate)
+    start = time.perf_counter()
+    with LeadWriter(args.output, args.output_format) as writer:
+        for lead in generator.generate(args.count):
+            writer.write(lead)
+    stats = generator.stats()
+    print(f"Done: {stats['generated']:,} leads ({stats['duplicates']:,} duplicates, "
+          f"{stats['near_duplicates']:,} near-duplicates) in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        return asyncio.run(run_command(args))
+    if args.command == "batch":
+        return asyncio.run(batch_command(args))
+    if args.command == "mock-server":
+        try:
+            return asyncio.run(mock_server_command(args))
+        except KeyboardInterrupt:
+            return 0
+    if args.command == "generate":
+        return generate_command(args)
+    if args.command == "trace-summary":
+        print(summarize_spans(args.path))
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,67 @@
 """Agent implementation"""
 
+import asyncio
 import json
-from .llm_client import call_llm
+from . import metrics
+from .cassette import CassetteMissError
+from .jsonstream import JSONFieldStream
+from .llm_client import LLMTimeoutError, call_llm, clear_time_budget, stream_llm
+from .microbatch import get_micro_batcher
+from .models import lower_field
+from .prompts import (ICP_BATCH_TEMPLATE, ICP_DECISION_TEMPLATE, ICP_TEMPLATE, MARKET_INTEL_BATCH_TEMPLATE,
+                      MARKET_INTEL_DECISION_TEMPLATE, MARKET_INTEL_TEMPLATE, STAKEHOLDER_DECISION_TEMPLATE,
+                      STAKEHOLDER_TEMPLATE, STRATEGY_DECISION_TEMPLATE, STRATEGY_SECTION_TEMPLATE, STRATEGY_SECTIONS,
+                      STRATEGY_TEMPLATE)
+
+# Output cap for decision-only requests (a {"score": N} object)
+DECISION_MAX_TOKENS = 20
+
+# Output cap for one section of a parallel playbook
+PLAYBOOK_SECTION_MAX_TOKENS = 300
+
+
+class LazyReasoning:
+    """
+    Narrative that is generated the first time it is awaited (decision-only
+    mode), then shared by every later await.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory  # coroutine function returning the text
+        self._task = None
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    @property
+    def task(self):
+        """The generating task once started, else None."""
+        return self._task
+
+    def __await__(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._factory())
+        return self._task.__await__()
+
 
 class Agent:
     """Base agent class for lead qualification."""
 
+    # True for agents that make a (paid, slow) LLM call; stages run the rest first
+    uses_llm = False
+
+    # PromptTemplate (prompts.py) for LLM agents: static system prefix + lead fields
+    template = None
+    # Multi-lead variant of `template`, for agents whose requests can be micro-batched
+    batch_template = None
+    # Score-only variant of `template`, used in decision-only mode
+    decision_template = None
+
     def __init__(self, name: str):
         self.name = name
+        # LLM agents: ask only for a score, generate the narrative when it is first needed
+        self.decision_only = False
 
     async def evaluate(self, lead_data: dict) -> dict:
         """
@@ -16,6 +70,101 @@ class Agent:
         """
         raise NotImplementedError
 
+    def prompt_values(self, lead_data: dict) -> dict:
+        """Template values computed from the lead rather than read from it."""
+        return {}
+
+    def build_prompt(self, lead_data: dict) -> str:
+        """Lead-specific user message (LLM agents only)."""
+        return self.template.render(lead_data, **self.prompt_values(lead_data))
+
+    def llm_request(self, lead_data: dict) -> dict:
+        """call_llm() keyword arguments for this lead (LLM agents only)."""
+        return {
+            "prompt": self.build_prompt(lead_data),
+            "system_prompt": self.template.system,
+            "json_mode": True,
+            "agent": self.name,
+            "prompt_version": self.template.version
+        }
+
+    def llm_requests(self, lead_data: dict) -> list:
+        """
+        call_llm() keyword arguments of every request evaluate() makes for
+        this lead, including a deferred narrative once it is resolved (LLM
+        agents only). Offline batch jobs submit exactly these.
+        """
+        if self.decision_only:
+            return [self.decision_request(lead_data), self.llm_request(lead_data)]
+        return [self.llm_request(lead_data)]
+
+    async def ask_llm(self, lead_data: dict) -> str:
+        """LLM response text for this lead, micro-batched with other leads when enabled."""
+        batcher = get_micro_batcher() if self.batch_template is not None else None
+        if batcher is not None:
+            return await batcher.submit(self, lead_data)
+        return await call_llm(**self.llm_request(lead_data))
+
+    def decision_request(self, lead_data: dict) -> dict:
+        """call_llm() keyword arguments for a score-only request."""
+        return {
+            "prompt": self.decision_template.render(lead_data, **self.prompt_values(lead_data)),
+            "system_prompt": self.decision_template.system,
+            "json_mode": True,
+            "agent": f"{self.name} (decision)",
+            "prompt_version": self.decision_template.version,
+            "max_tokens": DECISION_MAX_TOKENS
+        }
+
+    def error_result(self, error: Exception) -> dict:
+        """
+        Fallback result (score 50, REJECT) for an LLM answer that could not be
+        used. A request missing from a replayed cassette is raised instead: a
+        replay run must not turn into silently different scores.
+        """
+        if isinstance(error, CassetteMissError):
+            raise error
+        if isinstance(error, (ValueError, KeyError, TypeError)):
+            metrics.ERRORS.inc("parse_failure")  # malformed JSON or a missing / non-numeric score
+        metrics.ERRORS.inc("fallback_50")
+        return {
+            "agent": self.name,
+            "score": 50,
+            "reasoning": f"Error during evaluation: {str(error)}",
+            "recommendation": "REJECT"
+        }
+
+    async def evaluate_decision_only(self, lead_data: dict) -> dict:
+        """
+        Score from a short score-only request. "reasoning" is None and
+        "reasoning_pending" is a LazyReasoning that runs the full prompt when
+        awaited (see pipeline.resolve_reasoning).
+        """
+        try:
+            response = await call_llm(**self.decision_request(lead_data))
+            score = min(json.loads(response)["score"], 100)
+        except LLMTimeoutError:
+            raise
+        except Exception as e:
+            return self.error_result(e)
+
+        return {
+            "agent": self.name,
+            "score": score,
+            "reasoning": None,
+            "reasoning_pending": LazyReasoning(lambda: self.narrative(lead_data)),
+            "recommendation": "PROCEED" if score >= 70 else "REJECT"
+        }
+
+    async def narrative(self, lead_data: dict) -> str:
+        """The full prompt's reasoning text (the score already came from the decision request)."""
+        clear_time_budget()  # generated after the decision, outside the lead's deadline
+        try:
+            result = json.loads(await call_llm(**self.llm_request(lead_data)))
+            return result.get("reasoning", "Analysis completed")
+        except Exception as e:
+            return f"Reasoning unavailable: {str(e)}"
+
 
 # Stage 1: Fit Assessment Agents
 class ICPAgent(Agent):
@@ -25,38 +174,23 @@ class ICPAgent(Agent):
     Uses LLM (OpenAI API).
     """
 
+    uses_llm = True
+
+    template = ICP_TEMPLATE
+    decision_template = ICP_DECISION_TEMPLATE
+    batch_template = ICP_BATCH_TEMPLATE
+
     def __init__(self):
         super().__init__("ICP Agent")
 
     async def evaluate(self, lead_data: dict) -> dict:
         """Evaluate if lead matches ideal customer profile."""
 
-        prompt = f"""Analyze this lead against our Ideal Customer Profile (ICP).
-
-Our ICP:
-- Target Industries: B2B SaaS, Technology, FinTech, Enterprise Software
-- Company Size: 100-5,000 employees
-- Annual Revenue: $10M+
-
-Lead Information:
-- Company: {lead_data.get('company_name', 'Unknown')}
-- Industry: {lead_data.get('industry', 'Unknown')}
-- Employee Count: {lead_data.get('employee_count', 'Unknown')}
-- Annual Revenue: ${lead_data.get('annual_revenue', 'Unknown')}
-
-Score guidelines:
-- 90-100: Perfect ICP match
-- 70-89: Good fit with minor gaps
-- 50-69: Moderate fit, some concerns
-- Below 50: Poor fit
-
-Return valid JSON with exactly these fields:
-- score: number (0-100)
-- reasoning: string (explanation of fit assessment)
-- recommendation: string (PROCEED or REJECT)"""
+        if self.decision_only:
+            return await self.evaluate_decision_only(lead_data)
 
         try:
-            response = await call_llm(prompt, json_mode=True)
+            response = await self.ask_llm(lead_data)
             result = json.loads(response)
             return {
                 "agent": self.name,
@@ -64,13 +198,10 @@ Return valid JSON with exactly these fields:
                 "reasoning": result.get("reasoning", "Analysis completed"),
                 "recommendation": result.get("recommendation", "PROCEED" if result.get("score", 0) >= 70 else "REJECT")
             }
+        except LLMTimeoutError:
+            raise  # reported by the pipeline as a timeout, not as a low score
         except Exception as e:
-            return {
-                "agent": self.name,
-                "score": 50,
-                "reasoning": f"Error during evaluation: {str(e)}",
-                "recommendation": "REJECT"
-            }
+            return self.error_result(e)
 
 
 class BudgetAgent(Agent):
@@ -104,7 +235,7 @@ class BudgetAgent(Agent):
             reasons.append("No budget information provided")
 
         # Check funding stage
-        funding = lead_data.get("funding_stage", "").lower()
+        funding = lower_field(lead_data, "funding_stage")
         if funding in ["series c", "series d", "ipo"]:
             score += 20
             reasons.append(f"Strong funding stage: {funding}")
@@ -134,45 +265,23 @@ class MarketIntelAgent(Agent):
     Uses LLM (OpenAI API).
     """
 
+    uses_llm = True
+
+    template = MARKET_INTEL_TEMPLATE
+    decision_template = MARKET_INTEL_DECISION_TEMPLATE
+    batch_template = MARKET_INTEL_BATCH_TEMPLATE
+
     def __init__(self):
         super().__init__("Market Intelligence Agent")
 
     async def evaluate(self, lead_data: dict) -> dict:
         """Analyze market position."""
 
-        prompt = f"""Evaluate this prospect's market fit. Score each criterion and sum for total.
-
-PROSPECT DATA:
-- Industry: {lead_data.get('industry', 'Unknown')}
-- Growth Rate: {lead_data.get('growth_rate', 'Unknown')}
-- Market Position: {lead_data.get('market_position', 'Unknown')}
-
-Scoring sheet (max 100 points):
-
-1. INDUSTRY ALIGNMENT (0-40 points):
-   - Exact match (B2B SaaS, Technology, FinTech, Enterprise Software): 40 pts
-   - Related tech industry (Healthcare Tech, EdTech, etc.): 25 pts
-   - Non-tech but uses software heavily: 15 pts
-   - Non-tech/traditional industry: 0 pts
-
-2. GROWTH RATE (0-35 points):
-   - 15%+ YoY growth: 35 pts
-   - 10-14% YoY growth: 25 pts
-   - 5-9% YoY growth: 15 pts
-   - Below 5% or flat/declining: 0 pts
-
-3. MARKET POSITION (0-25 points):
-   - Market leader or dominant player: 25 pts
-   - Strong challenger or fast-growing: 20 pts
-   - Established mid-market player: 15 pts
-   - Small/local/niche player: 5 pts
-
-Return valid JSON with exactly these fields:
-- score: number (0-100, sum of all criteria)
-- reasoning: string (narrative analysis starting with "After analyzing the market landscape..." and include points for each criterion)"""
+        if self.decision_only:
+            return await self.evaluate_decision_only(lead_data)
 
         try:
-            response = await call_llm(prompt, json_mode=True)
+            response = await self.ask_llm(lead_data)
             result = json.loads(response)
             score = min(result.get("score", 50), 100)
             recommendation = "PROCEED" if score >= 70 else "REJECT"
@@ -183,13 +292,10 @@ Return valid JSON with exactly these fields:
                 "reasoning": result.get("reasoning", "Analysis completed"),
                 "recommendation": recommendation
             }
+        except LLMTimeoutError:
+            raise  # reported by the pipeline as a timeout, not as a low score
         except Exception as e:
-            return {
-                "agent": self.name,
-                "score": 50,
-                "reasoning": f"Error during evaluation: {str(e)}",
-                "recommendation": "REJECT"
-            }
+            return self.error_result(e)
 
 
 # Stage 2: Win Probability Assessment Agents
@@ -224,8 +330,8 @@ class CompetitionAgent(Agent):
             reasons.append(f"Multiple competitors ({num_competitors}): {', '.join(competitors)}")
 
         # Check current solution and satisfaction
-        current_solution = lead_data.get("current_solution", "").lower()
-        satisfaction = lead_data.get("satisfaction_with_current", "").lower()
+        current_solution = lower_field(lead_data, "current_solution")
+        satisfaction = lower_field(lead_data, "satisfaction_with_current")
 
         if not current_solution or current_solution == "none":
             score += 15
@@ -243,7 +349,7 @@ class CompetitionAgent(Agent):
                 reasons.append(f"Happy with {lead_data.get('current_solution')}. Hard to displace")
 
         # Check our competitive advantage
-        our_advantage = lead_data.get("our_advantage", "").lower()
+        our_advantage = lower_field(lead_data, "our_advantage")
         if "strong" in our_advantage or "unique" in our_advantage:
             score += 15
             reasons.append(f"Strong differentiation: {lead_data.get('our_advantage')}")
@@ -271,48 +377,22 @@ class StakeholderAgent(Agent):
     Uses LLM (OpenAI API).
     """
 
+    uses_llm = True
+
+    template = STAKEHOLDER_TEMPLATE
+    decision_template = STAKEHOLDER_DECISION_TEMPLATE
+
     def __init__(self):
         super().__init__("Stakeholder Agent")
 
     async def evaluate(self, lead_data: dict) -> dict:
         """Analyze stakeholder dynamics and champion strength."""
 
-        prompt = f"""Analyze the stakeholder dynamics for this deal. Score each criterion and sum for total.
-
-STAKEHOLDER DATA:
-- Decision Maker: {lead_data.get('decision_maker', 'Unknown')}
-- Decision Maker Title: {lead_data.get('decision_maker_title', 'Unknown')}
-- Champion: {lead_data.get('champion', 'None')}
-- Champion Title: {lead_data.get('champion_title', 'Unknown')}
-- Champion Engagement: {lead_data.get('champion_engagement', 'Unknown')}
-- Known Blockers: {lead_data.get('blockers', 'None')}
-
-SCORING RUBRIC (max 100 points):
-
-1. CHAMPION STRENGTH (0-40 points):
-   - Strong champion with budget authority: 40 pts
-   - Engaged champion without direct authority: 30 pts
-   - Weak or passive champion: 15 pts
-   - No identified champion: 0 pts
-
-2. DECISION MAKER ACCESS (0-40 points):
-   - Direct access to final decision maker: 40 pts
-   - Access through champion: 30 pts
-   - Indirect access only: 15 pts
-   - No access identified: 0 pts
-
-3. BLOCKER RISK (0-20 points):
-   - No known blockers: 20 pts
-   - Minor blockers (can be managed): 10 pts
-   - Significant blockers present: 5 pts
-   - Strong opposition identified: 0 pts
-
-Return valid JSON with exactly these fields:
-- score: number (0-100, sum of all criteria)
-- reasoning: string (narrative stakeholder mapping starting with "Stakeholder mapping reveals the following key players:" then describe PRIMARY DECISION MAKER, CHAMPION, any BLOCKERS)"""
+        if self.decision_only:
+            return await self.evaluate_decision_only(lead_data)
 
         try:
-            response = await call_llm(prompt, json_mode=True)
+            response = await self.ask_llm(lead_data)
             result = json.loads(response)
             score = min(result.get("score", 50), 100)
             recommendation = "PROCEED" if score >= 70 else "REJECT"
@@ -323,13 +403,10 @@ Return valid JSON with exactly these fields:
                 "reasoning": result.get("reasoning", "Analysis completed"),
                 "recommendation": recommendation
             }
+        except LLMTimeoutError:
+            raise  # reported by the pipeline as a timeout, not as a low score
         except Exception as e:
-            return {
-                "agent": self.name,
-                "score": 50,
-                "reasoning": f"Error during evaluation: {str(e)}",
-                "recommendation": "REJECT"
-            }
+            return self.error_result(e)
 
 
 class TechnicalFitAgent(Agent):
@@ -369,7 +446,7 @@ class TechnicalFitAgent(Agent):
             reasons.append("No tech stack alignment identified")
 
         # integration complexity
-        complexity = lead_data.get("integration_complexity", "").lower()
+        complexity = lower_field(lead_data, "integration_complexity")
         if complexity == "low":
             score += 20
             reasons.append("Low integration complexity - quick deployment expected")
@@ -381,7 +458,7 @@ class TechnicalFitAgent(Agent):
             reasons.append("High integration complexity - significant customization needed")
 
         # Check for specific requirements
-        requirements = lead_data.get("technical_requirements", "").lower()
+        requirements = lower_field(lead_data, "technical_requirements")
         if "security" in requirements or "compliance" in requirements:
             score += 10
             reasons.append("Security/compliance focus aligns with our strengths")
@@ -435,7 +512,7 @@ class RiskAgent(Agent):
             concerns.append("Existing relationship with competitor")
 
         # Check timeline pressure
-        timeline = lead_data.get("timeline", "").lower()
+        timeline = lower_field(lead_data, "timeline")
         if "urgent" in timeline or "asap" in timeline:
             risk_score += 15
             concerns.append("Urgent timeline may lead to rushed decision")
@@ -501,7 +578,7 @@ class ResourceAgent(Agent):
             reasons.append("Mid-size deal needs senior SE support")
 
         # Check implementation complexity
-        complexity = lead_data.get("implementation_complexity", "").lower()
+        complexity = lower_field(lead_data, "implementation_complexity")
         if complexity == "high":
             score -= 20
             resource_requirements.append("Implementation team lead")
@@ -515,7 +592,7 @@ class ResourceAgent(Agent):
             reasons.append("Low complexity - standard resources sufficient")
 
         # Check timeline pressure
-        timeline = lead_data.get("timeline", "").lower()
+        timeline = lower_field(lead_data, "timeline")
         if "urgent" in timeline or "asap" in timeline:
             score -= 15
             resource_requirements.append("Fast-track implementation team")
@@ -545,62 +622,51 @@ class StrategyAgent(Agent):
     Uses LLM (OpenAI API)
     """
 
-    def __init__(self):
-        super().__init__("Strategy Agent")
+    uses_llm = True
 
-    async def evaluate(self, lead_data: dict) -> dict:
-        """Develop closing strategy and action plan."""
+    template = STRATEGY_TEMPLATE
+    decision_template = STRATEGY_DECISION_TEMPLATE
+
+    def __init__(self, stream: bool = False, parallel_playbook: bool = False):
+        super().__init__("Strategy Agent")
+        # Stream the response: return once the score is in, finish the playbook in the background
+        self.stream = stream
+        # Write the playbook one section per request, all sections at once (takes precedence over stream)
+        self.parallel_playbook = parallel_playbook
 
+    def prompt_values(self, lead_data: dict) -> dict:
+        """Stakeholders rendered one per line."""
         # Get stakeholders list
         stakeholders = lead_data.get('stakeholders', [])
         stakeholders_str = "\n".join([f"  - {s}" for s in stakeholders]) if stakeholders else "  - Not provided"
 
-        prompt = f"""Develop a strategic closing playbook for this deal.
+        return {"stakeholders_list": stakeholders_str}
 
-DEAL CONTEXT:
-- Company: {lead_data.get('company_name', 'Unknown')}
-- Deal Size: ${lead_data.get('deal_size', 0):,}
-- Timeline: {lead_data.get('timeline', 'Unknown')}
-- Decision Maker: {lead_data.get('decision_maker', 'Unknown')} ({lead_data.get('decision_maker_title', 'Unknown')})
-- Champion: {lead_data.get('champion', 'None')}
-- Blockers: {lead_data.get('blockers', 'None')}
-- Competitors: {lead_data.get('competitors', [])}
-- Key Stakeholders:
-{stakeholders_str}
-
-Generate a playbook with these sections:
-
-EXECUTIVE SUMMARY
-[2-3 sentences describing the opportunity and recommended approach]
-
-PHASE 1: FOUNDATION BUILDING (Weeks 1-2)
-[Describe immediate priorities and champion enablement]
-PRIORITY: [CRITICAL/HIGH/MEDIUM]
-Actions: 1) [specific action], 2) [specific action], 3) [specific action]
-
-PHASE 2: VALUE VALIDATION (Weeks 3-4)
-[Describe pilot/POC approach and success metrics]
-Success metrics: [specific measurable outcomes]
-CONFIDENCE_LEVEL: [High/Medium/Low]
-
-PHASE 3: NEGOTIATION & CLOSE (Weeks 5-6)
-[Describe closing approach and timeline]
+    def llm_requests(self, lead_data: dict) -> list:
+        """
+        Score-only request plus one request per playbook section when
+        parallel_playbook is set (the sections are only sent for a passing score).
+        """
+        if not self.parallel_playbook:
+            return super().llm_requests(lead_data)
+        return [self.decision_request(lead_data)] + [
+            self.section_request(lead_data, section) for section, _ in STRATEGY_SECTIONS
+        ]
 
-RISKS: [Key risks that could derail the deal]
+    async def evaluate(self, lead_data: dict) -> dict:
+        """Develop closing strategy and action plan."""
 
-RECOMMENDED NEXT STEPS: [1] [action with deadline (weeks / months)], [2] [action with deadline], [3] [action with deadline]
+        if self.decision_only:
+            return await self.evaluate_decision_only(lead_data)
 
-SCORING GUIDE:
-- Clear path to decision maker (35 pts): Do we have access?
-- Addressable blockers (35 pts): Can concerns be overcome?
-- Realistic timeline (30 pts): Is the timeline achievable?
+        if self.parallel_playbook:
+            return await self._evaluate_parallel(lead_data)
 
-Return valid JSON with exactly these fields:
-- score: number (0-100, sum based on scoring guide)
-- reasoning: string (full playbook following the format above)"""
+        if self.stream:
+            return await self._evaluate_streaming(lead_data)
 
         try:
-            response = await call_llm(prompt, json_mode=True)
+            response = await self.ask_llm(lead_data)
             result = json.loads(response)
             score = min(result.get("score", 50), 100)
             recommendation = "PROCEED" if score >= 70 else "REJECT"
@@ -611,10 +677,122 @@ Return valid JSON with exactly these fields:
                 "reasoning": result.get("reasoning", "Analysis completed"),
                 "recommendation": recommendation
             }
+        except LLMTimeoutError:
+            raise  # reported by the pipeline as a timeout, not as a low score
+        except Exception as e:
+            return self.error_result(e)
+
+    async def _evaluate_streaming(self, lead_data: dict) -> dict:
+        """
+        Result as soon as the streamed JSON has its score. The playbook is
+        still being generated: the result's "reasoning" is None and
+        "reasoning_pending" is a task that returns it (see
+        pipeline.resolve_reasoning).
+        """
+        chunks = stream_llm(**self.llm_request(lead_data))
+        parser = JSONFieldStream()
+        handed_off = False  # the rest of the stream now belongs to _finish_playbook
+        try:
+            try:
+                async for chunk in chunks:
+                    parser.feed(chunk)
+                    if "score" in parser.fields:
+                        break
+                score = parser.fields.get("score")
+                if not isinstance(score, (int, float)):
+                    raise ValueError("No score in the strategy response")
+            except LLMTimeoutError:
+                raise
+            except Exception as e:
+                return self.error_result(e)
+
+            score = min(score, 100)
+            pending = asyncio.ensure_future(_finish_playbook(chunks, parser))
+            handed_off = True
+            return {
+                "agent": self.name,
+                "score": score,
+                "reasoning": None,
+                "reasoning_pending": pending,
+                "recommendation": "PROCEED" if score >= 70 else "REJECT"
+            }
+        finally:
+            if not handed_off:
+                await chunks.aclose()  # timeout, error or cancellation: free the HTTP stream now
+
+    async def _evaluate_parallel(self, lead_data: dict) -> dict:
+        """
+        Score from the score-only request, then, if it passes, the playbook
+        sections written concurrently; the result has the same shape as
+        evaluate(). A rejected lead gets no playbook (and no section requests).
+        """
+        try:
+            response = await call_llm(**self.decision_request(lead_data))
+            score = min(json.loads(response)["score"], 100)
+        except LLMTimeoutError:
+            raise
         except Exception as e:
+            return self.error_result(e)
+
+        if score < 70:
             return {
                 "agent": self.name,
-                "score": 50,
-                "reasoning": f"Error during evaluation: {str(e)}",
+                "score": score,
+                "reasoning": f"Strategy score {score} < 70; no closing playbook written.",
                 "recommendation": "REJECT"
             }
+        return {
+            "agent": self.name,
+            "score": score,
+            "reasoning": await self.playbook(lead_data),
+            "recommendation": "PROCEED"
+        }
+
+    async def narrative(self, lead_data: dict) -> str:
+        """Playbook for decision-only mode, written section by section when parallel_playbook is set."""
+        if not self.parallel_playbook:
+            return await super().narrative(lead_data)
+        clear_time_budget()  # generated after the decision, outside the lead's deadline
+        return await self.playbook(lead_data)
+
+    async def playbook(self, lead_data: dict) -> str:
+        """
+        Closing playbook with each section from its own (shorter) request, all
+        sent at once. The requests differ only in the section they ask for, so
+        the provider can reuse the cached prompt prefix across them.
+        """
+        sections = await asyncio.gather(*[
+            self._playbook_section(lead_data, section) for section, _ in STRATEGY_SECTIONS
+        ])
+        return "\n\n".join(sections)
+
+    def section_request(self, lead_data: dict, section: str) -> dict:
+        """call_llm() keyword arguments for one playbook section."""
+        template = STRATEGY_SECTION_TEMPLATE
+        return {
+            "prompt": template.render(lead_data, section=section, **self.prompt_values(lead_data)),
+            "system_prompt": template.system,
+            "agent": f"{self.name} (playbook)",
+            "prompt_version": template.version,
+            "max_tokens": PLAYBOOK_SECTION_MAX_TOKENS
+        }
+
+    async def _playbook_section(self, lead_data: dict, section: str) -> str:
+        try:
+            text = await call_llm(**self.section_request(lead_data, section))
+        except LLMTimeoutError:
+            raise
+        except Exception as e:
+            return f"{section}: unavailable ({str(e)})"
+        return text.strip()
+
+
+async def _finish_playbook(chunks, parser: JSONFieldStream) -> str:
+    """Read the rest of a streamed strategy response; return its playbook text."""
+    clear_time_budget()  # the decision is already made; the playbook is not on the deadline
+    try:
+        async for chunk in chunks:
+            parser.feed(chunk)
+    except Exception as e:
+        return f"Playbook incomplete: {str(e)}"
+    return parser.fields.get("reasoning", "Analysis completed")
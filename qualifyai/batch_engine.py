@@ -0,0 +1,209 @@
+"""
+Vectorized batch engine for the rule-based agents.
+Scores BudgetAgent, CompetitionAgent, TechnicalFitAgent, RiskAgent and
+ResourceAgent for a whole batch of leads with NumPy array operations.
+Scores and risk levels are identical to the per-lead agents (no reasoning text).
+"""
+
+import numpy as np
+from .agents import TechnicalFitAgent
+from .models import LeadBatch
+
+# Fields the rule-based agents read, with the defaults they use
+NUMERIC_FIELDS = {"budget": 0, "deal_size": 0}
+TEXT_FIELDS = [
+    "funding_stage", "current_solution", "satisfaction_with_current", "our_advantage",
+    "integration_complexity", "technical_requirements", "timeline", "implementation_complexity",
+]
+FLAG_FIELDS = {"budget_freeze": False, "recent_layoffs": False, "competitor_relationship": False, "has_champion": True}
+LIST_FIELDS = ["competitors", "tech_stack"]
+
+
+def to_columns(leads: list) -> dict:
+    """
+    Convert lead dicts to the columnar form used by RuleBatchEngine:
+    - numeric -> float64 arrays
+    - text -> (categories, codes): distinct lower-cased values + int32 code per lead
+    - flags -> bool arrays
+    - lists -> (lengths, (categories, codes)) over the flattened lower-cased items
+    """
+    n = len(leads)
+    columns = {}
+    for field, default in NUMERIC_FIELDS.items():
+        columns[field] = np.fromiter((lead.get(field, default) for lead in leads), dtype=np.float64, count=n)
+    for field in TEXT_FIELDS:
+        columns[field] = _factorize((lead.get(field, "").lower() for lead in leads), n)
+    for field, default in FLAG_FIELDS.items():
+        columns[field] = np.fromiter((bool(lead.get(field, default)) for lead in leads), dtype=bool, count=n)
+    for field in LIST_FIELDS:
+        values = [lead.get(field, []) for lead in leads]
+        lengths = np.fromiter((len(v) for v in values), dtype=np.int64, count=n)
+        flat = (str(item).lower() for v in values for item in v)
+        columns[field] = (lengths, _factorize(flat, int(lengths.sum())))
+    return columns
+
+
+def batch_columns(batch: LeadBatch) -> dict:
+    """
+    to_columns() for a LeadBatch, straight from its arrays: the agents'
+    defaults fill missing values and lower-casing runs once per distinct value.
+    """
+    columns = {}
+    for field, default in NUMERIC_FIELDS.items():
+        values = batch.numeric[field]
+        columns[field] = np.where(np.isnan(values), default, values)
+    for field in TEXT_FIELDS:
+        columns[field] = batch.text[field].lowered()
+    for field, default in FLAG_FIELDS.items():
+        values = batch.flags[field]
+        columns[field] = np.where(values < 0, default, values > 0)
+    for field in LIST_FIELDS:
+        lengths, items = batch.lists[field]
+        columns[field] = (np.maximum(lengths, 0).astype(np.int64), items.lowered())
+    return columns
+
+
+def _factorize(values, count: int):
+    """Encode strings as (list of distinct values, int32 codes)."""
+    index = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int32, count=count)
+    return list(index), codes
+
+
+def _lookup(column, predicate) -> np.ndarray:
+    """Apply a str -> bool predicate once per distinct value, then broadcast by code."""
+    categories, codes = column
+    return np.array([predicate(c) for c in categories], dtype=bool)[codes]
+
+
+def _equals(column, value: str) -> np.ndarray:
+    return _lookup(column, lambda v: v == value)
+
+
+def _contains_any(column, needles: list) -> np.ndarray:
+    return _lookup(column, lambda v: any(n in v for n in needles))
+
+
+class RuleBatchEngine:
+    """Scores all five rule-based agents over a batch of leads at once."""
+
+    def evaluate(self, leads) -> dict:
+        """
+        Score a batch given as a LeadBatch, a list of lead dicts, or columns
+        from to_columns().
+
+        Returns arrays (one entry per lead):
+        - budget_score, competition_score, technical_score, risk_score, resource_score (int64)
+        - risk_level ("LOW" / "MEDIUM" / "HIGH")
+        - stage1_reject, stage2_reject, stage3_reject: the rule-based agents alone
+          already reject that stage, whatever the LLM agents score
+        - prescreen_reject: the lead cannot be QUALIFIED
+        """
+        if isinstance(leads, LeadBatch):
+            columns = batch_columns(leads)
+        elif isinstance(leads, dict):
+            columns = leads
+        else:
+            columns = to_columns(leads)
+
+        budget = self.budget_scores(columns)
+        competition = self.competition_scores(columns)
+        technical = self.technical_scores(columns)
+        risk, risk_level = self.risk_scores(columns)
+        resource = self.resource_scores(columns)
+
+        # Same bounds as Stage1/2/3.early_decision with the LLM agents pending
+        stage1_reject = budget < 70
+        stage2_reject = (competition < 60) | (technical < 60) | (competition + technical + 100 < 225)
+        stage3_reject = (risk_level == "HIGH") | (resource < 70)
+
+        return {
+            "budget_score": budget,
+            "competition_score": competition,
+            "technical_score": technical,
+            "risk_score": risk,
+            "risk_level": risk_level,
+            "resource_score": resource,
+            "stage1_reject": stage1_reject,
+            "stage2_reject": stage2_reject,
+            "stage3_reject": stage3_reject,
+            "prescreen_reject": stage1_reject | stage2_reject | stage3_reject,
+        }
+
+    def budget_scores(self, columns: dict) -> np.ndarray:
+        """BudgetAgent scores."""
+        budget = columns["budget"]
+        funding = columns["funding_stage"]
+        score = np.full(len(budget), 50, dtype=np.int64)
+        score += np.select([budget >= 100000, budget >= 50000, budget > 0], [30, 20, 10], 0)
+        score += np.where(_lookup(funding, lambda v: v in ["series c", "series d", "ipo"]), 20,
+                          np.where(_lookup(funding, lambda v: v in ["series a", "series b"]), 10, 0))
+        return np.minimum(score, 100)
+
+    def competition_scores(self, columns: dict) -> np.ndarray:
+        """CompetitionAgent scores."""
+        num_competitors = columns["competitors"][0]
+        current = columns["current_solution"]
+        satisfaction = columns["satisfaction_with_current"]
+        advantage = columns["our_advantage"]
+
+        score = np.full(len(num_competitors), 70, dtype=np.int64)
+        score += np.select([num_competitors == 0, num_competitors == 1], [20, 5], -10)
+
+        no_solution = _lookup(current, lambda v: not v or v == "none")
+        satisfaction_delta = np.select(
+            [_equals(satisfaction, "low"), _equals(satisfaction, "medium"), _equals(satisfaction, "high")],
+            [10, -5, -20], 0
+        )
+        score += np.where(no_solution, 15, satisfaction_delta)
+
+        strong = _contains_any(advantage, ["strong", "unique"])
+        some = _lookup(advantage, bool)
+        score += np.where(strong, 15, np.where(some, 5, 0))
+        return np.clip(score, 0, 100)
+
+    def technical_scores(self, columns: dict) -> np.ndarray:
+        """TechnicalFitAgent scores."""
+        lengths, flat = columns["tech_stack"]
+        n = len(lengths)
+        is_match = _lookup(flat, lambda v: v in TechnicalFitAgent.COMPATIBLE_STACK)
+        rows = np.repeat(np.arange(n), lengths)
+        matches = np.bincount(rows, weights=is_match, minlength=n).astype(np.int64)
+
+        score = np.full(n, 50, dtype=np.int64)
+        score += np.select([matches >= 4, matches >= 2, matches >= 1], [30, 20, 10], 0)
+
+        complexity = columns["integration_complexity"]
+        score += np.select(
+            [_equals(complexity, "low"), _equals(complexity, "medium"), _equals(complexity, "high")], [20, 10, -10], 0
+        )
+
+        requirements = columns["technical_requirements"]
+        score += np.where(_contains_any(requirements, ["security", "compliance"]), 10, 0)
+        score -= np.where(_contains_any(requirements, ["legacy"]), 10, 0)
+        return np.clip(score, 0, 100)
+
+    def risk_scores(self, columns: dict):
+        """RiskAgent scores and risk levels."""
+        urgent = _contains_any(columns["timeline"], ["urgent", "asap"])
+        risk = (
+            columns["budget_freeze"] * 30
+            + columns["recent_layoffs"] * 25
+            + columns["competitor_relationship"] * 20
+            + urgent * 15
+            + ~columns["has_champion"] * 20
+            + (columns["deal_size"] > 500000) * 10
+        ).astype(np.int64)
+        risk_level = np.select([risk <= 20, risk <= 50], ["LOW", "MEDIUM"], "HIGH")
+        return np.maximum(0, 100 - risk), risk_level
+
+    def resource_scores(self, columns: dict) -> np.ndarray:
+        """ResourceAgent scores."""
+        deal_size = columns["deal_size"]
+        score = np.full(len(deal_size), 80, dtype=np.int64)
+        score -= np.select([deal_size >= 500000, deal_size >= 200000], [15, 5], 0)
+
+        complexity = columns["implementation_complexity"]
+        score -= np.select([_equals(complexity, "high"), _equals(complexity, "medium")], [20, 10], 0)
+        score -= np.where(_contains_any(columns["timeline"], ["urgent", "asap"]), 15, 0)
+        return np.clip(score, 0, 100)
@@ -0,0 +1,318 @@
+"""
+Offline batch qualification.
+
+Leads move through the stages in waves. For each stage, every LLM request the
+stage still needs (after the rule-based agents and early-exit bounds) is
+written to a batch file and submitted through a BatchBackend; the responses
+are then fed back through the normal Stage.evaluate() decision logic.
+Job state lives in a directory, so an interrupted job resumes where it stopped.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from .llm_client import (LLMCallCounter, build_call_request, count_llm_calls, get_llm_client, request_key,
+                         use_prefilled_responses)
+from .models import Lead
+from .pipeline import build_final_result, resolve_reasoning
+
+# Provider limit on requests per batch file
+MAX_REQUESTS_PER_BATCH = 50000
+
+
+class BatchBackend:
+    """Where batch request files go. Subclasses wrap a provider's batch API."""
+
+    async def submit(self, requests_path: str) -> str:
+        """Submit a JSONL request file, return the batch id."""
+        raise NotImplementedError
+
+    async def status(self, batch_id: str) -> str:
+        """"in_progress", "completed" or "failed"."""
+        raise NotImplementedError
+
+    async def fetch(self, batch_id: str) -> dict:
+        """custom_id -> response text for every request that succeeded."""
+        raise NotImplementedError
+
+
+def parse_batch_output(lines) -> dict:
+    """custom_id -> message content from OpenAI batch output lines."""
+    responses = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") == 200:
+            responses[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+    return responses
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API (/v1/batches), results within the 24h completion window."""
+
+    async def submit(self, requests_path: str) -> str:
+        client = get_llm_client()
+        with open(requests_path, "rb") as f:
+            uploaded = await client.files.create(file=f, purpose="batch")
+        batch = await client.batches.create(
+            input_file_id=uploaded.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        return batch.id
+
+    async def status(self, batch_id: str) -> str:
+        batch = await get_llm_client().batches.retrieve(batch_id)
+        if batch.status == "failed":
+            return "failed"
+        # Expired / cancelled batches keep the results they already produced
+        if batch.status in ["completed", "expired", "cancelled"]:
+            return "completed"
+        return "in_progress"
+
+    async def fetch(self, batch_id: str) -> dict:
+        client = get_llm_client()
+        batch = await client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            return {}
+        content = await client.files.content(batch.output_file_id)
+        return parse_batch_output(content.text.splitlines())
+
+
+async def canned_responder(body: dict) -> str:
+    """Default LocalBatchBackend answer: a fixed passing score."""
+    return json.dumps({"score": 80, "reasoning": "Local batch stand-in response."})
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    File-based stand-in for a provider batch API, for tests and dry runs.
+    Each batch is a directory under `root`; requests are answered by
+    `responder(body) -> text` once `delay` seconds have passed since submit.
+    """
+
+    def __init__(self, root: str, responder=None, delay: float = 0.0):
+        self.root = root
+        self.responder = responder or canned_responder
+        self.delay = delay
+
+    async def submit(self, requests_path: str) -> str:
+        batch_id = f"local-{uuid.uuid4().hex[:12]}"
+        batch_dir = os.path.join(self.root, batch_id)
+        os.makedirs(batch_dir)
+        shutil.copy(requests_path, os.path.join(batch_dir, "input.jsonl"))
+        _write_json(os.path.join(batch_dir, "meta.json"), {"submitted_at": time.time()})
+        return batch_id
+
+    async def status(self, batch_id: str) -> str:
+        batch_dir = os.path.join(self.root, batch_id)
+        output_path = os.path.join(batch_dir, "output.jsonl")
+        if os.path.exists(output_path):
+            return "completed"
+        with open(os.path.join(batch_dir, "meta.json")) as f:
+            submitted_at = json.load(f)["submitted_at"]
+        if time.time() < submitted_at + self.delay:
+            return "in_progress"
+
+        lines = []
+        with open(os.path.join(batch_dir, "input.jsonl")) as f:
+            for line in f:
+                request = json.loads(line)
+                content = await self.responder(request["body"])
+                body = {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+                lines.append(json.dumps({"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}}))
+        with open(output_path + ".tmp", "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(output_path + ".tmp", output_path)
+        return "completed"
+
+    async def fetch(self, batch_id: str) -> dict:
+        with open(os.path.join(self.root, batch_id, "output.jsonl")) as f:
+            return parse_batch_output(f)
+
+
+class BatchQualifier:
+    """
+    Runs leads through the stages as a resumable offline batch job.
+
+    job_dir holds leads.jsonl, state.json and per-wave request / response
+    files. Requests that fail inside a batch fall back to live calls when
+    their wave is evaluated; `live_calls` counts them.
+    """
+
+    def __init__(self, stages: list, backend: BatchBackend, job_dir: str,
+                 poll_interval: float = 60.0, max_requests_per_batch: int = MAX_REQUESTS_PER_BATCH,
+                 verbose: bool = True):
+        self.stages = stages
+        self.backend = backend
+        self.job_dir = job_dir
+        self.poll_interval = poll_interval
+        self.max_requests_per_batch = max_requests_per_batch
+        self.verbose = verbose
+        self.live_calls = 0  # provider calls the batch responses did not cover, this run
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.job_dir, "state.json")
+
+    async def run(self, leads: list = None) -> list:
+        """
+        Qualify `leads` and return their results in input order.
+        If job_dir already holds a job it is resumed and `leads` is ignored.
+        """
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                state = json.load(f)
+            leads = self.load_leads()
+            if state.get("status") != "done":
+                self._log(f"Resuming job at stage {state['stage'] + 1} with {len(state['active'])} active leads")
+        else:
+            if leads is None:
+                raise ValueError(f"No job in {self.job_dir} to resume and no leads given")
+            leads = [lead.to_dict() if isinstance(lead, Lead) else dict(lead) for lead in leads]
+            os.makedirs(self.job_dir, exist_ok=True)
+            with open(os.path.join(self.job_dir, "leads.jsonl"), "w") as f:
+                for lead in leads:
+                    f.write(json.dumps(lead) + "\n")
+            state = {
+                "stage": 0,
+                "active": list(range(len(leads))),
+                "batches": [],
+                "stage_results": {},
+                "rejected_at": {},
+            }
+            self._save_state(state)
+
+        while state["stage"] < len(self.stages) and state["active"]:
+            await self._run_wave(state, leads)
+
+        state["status"] = "done"
+        self._save_state(state)
+        return [
+            build_final_result(state["stage_results"].get(str(i), []), state["rejected_at"].get(str(i)))
+            for i in range(len(leads))
+        ]
+
+    async def _run_wave(self, state: dict, leads: list):
+        """Submit, await and apply the batch for the current stage."""
+        k = state["stage"]
+        stage = self.stages[k]
+        responses_path = os.path.join(self.job_dir, f"wave{k + 1}_responses.json")
+
+        if os.path.exists(responses_path):
+            with open(responses_path) as f:
+                responses = json.load(f)
+        else:
+            if not state["batches"]:
+                request_files, count = await self._write_requests(stage, k, [leads[i] for i in state["active"]])
+                self._log(f"Wave {k + 1} ({stage.name}): {count} LLM requests for {len(state['active'])} leads")
+                state["batches"] = [await self.backend.submit(path) for path in request_files]
+                self._save_state(state)
+            responses = await self._collect(state["batches"])
+            _write_json(responses_path, responses)
+
+        # Feed the responses through the normal stage logic
+        counter = LLMCallCounter()
+        results = await asyncio.gather(*[
+            _evaluate_prefilled(stage, leads[i], responses, counter) for i in state["active"]
+        ])
+        if counter.calls:
+            # Failed batch requests, or requests the batch file did not anticipate
+            self._log(f"Wave {k + 1} ({stage.name}): {counter.calls} requests not answered by the batch were made live")
+        self.live_calls += counter.calls
+        still_active = []
+        for i, result in zip(state["active"], results):
+            state["stage_results"].setdefault(str(i), []).append(result)
+            if result["decision"] in ["REJECT", "REJECTED"]:
+                state["rejected_at"][str(i)] = stage.name
+            else:
+                still_active.append(i)
+
+        self._log(f"Wave {k + 1} ({stage.name}): {len(state['active']) - len(still_active)} rejected, "
+                  f"{len(still_active)} continue")
+        state["active"] = still_active
+        state["stage"] = k + 1
+        state["batches"] = []
+        self._save_state(state)
+
+    async def _write_requests(self, stage, k: int, leads: list):
+        """Write the stage's outstanding LLM requests (deduplicated) to batch files."""
+        requests = {}
+        for lead in leads:
+            for request in await _pending_llm_requests(stage, lead):
+                params = build_call_request(**request)
+                requests.setdefault(request_key(params), params)
+
+        items = list(requests.items())
+        paths = []
+        for n in range(0, len(items), self.max_requests_per_batch):
+            path = os.path.join(self.job_dir, f"wave{k + 1}_requests_{len(paths) + 1}.jsonl")
+            with open(path, "w") as f:
+                for custom_id, params in items[n:n + self.max_requests_per_batch]:
+                    line = {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": params}
+                    f.write(json.dumps(line) + "\n")
+            paths.append(path)
+        return paths, len(items)
+
+    async def _collect(self, batch_ids: list) -> dict:
+        """Poll until every batch has finished, then merge their responses."""
+        while True:
+            statuses = [await self.backend.status(batch_id) for batch_id in batch_ids]
+            if all(status != "in_progress" for status in statuses):
+                break
+            await asyncio.sleep(self.poll_interval)
+
+        responses = {}
+        for batch_id, status in zip(batch_ids, statuses):
+            if status == "completed":
+                responses.update(await self.backend.fetch(batch_id))
+            else:
+                self._log(f"Batch {batch_id} failed; its requests will be made live")
+        return responses
+
+    def load_leads(self) -> list:
+        """Leads stored with the job, in input order."""
+        with open(os.path.join(self.job_dir, "leads.jsonl")) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _save_state(self, state: dict):
+        _write_json(self.state_path, state)
+
+    def _log(self, message: str):
+        if self.verbose:
+            print(message, file=sys.stderr)
+
+
+async def _pending_llm_requests(stage, lead_data: dict) -> list:
+    """
+    call_llm() arguments the stage still needs for this lead: none if the
+    rule-based agents already settle the decision. A fused stage needs its
+    agents' own requests (FusedCall steps aside when responses are prefilled).
+    """
+    results = [None if agent.uses_llm else await agent.evaluate(lead_data) for agent in stage.agents]
+    if stage.early_exit and stage.early_decision(results) is not None:
+        return []
+    return [request for agent in stage.agents if agent.uses_llm for request in agent.llm_requests(lead_data)]
+
+
+async def _evaluate_prefilled(stage, lead_data: dict, responses: dict, counter: LLMCallCounter) -> dict:
+    """
+    stage.evaluate() with LLM calls answered from the batch responses; calls
+    they do not answer go to the provider and are counted into `counter`.
+    """
+    use_prefilled_responses(responses)
+    count_llm_calls(counter)
+    result = await stage.evaluate(lead_data)
+    await resolve_reasoning({"stage_results": [result]})  # job state must be plain JSON
+    return result
+
+
+def _write_json(path: str, data):
+    """Write JSON atomically so a crash never leaves a half-written file."""
+    with open(path + ".tmp", "w") as f:
+        json.dump(data, f)
+    os.replace(path + ".tmp", path)
@@ -0,0 +1,216 @@
+"""LLM response cache: in-memory LRU tier backed by an on-disk SQLite tier."""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Defaults for the `cache` section of config.yml
+DEFAULT_CACHE_CONFIG = {
+    "enabled": True,
+    "path": "cache/llm_cache.sqlite",  # relative to the project root; empty = memory only
+    "ttl_seconds": 7 * 24 * 3600,
+    "memory_max_entries": 10000,
+    "disk_max_entries": 500000,
+}
+
+
+def make_cache_key(model: str, system_prompt: str, prompt: str, temperature: float,
+                   max_tokens: int, json_mode: bool, json_schema: dict = None) -> str:
+    """
+    Content hash of every request field that affects the completion.
+    A json_schema response format is hashed with its full contents (keys of
+    requests without one are unchanged).
+    """
+    fields = [model, system_prompt or "", prompt, temperature, max_tokens, bool(json_mode)]
+    if json_schema:
+        fields.append(json_schema)
+    payload = json.dumps(fields, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache of LLM responses keyed by make_cache_key().
+
+    Memory tier: LRU dict, hits cost no I/O.
+    Disk tier: SQLite table, survives restarts, LRU-trimmed to disk_max_entries.
+    Entries expire after ttl_seconds in both tiers.
+    """
+
+    # Check the disk size cap every N writes rather than on each one
+    _TRIM_EVERY = 100
+
+    def __init__(self, path: str = None, ttl_seconds: float = DEFAULT_CACHE_CONFIG["ttl_seconds"],
+                 memory_max_entries: int = DEFAULT_CACHE_CONFIG["memory_max_entries"],
+                 disk_max_entries: int = DEFAULT_CACHE_CONFIG["disk_max_entries"]):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.memory_max_entries = memory_max_entries
+        self.disk_max_entries = disk_max_entries
+
+        self._memory = OrderedDict()  # key -> (expires_at, agent, value)
+        self._template_versions = {}  # agent -> prompt version seen by this process
+        self._writes = 0
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, agent TEXT, value TEXT, expires_at REAL, last_access REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_agent ON responses(agent)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS templates (agent TEXT PRIMARY KEY, version TEXT)")
+            self._db.commit()
+
+    async def get(self, key: str):
+        """Return the cached response text or None."""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return entry[2]
+            del self._memory[key]
+
+        if self._db is not None:
+            row = await asyncio.to_thread(self._disk_get, key, now)
+            if row is not None:
+                expires_at, agent, value = row
+                self._memory_put(key, expires_at, agent, value)
+                self.hits_disk += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str, agent: str = None):
+        """Store a response in both tiers."""
+        expires_at = time.time() + self.ttl_seconds
+        self._memory_put(key, expires_at, agent, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, agent, value, expires_at)
+
+    async def sync_template(self, agent: str, version: str):
+        """
+        Drop an agent's entries if its prompt version differs from the one
+        the cache last saw. Cheap after the first call per agent.
+        """
+        if self._template_versions.get(agent) == version:
+            return
+        if self._db is not None:
+            stored = await asyncio.to_thread(self._disk_template_version, agent)
+            if stored is not None and stored != version:
+                await self.invalidate(agent)
+            await asyncio.to_thread(self._disk_set_template_version, agent, version)
+        elif agent in self._template_versions:
+            await self.invalidate(agent)
+        self._template_versions[agent] = version
+
+    async def invalidate(self, agent: str = None):
+        """Remove all entries for one agent, or everything if agent is None."""
+        if agent is None:
+            self._memory.clear()
+        else:
+            for key in [k for k, entry in self._memory.items() if entry[1] == agent]:
+                del self._memory[key]
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_invalidate, agent)
+
+    def stats(self) -> dict:
+        """Hit / miss counters."""
+        hits = self.hits_memory + self.hits_disk
+        lookups = hits + self.misses
+        return {
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def close(self):
+        """Close the SQLite connection."""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    # Memory tier
+
+    def _memory_put(self, key, expires_at, agent, value):
+        self._memory[key] = (expires_at, agent, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max_entries:
+            self._memory.popitem(last=False)
+
+    # Disk tier (runs in worker threads)
+
+    def _disk_get(self, key, now):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT expires_at, agent, value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] <= now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            return row
+
+    def _disk_set(self, key, agent, value, expires_at):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, agent, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, agent, value, expires_at, time.time()),
+            )
+            self._writes += 1
+            if self._writes % self._TRIM_EVERY == 0:
+                self._disk_trim()
+            self._db.commit()
+
+    def _disk_trim(self):
+        self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self.disk_max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                (excess,),
+            )
+
+    def _disk_invalidate(self, agent):
+        with self._db_lock:
+            if agent is None:
+                self._db.execute("DELETE FROM responses")
+            else:
+                self._db.execute("DELETE FROM responses WHERE agent = ?", (agent,))
+            self._db.commit()
+
+    def _disk_template_version(self, agent):
+        with self._db_lock:
+            row = self._db.execute("SELECT version FROM templates WHERE agent = ?", (agent,)).fetchone()
+            return row[0] if row else None
+
+    def _disk_set_template_version(self, agent, version):
+        with self._db_lock:
+            self._db.execute("INSERT OR REPLACE INTO templates (agent, version) VALUES (?, ?)", (agent, version))
+            self._db.commit()
@@ -0,0 +1,116 @@
+"""
+Record / replay of LLM responses ("cassettes") for offline, deterministic runs.
+
+In record mode every LLM response is appended to the cassette file together
+with how long it took; in replay mode requests are answered from the file,
+optionally after the recorded (or a fixed) delay, so demo.py, the test
+scripts and benchmarks can run without API calls. A request that is not on
+the cassette either raises CassetteMissError or falls through to a live
+call, depending on `on_miss`.
+
+The file is JSON lines (gzip-compressed when the name ends in .gz), one
+{"key", "agent", "content", "latency_ms"} record per request, keyed by
+request_key(); it is indexed into a dict when opened.
+"""
+
+import asyncio
+import atexit
+import gzip
+import json
+import os
+
+# Defaults for the `cassette` section of config.yml
+DEFAULT_CASSETTE_CONFIG = {
+    "mode": "off",  # off / record / replay
+    "path": "cassettes/llm.jsonl.gz",  # relative to project root
+    "on_miss": "error",  # replay miss: "error" (raise) or "live" (call the API and record the answer)
+    "latency": "none",  # replay delay: "none", "recorded", or milliseconds
+}
+
+CASSETTE_MODES = ["off", "record", "replay"]
+
+
+class CassetteMissError(Exception):
+    """A replayed request has no recorded response."""
+
+
+class Cassette:
+    """Recorded responses by request key, backed by an append-only file."""
+
+    def __init__(self, path: str, mode: str = "replay", on_miss: str = "error", latency="none"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Cassette mode must be 'record' or 'replay', got {mode!r}")
+        if on_miss not in ("error", "live"):
+            raise ValueError(f"on_miss must be 'error' or 'live', got {on_miss!r}")
+        self.path = path
+        self.mode = mode
+        self.on_miss = on_miss
+        self.latency = latency
+        self._entries = {}  # key -> (content, latency_ms)
+        self._file = None
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        if os.path.exists(path):
+            self._load()
+        atexit.register(self.close)
+
+    def _open(self, mode: str):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def _load(self):
+        with self._open("r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]] = (entry["content"], entry.get("latency_ms") or 0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    async def replay(self, key: str):
+        """Recorded response for `key` (after the configured delay), or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            if self.on_miss == "error":
+                raise CassetteMissError(f"No recorded response for request {key[:16]} in {self.path}")
+            return None
+        self.hits += 1
+        content, latency_ms = entry
+        delay = latency_ms if self.latency == "recorded" else (0 if self.latency == "none" else float(self.latency))
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        return content
+
+    def record(self, key: str, content: str, agent: str = None, latency_ms: float = 0):
+        """Append a response (once per key)."""
+        if content is None or key in self._entries:
+            return
+        self._entries[key] = (content, latency_ms)
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = self._open("a")
+        self._file.write(json.dumps({"key": key, "agent": agent, "content": content,
+                                     "latency_ms": round(latency_ms, 1)}) + "\n")
+        self.recorded += 1
+
+    def close(self):
+        """Flush recorded responses to disk. Safe to call more than once."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "recorded": self.recorded}
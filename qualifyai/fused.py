@@ -0,0 +1,86 @@
+"""
+Fused stage calls: one LLM request answers every LLM agent in a stage.
+
+The fused system prompt is each agent's own system prompt under its
+assessment key, and the user message is each agent's own lead message, so
+the answers mean the same as in split mode. A JSON schema makes the model
+return one {score, reasoning, recommendation} object per key. Each answer is
+then handed to its agent as if its own single call had returned it, so the
+agents' result dicts keep their usual shape.
+"""
+
+import json
+from .llm_client import LLMTimeoutError, build_call_request, call_llm, request_key, using_prefilled_responses
+from .prompts import PromptTemplate
+
+FUSED_HEADER = """You perform several independent assessments of the same lead. Each assessment below has its own instructions and is introduced by its key.
+Return valid JSON with one property per assessment key, holding that assessment's result object."""
+
+
+class FusedCall:
+    """One combined request for a stage's LLM agents."""
+
+    def __init__(self, agents: list):
+        self.agents = agents
+        self.keys = [agent.template.name for agent in agents]
+        self.name = " + ".join(agent.name for agent in agents)  # cache / usage tag
+
+        system = FUSED_HEADER + "".join(
+            f"\n\nASSESSMENT {key}:\n{agent.template.system}" for key, agent in zip(self.keys, agents)
+        )
+        self.template = PromptTemplate(name="fused_" + "_".join(self.keys), version="1", system=system, user="")
+
+        result = {
+            "type": "object",
+            "properties": {
+                "score": {"type": "number"},
+                "reasoning": {"type": "string"},
+                "recommendation": {"type": "string", "enum": ["PROCEED", "REJECT"]},
+            },
+            "required": ["score", "reasoning", "recommendation"],
+            "additionalProperties": False,
+        }
+        self.json_schema = {
+            "name": "stage_assessments",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {key: result for key in self.keys},
+                "required": list(self.keys),
+                "additionalProperties": False,
+            },
+        }
+
+    async def answers(self, lead_data) -> dict:
+        """
+        request_key -> response text for each agent the fused call answered.
+        Agents left out (call failed, answer malformed) make their own call.
+        """
+        if using_prefilled_responses():
+            return {}  # offline batch: the agents' own requests were prefilled
+        prompt = "\n\n".join(
+            f"ASSESSMENT {key}:\n{agent.build_prompt(lead_data)}" for key, agent in zip(self.keys, self.agents)
+        )
+        try:
+            response = await call_llm(
+                prompt,
+                system_prompt=self.template.system,
+                json_mode=True,
+                agent=self.name,
+                prompt_version=self.template.version,
+                max_tokens=1000 * len(self.agents),
+                json_schema=self.json_schema,
+            )
+            result = json.loads(response)
+        except LLMTimeoutError:
+            raise
+        except Exception:
+            return {}
+
+        answers = {}
+        for key, agent in zip(self.keys, self.agents):
+            entry = result.get(key)
+            if not isinstance(entry, dict) or not isinstance(entry.get("score"), (int, float)):
+                continue
+            answers[request_key(build_call_request(**agent.llm_request(lead_data)))] = json.dumps(entry)
+        return answers
@@ -0,0 +1,133 @@
+"""
+Hedged requests: cut tail latency by racing a duplicate of a slow call.
+
+If a call has not finished after the agent's recent p-th percentile latency,
+a second identical call is sent and whichever answers first is used; the
+other is cancelled. Hedges are capped at a fraction of all requests so the
+extra spend stays bounded. Only the provider request is hedged and timed:
+the caller has its rate-limit slot before run() starts, and a duplicate is
+sent only if `admit` grants it a slot of its own without queueing.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+# Defaults for the `hedging` section of config.yml
+DEFAULT_HEDGING_CONFIG = {
+    "enabled": False,
+    "percentile": 95,  # hedge once a call is slower than this share of recent calls
+    "min_samples": 20,  # per agent, before any hedging
+    "window": 200,  # recent latencies kept per agent
+    "min_delay_ms": 200,  # never hedge sooner than this
+    "budget": 0.05,  # max hedges as a fraction of requests
+}
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies for one agent."""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * p / 100))
+        return ordered[index]
+
+
+class Hedger:
+    """Runs provider calls with a hedge after the per-agent latency percentile."""
+
+    def __init__(self, percentile: float = 95, min_samples: int = 20, window: int = 200,
+                 min_delay_ms: float = 200, budget: float = 0.05):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.min_delay = min_delay_ms / 1000
+        self.budget = budget
+        self._latency = {}  # agent -> LatencyTracker
+        self.requests = 0
+        self.hedges = 0  # duplicates sent
+        self.hedge_wins = 0  # duplicates that answered first
+        self.budget_denied = 0  # hedges due but skipped for lack of budget
+        self.rate_denied = 0  # hedges due but skipped for lack of a free rate-limit slot
+
+    def _tracker(self, agent: str) -> LatencyTracker:
+        tracker = self._latency.get(agent)
+        if tracker is None:
+            tracker = self._latency[agent] = LatencyTracker(self.window)
+        return tracker
+
+    def hedge_delay(self, agent: str):
+        """Seconds to wait before hedging, or None while there is too little history."""
+        tracker = self._tracker(agent)
+        if len(tracker.samples) < self.min_samples:
+            return None
+        return max(self.min_delay, tracker.percentile(self.percentile))
+
+    async def run(self, agent: str, fn, hedge_fn=None, admit=None):
+        """
+        Result of `fn()` (a coroutine function making one call), hedged if it
+        is slow. The duplicate runs `hedge_fn` (default `fn`), and only if
+        `admit()` (when given) returns True.
+        """
+        self.requests += 1
+        agent = agent or "unknown"
+        tracker = self._tracker(agent)
+        delay = self.hedge_delay(agent)
+
+        start = time.perf_counter()
+        tasks = [asyncio.ensure_future(fn())]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    if self.hedges >= self.budget * self.requests:
+                        self.budget_denied += 1
+                    elif admit is not None and not admit():
+                        self.rate_denied += 1
+                    else:
+                        self.hedges += 1
+                        tasks.append(asyncio.ensure_future((hedge_fn or fn)()))
+
+            # First successful answer wins; an error only counts if both calls fail
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in tasks if task in done and task.exception() is None), None)
+                if winner is not None or not pending:
+                    break
+            if winner is None:
+                raise tasks[0].exception()
+            if winner is not tasks[0]:
+                self.hedge_wins += 1
+            # Latency as seen from the first send (a lower bound for a beaten call)
+            tracker.record(time.perf_counter() - start)
+            return winner.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # mark a losing call's error as retrieved
+
+    def stats(self) -> dict:
+        """How often hedges were sent and how often they beat the original call."""
+        thresholds = {}
+        for agent in self._latency:
+            delay = self.hedge_delay(agent)
+            thresholds[agent] = round(delay, 3) if delay is not None else None
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_rate": self.hedges / self.requests if self.requests else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "win_rate": self.hedge_wins / self.hedges if self.hedges else 0.0,
+            "budget_denied": self.budget_denied,
+            "rate_denied": self.rate_denied,
+            "hedge_after_seconds": thresholds,
+        }
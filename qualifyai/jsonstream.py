@@ -0,0 +1,80 @@
+"""Incremental parsing of a JSON object that arrives in chunks (streamed LLM output)."""
+
+import json
+
+_DELIMITERS = ",}] \t\r\n"
+
+
+class JSONFieldStream:
+    """
+    Feed text chunks of one JSON object as they arrive; each top-level
+    scalar field (number, string, true / false / null) is available in
+    `fields` as soon as its value is complete. Nested values are skipped.
+
+        parser = JSONFieldStream()
+        async for chunk in stream:
+            parser.feed(chunk)
+            if "score" in parser.fields:
+                ...
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._token = None  # text of the top-level key / value being read, None when not reading one
+        self._key = None  # key whose value comes next
+        self._expect_key = True
+
+    def feed(self, text: str) -> dict:
+        """Consume a chunk; return the fields it completed."""
+        completed = {}
+        for ch in text:
+            if self._in_string:
+                if self._token is not None:
+                    self._token.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._token is not None:
+                        self._finish_token(completed)
+                continue
+
+            if self._token is not None and self._depth == 1 and ch in _DELIMITERS:
+                self._finish_token(completed)  # end of a number / literal
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    self._token = [ch]
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+            elif self._depth == 1:
+                if ch == ",":
+                    self._expect_key = True
+                elif ch == ":":
+                    self._expect_key = False
+                elif ch not in _DELIMITERS:
+                    if self._token is None:
+                        self._token = []
+                    self._token.append(ch)
+        return completed
+
+    def _finish_token(self, completed: dict):
+        text = "".join(self._token)
+        self._token = None
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return
+        if self._expect_key:
+            self._key = value
+        elif self._key is not None:
+            self.fields[self._key] = completed[self._key] = value
+            self._key = None
@@ -0,0 +1,383 @@
+"""
+Seeded synthetic leads for scale and distribution testing.
+
+    generator = LeadGenerator(seed=7, duplicate_rate=0.02, near_duplicate_rate=0.05)
+    for lead in generator.generate(1_000_000):
+        ...
+
+Every field the agents read is drawn from a distribution in
+DEFAULT_DISTRIBUTIONS, and any of them can be overridden (see
+LeadGenerator). Leads are produced lazily, so millions can be streamed to
+a file (`python -m qualifyai generate`) in constant memory. The same seed
+and distributions always give the same leads.
+
+Distribution specs:
+  categorical      {value: weight, ...}
+  numeric          {"median", "sigma", "min", "max", "round", "zero_rate"}: log-normal
+                   around the median, clamped, rounded to a multiple of `round`;
+                   a `zero_rate` share is 0 (for growth_rate: "Flat")
+  list             {"count": {n: weight}, "values": {value: weight}}: n distinct values
+  flag             probability of True
+
+Duplicates repeat an earlier lead exactly (cache hits, request coalescing);
+near-duplicates repeat one with CRM-style noise (company name spelling,
+rounded budget, reordered lists), which changes the request key.
+"""
+
+import random
+from bisect import bisect_right
+from collections import deque
+
+DEFAULT_DISTRIBUTIONS = {
+    "industry": {
+        "B2B SaaS": 18, "Technology": 14, "Enterprise Software": 10, "FinTech": 9, "Healthcare Tech": 7,
+        "EdTech": 5, "E-commerce": 7, "Financial Services": 6, "Healthcare": 5, "Manufacturing": 6,
+        "Retail": 5, "Logistics": 4, "Media": 2, "Food & Beverage": 2,
+    },
+    "employee_count": {"median": 400, "sigma": 1.3, "min": 5, "max": 200000, "round": 1},
+    # annual_revenue = employee_count x revenue per employee
+    "revenue_per_employee": {"median": 180000, "sigma": 0.5, "min": 20000, "max": 2000000, "round": 1000},
+    "budget": {"median": 60000, "sigma": 1.0, "min": 5000, "max": 2000000, "round": 1000, "zero_rate": 0.05},
+    # deal_size = budget x this ratio (budget 0: drawn around the budget median)
+    "deal_to_budget": {"median": 1.0, "sigma": 0.35, "min": 0.3, "max": 4.0, "round": 0.01},
+    "funding_stage": {
+        "Bootstrapped": 8, "Seed": 10, "Series A": 16, "Series B": 18, "Series C": 14, "Series D": 8,
+        "IPO": 10, "Private Equity": 6, "": 10,
+    },
+    # percent YoY; zero_rate leads are "Flat"
+    "growth_rate": {"median": 11, "sigma": 0.6, "min": 1, "max": 150, "round": 1, "zero_rate": 0.12},
+    "market_position": {
+        "Market leader": 8, "Industry leader": 6, "Fast-growing challenger": 14, "Strong challenger": 10,
+        "Established mid-market player": 22, "Niche specialist": 16, "Regional player": 14, "Local shop": 10,
+    },
+    "competitors": {
+        "count": {0: 35, 1: 35, 2: 20, 3: 10},
+        "values": {
+            "GitLab": 10, "CircleCI": 8, "Harness": 6, "Atlassian": 10, "ServiceNow": 6, "Datadog": 8,
+            "New Relic": 5, "Splunk": 5, "PagerDuty": 4, "JFrog": 4, "Octopus Deploy": 3,
+        },
+    },
+    "current_solution": {
+        "None": 25, "Manual process": 15, "Basic tool": 12, "Spreadsheets": 8, "In-house scripts": 10,
+        "Jenkins": 12, "GitLab": 7, "CircleCI": 5, "Atlassian": 6,
+    },
+    # not drawn when current_solution is None
+    "satisfaction_with_current": {"Low": 40, "Medium": 40, "High": 20},
+    "our_advantage": {
+        "Strong AI capabilities and unique integration": 10, "Strong automation features": 12,
+        "Unique compliance reporting": 8, "Better integration capabilities": 14, "Faster deployment": 12,
+        "Lower total cost": 10, "": 34,
+    },
+    "decision_maker_title": {
+        "VP Engineering": 20, "CTO": 18, "CIO": 10, "Head of Platform": 10, "Director of IT": 12,
+        "COO": 6, "CFO": 6, "Owner": 8, "VP Operations": 10,
+    },
+    "has_champion": 0.6,
+    "champion_title": {
+        "Platform Engineering Director": 14, "Engineering Manager": 20, "DevOps Lead": 18,
+        "Senior Developer": 16, "IT Manager": 14, "Head of Security": 8, "Product Manager": 10,
+    },
+    "champion_engagement": {
+        "High - actively pushing for our solution": 25, "High": 10, "Medium - supportive but not driving": 35,
+        "Low - interested but no influence": 30,
+    },
+    "blockers": {
+        "None": 45, "Minor budget review required": 15, "Security review pending": 12,
+        "Procurement process takes 8 weeks": 10, "Competing internal priorities": 10,
+        "CFO imposed budget freeze until next quarter": 8,
+    },
+    "tech_stack": {
+        "count": {0: 5, 1: 8, 2: 14, 3: 20, 4: 22, 5: 18, 6: 13},
+        "values": {
+            "AWS": 20, "Azure": 10, "GCP": 8, "Kubernetes": 14, "Docker": 16, "Python": 14, "Node.js": 10,
+            "React": 10, "Jenkins": 8, "GitHub": 12, "GitLab": 6, "Java": 10, ".NET": 6, "Terraform": 6,
+            "PostgreSQL": 8, "Oracle": 4, "SAP": 3, "Mainframe": 1,
+        },
+    },
+    "integration_complexity": {"Low": 35, "Medium": 45, "High": 20},
+    "technical_requirements": {
+        "SOC 2 compliance and SSO": 15, "Security and audit logging": 12, "API access and webhooks": 18,
+        "On-premise deployment": 8, "Legacy system integration": 10, "High availability": 12,
+        "Standard cloud deployment": 20, "": 5,
+    },
+    "budget_freeze": 0.08,
+    "recent_layoffs": 0.10,
+    # only drawn for leads with competitors
+    "competitor_relationship": 0.25,
+    "timeline": {
+        "Q1 decision": 10, "Q2 decision required": 14, "Q3 decision": 14, "Q4 decision": 10,
+        "Next 90 days": 14, "Urgent - need ASAP": 10, "Urgent": 4, "Next fiscal year": 8, "No timeline": 8,
+        "Unknown": 8,
+    },
+    "implementation_complexity": {"Low": 30, "Medium": 45, "High": 25},
+    # decision maker and champion are always listed; this is everyone else
+    "stakeholders": {
+        "count": {0: 25, 1: 35, 2: 25, 3: 15},
+        "values": {
+            "Security Director": 14, "CFO": 12, "Procurement Manager": 12, "Head of Data": 8,
+            "Engineering Manager": 14, "IT Architect": 10, "Legal Counsel": 6, "CEO": 6,
+        },
+    },
+}
+
+_NAME_PREFIXES = [
+    "Tech", "Data", "Cloud", "Net", "Bright", "Blue", "Quantum", "Apex", "Nova", "Vertex", "Pixel", "Stream",
+    "Core", "Peak", "Swift", "Iron", "Green", "Silver", "North", "Clear", "Prime", "Bold", "Smart", "Next",
+    "True", "Open", "Deep", "Rapid", "Summit", "Harbor", "Atlas", "Orbit", "Cedar", "Maple", "River", "Stone",
+]
+_NAME_SUFFIXES = [
+    "Flow", "Works", "Logic", "Systems", "Labs", "Soft", "Ware", "Point", "Bridge", "Path", "Wave", "Forge",
+    "Scale", "Stack", "Hub", "Sync", "Grid", "Mind", "Base", "Line", "Field", "Gate", "Shift", "Spark",
+]
+_LEGAL_FORMS = ["Inc", "Corp", "LLC", "Ltd", "Group", "Technologies", "Solutions", "Co"]
+_FIRST_NAMES = [
+    "Sarah", "Mike", "Jennifer", "David", "Priya", "Carlos", "Aisha", "Tom", "Mei", "Daniel", "Fatima", "Lucas",
+    "Emma", "Raj", "Olivia", "James", "Sofia", "Ahmed", "Grace", "Kenji", "Laura", "Omar", "Nina", "Ben",
+    "Chloe", "Ivan", "Hana", "Peter", "Zoe", "Marco",
+]
+_LAST_NAMES = [
+    "Chen", "Torres", "Liu", "Park", "Patel", "Garcia", "Khan", "Smith", "Wang", "Müller", "Okafor", "Rossi",
+    "Johnson", "Nguyen", "Silva", "Brown", "Kim", "Cohen", "Novak", "Tanaka", "Martin", "Haddad", "Larsen",
+    "Costa", "Singh", "Ivanova", "Dubois", "Walsh", "Moreau", "Schmidt",
+]
+_STAKEHOLDER_NOTES = [
+    "Needs compliance validation", "Final sign-off for large deals", "Owns the budget", "Skeptical, wants a POC",
+    "Supportive", "Concerned about migration effort", "Data-driven, wants ROI numbers", "Runs the evaluation",
+]
+
+_NEAR_DUPLICATE_FIELDS = ("company_name", "budget", "tech_stack", "stakeholders", "timeline")
+
+
+class _Weighted:
+    """Weighted choice over fixed values (precomputed cumulative weights)."""
+
+    __slots__ = ("values", "cumulative", "total")
+
+    def __init__(self, weights: dict):
+        self.values = list(weights)
+        self.cumulative = []
+        total = 0
+        for weight in weights.values():
+            total += weight
+            self.cumulative.append(total)
+        if not self.values or total <= 0:
+            raise ValueError(f"Distribution needs at least one positive weight: {weights!r}")
+        self.total = total
+
+    def sample(self, rng: random.Random):
+        return self.values[bisect_right(self.cumulative, rng.random() * self.total)]
+
+    def sample_distinct(self, rng: random.Random, n: int) -> list:
+        """Up to n different values (fewer if the weights make more unlikely)."""
+        chosen = []
+        for _ in range(n * 4):
+            if len(chosen) >= n:
+                break
+            value = self.sample(rng)
+            if value not in chosen:
+                chosen.append(value)
+        return chosen
+
+
+class _LogNormal:
+    """Log-normal around a median, clamped and rounded."""
+
+    __slots__ = ("median", "sigma", "low", "high", "step", "zero_rate")
+
+    def __init__(self, spec: dict):
+        self.median = spec["median"]
+        self.sigma = spec.get("sigma", 0.5)
+        self.low = spec.get("min", 0)
+        self.high = spec.get("max", float("inf"))
+        self.step = spec.get("round", 1)
+        self.zero_rate = spec.get("zero_rate", 0.0)
+
+    def sample(self, rng: random.Random):
+        if self.zero_rate and rng.random() < self.zero_rate:
+            return 0
+        value = min(max(rng.lognormvariate(0.0, self.sigma) * self.median, self.low), self.high)
+        if self.step >= 1:
+            return int(round(value / self.step) * self.step)
+        return round(value, len(str(self.step).split(".")[-1]))
+
+
+class LeadGenerator:
+    """
+    Stream of synthetic lead dicts.
+
+    seed: random seed (None = nondeterministic). distributions: overrides of
+    DEFAULT_DISTRIBUTIONS by field; numeric and list specs are merged key by
+    key, categorical ones replace the default. duplicate_rate /
+    near_duplicate_rate: share of leads that repeat one of the last
+    `duplicate_window` distinct leads exactly / with noise.
+    """
+
+    def __init__(self, seed: int = None, distributions: dict = None, duplicate_rate: float = 0.0,
+                 near_duplicate_rate: float = 0.0, duplicate_window: int = 10000):
+        if duplicate_rate < 0 or near_duplicate_rate < 0 or duplicate_rate + near_duplicate_rate > 1:
+            raise ValueError("duplicate_rate and near_duplicate_rate must be >= 0 and add up to at most 1")
+        self.distributions = merge_distributions(distributions)
+        self.duplicate_rate = duplicate_rate
+        self.near_duplicate_rate = near_duplicate_rate
+        self._rng = random.Random(seed)
+        self._recent = deque(maxlen=duplicate_window)
+        self._samplers = {field: _sampler(spec) for field, spec in self.distributions.items()}
+        self.generated = 0
+        self.duplicates = 0
+        self.near_duplicates = 0
+
+    def generate(self, count: int = None):
+        """Yield `count` leads (None = without end)."""
+        n = 0
+        while count is None or n < count:
+            yield self.next_lead()
+            n += 1
+
+    def __iter__(self):
+        return self.generate()
+
+    def next_lead(self) -> dict:
+        rng = self._rng
+        self.generated += 1
+        if self._recent:
+            roll = rng.random()
+            if roll < self.duplicate_rate:
+                self.duplicates += 1
+                return _copy_lead(rng.choice(self._recent))
+            if roll < self.duplicate_rate + self.near_duplicate_rate:
+                self.near_duplicates += 1
+                return self._near_duplicate(rng.choice(self._recent))
+        lead = self._new_lead()
+        self._recent.append(lead)
+        return _copy_lead(lead)
+
+    def stats(self) -> dict:
+        return {"generated": self.generated, "distinct": self.generated - self.duplicates - self.near_duplicates,
+                "duplicates": self.duplicates, "near_duplicates": self.near_duplicates}
+
+    def _new_lead(self) -> dict:
+        rng = self._rng
+        s = self._samplers
+
+        employees = max(1, s["employee_count"].sample(rng))
+        budget = s["budget"].sample(rng)
+        deal_basis = budget or s["budget"].median
+        growth = s["growth_rate"].sample(rng)
+
+        current_solution = s["current_solution"].sample(rng)
+        competitors = s["competitors"].sample(rng)
+        has_champion = rng.random() < self.distributions["has_champion"]
+
+        decision_maker = _person(rng)
+        decision_maker_title = s["decision_maker_title"].sample(rng)
+        champion = _person(rng) if has_champion else "None"
+        champion_title = s["champion_title"].sample(rng) if has_champion else ""
+        stakeholders = [f"{decision_maker} ({decision_maker_title}) - Decision maker"]
+        if has_champion:
+            stakeholders.append(f"{champion} ({champion_title}) - Champion")
+        for title in s["stakeholders"].sample(rng):
+            stakeholders.append(f"{_person(rng)} ({title}) - {rng.choice(_STAKEHOLDER_NOTES)}")
+
+        return {
+            "company_name": f"{rng.choice(_NAME_PREFIXES)}{rng.choice(_NAME_SUFFIXES)} {rng.choice(_LEGAL_FORMS)}",
+            "industry": s["industry"].sample(rng),
+            "employee_count": employees,
+            "annual_revenue": employees * s["revenue_per_employee"].sample(rng),
+            "budget": budget,
+            "funding_stage": s["funding_stage"].sample(rng),
+            "growth_rate": f"{growth}% YoY" if growth else "Flat",
+            "market_position": s["market_position"].sample(rng),
+            "competitors": competitors,
+            "current_solution": current_solution,
+            "satisfaction_with_current": "" if current_solution == "None" else s["satisfaction_with_current"].sample(rng),
+            "our_advantage": s["our_advantage"].sample(rng),
+            "decision_maker": decision_maker,
+            "decision_maker_title": decision_maker_title,
+            "champion": champion,
+            "champion_title": champion_title,
+            "champion_engagement": s["champion_engagement"].sample(rng) if has_champion else "None",
+            "blockers": s["blockers"].sample(rng),
+            "tech_stack": s["tech_stack"].sample(rng),
+            "integration_complexity": s["integration_complexity"].sample(rng),
+            "technical_requirements": s["technical_requirements"].sample(rng),
+            "budget_freeze": rng.random() < self.distributions["budget_freeze"],
+            "recent_layoffs": rng.random() < self.distributions["recent_layoffs"],
+            "competitor_relationship": bool(competitors) and rng.random() < self.distributions["competitor_relationship"],
+            "has_champion": has_champion,
+            "deal_size": int(round(deal_basis * s["deal_to_budget"].sample(rng), -3)),
+            "timeline": s["timeline"].sample(rng),
+            "implementation_complexity": s["implementation_complexity"].sample(rng),
+            "stakeholders": stakeholders,
+        }
+
+    def _near_duplicate(self, original: dict) -> dict:
+        """The same company as re-entered in a CRM: one or two fields differ slightly."""
+        rng = self._rng
+        lead = _copy_lead(original)
+        for field in rng.sample(_NEAR_DUPLICATE_FIELDS, rng.randint(1, 2)):
+            if field == "company_name":
+                lead[field] = _respell(rng, lead[field])
+            elif field == "budget":
+                lead[field] = int(round(lead[field] * rng.uniform(0.95, 1.05), -3))
+            elif field == "timeline":
+                lead[field] = lead[field].upper() if rng.random() < 0.5 else lead[field] + "."
+            elif len(lead[field]) > 1:
+                rng.shuffle(lead[field])
+            else:
+                lead["company_name"] = _respell(rng, lead["company_name"])
+        return lead
+
+
+def merge_distributions(overrides: dict = None) -> dict:
+    """DEFAULT_DISTRIBUTIONS with `overrides` applied (see LeadGenerator)."""
+    distributions = dict(DEFAULT_DISTRIBUTIONS)
+    for field, spec in (overrides or {}).items():
+        if field not in DEFAULT_DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution {field!r}; known: {', '.join(DEFAULT_DISTRIBUTIONS)}")
+        default = DEFAULT_DISTRIBUTIONS[field]
+        if isinstance(default, dict) and ("median" in default or "values" in default):
+            spec = {**default, **spec}
+        distributions[field] = spec
+    return distributions
+
+
+class _ListSampler:
+    __slots__ = ("count", "values")
+
+    def __init__(self, spec: dict):
+        self.count = _Weighted({int(n): weight for n, weight in spec["count"].items()})
+        self.values = _Weighted(spec["values"])
+
+    def sample(self, rng: random.Random) -> list:
+        return self.values.sample_distinct(rng, self.count.sample(rng))
+
+
+def _sampler(spec):
+    if not isinstance(spec, dict):
+        return None  # flag probability, used directly
+    if "median" in spec:
+        return _LogNormal(spec)
+    if "values" in spec:
+        return _ListSampler(spec)
+    return _Weighted(spec)
+
+
+def _person(rng: random.Random) -> str:
+    return f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+
+
+def _respell(rng: random.Random, name: str) -> str:
+    """Company name variant: legal form dropped or punctuated, or different casing."""
+    base, _, form = name.rpartition(" ")
+    variant = rng.randrange(3)
+    if not base:
+        return f"{name} Inc" if variant < 2 else name.upper()
+    if variant == 0:
+        return base
+    if variant == 1:
+        return f"{base} {form}."
+    return name.upper()
+
+
+def _copy_lead(lead: dict) -> dict:
+    return {key: list(value) if type(value) is list else value for key, value in lead.items()}
@@ -0,0 +1,233 @@
+"""Streaming lead readers and result writers (CSV / JSONL, optionally gzipped)."""
+
+import csv
+import gzip
+import json
+import sys
+from .models import FIELDS, FLAG_FIELDS, LIST_FIELDS, NUMERIC_FIELDS
+
+FORMATS = ["jsonl", "csv"]
+
+
+def detect_format(path: str) -> str:
+    """File format from the extension (a trailing .gz is ignored)."""
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of {path!r}; use .csv or .jsonl (optionally .gz)")
+
+
+def _open_text(path: str, mode: str):
+    if path == "-":
+        return sys.stdin if mode == "r" else sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def iter_leads(path: str, fmt: str = None, on_error=None):
+    """
+    Yield lead dicts one at a time, so the file is never loaded whole.
+    JSONL: one JSON object per line. CSV: one lead per row, see parse_csv_row().
+    A row that cannot be parsed raises ValueError naming its line; with
+    `on_error` it is skipped instead and reported as on_error(line, error),
+    so one bad record does not stop a long stream (see SkippedRows).
+    """
+    fmt = fmt or detect_format(path)
+    f = _open_text(path, "r")
+    try:
+        if fmt == "jsonl":
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    lead = json.loads(line)
+                    if not isinstance(lead, dict):
+                        raise ValueError(f"expected a JSON object, got {type(lead).__name__}")
+                except ValueError as e:
+                    _bad_row(line_number, e, on_error)
+                    continue
+                yield lead
+        else:
+            reader = csv.DictReader(f)
+            while True:
+                try:
+                    row = next(reader)
+                except StopIteration:
+                    break
+                except csv.Error as e:
+                    _bad_row(reader.line_num, e, on_error)
+                    continue
+                try:
+                    lead = parse_csv_row(row)
+                except ValueError as e:
+                    _bad_row(reader.line_num, e, on_error)
+                    continue
+                yield lead
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _bad_row(line_number: int, error: Exception, on_error):
+    if on_error is None:
+        raise ValueError(f"Line {line_number}: {error}") from error
+    on_error(line_number, error)
+
+
+class SkippedRows:
+    """iter_leads() on_error handler: warns on stderr about each skipped row and counts them."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+
+    def __call__(self, line_number: int, error: Exception):
+        self.count += 1
+        print(f"Skipping line {line_number} of {self.path}: {error}", file=sys.stderr)
+
+
+def parse_csv_row(row: dict) -> dict:
+    """
+    Turn CSV strings into the lead dict types. Empty cells are left out so the
+    agents apply their defaults. List fields take a JSON array or `;`-separated
+    values; flags take true/false, yes/no or 1/0. Raises ValueError naming
+    the field for a cell that does not parse.
+    """
+    lead = {}
+    for key, value in row.items():
+        if key is None or value is None:
+            continue
+        value = value.strip()
+        try:
+            if key in LIST_FIELDS:
+                if value.startswith("["):
+                    items = json.loads(value)
+                    if not isinstance(items, list):
+                        raise ValueError("not a JSON array")
+                    lead[key] = items
+                else:
+                    lead[key] = [item.strip() for item in value.split(";") if item.strip()]
+            elif value == "":
+                continue
+            elif key in NUMERIC_FIELDS:
+                number = float(value.replace(",", "").lstrip("$"))
+                lead[key] = int(number) if number.is_integer() else number
+            elif key in FLAG_FIELDS:
+                lead[key] = value.lower() in ["true", "yes", "1", "y"]
+            else:
+                lead[key] = value
+        except ValueError as e:
+            raise ValueError(f"bad {key} value {value!r} ({e})") from e
+    return lead
+
+
+def format_csv_row(lead: dict) -> dict:
+    """Lead dict as CSV cells, the inverse of parse_csv_row(): lists `;`-joined, flags true/false."""
+    row = {}
+    for key, value in lead.items():
+        if key in LIST_FIELDS:
+            row[key] = ";".join(value)
+        elif key in FLAG_FIELDS:
+            row[key] = "true" if value else "false"
+        else:
+            row[key] = value
+    return row
+
+
+class LeadWriter:
+    """
+    Writes lead dicts one at a time (JSONL, or CSV with one column per
+    known field), so generated or exported lead sets are never held whole.
+    """
+
+    def __init__(self, path: str, fmt: str = None, flush_every: int = 1000):
+        self.path = path
+        self.fmt = fmt or ("jsonl" if path == "-" else detect_format(path))
+        self.flush_every = flush_every
+        self.count = 0
+        self._file = _open_text(path, "w")
+        self._csv = None
+        if self.fmt == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=FIELDS, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def write(self, lead: dict):
+        if self._csv is not None:
+            self._csv.writerow(format_csv_row(lead))
+        else:
+            self._file.write(json.dumps(lead) + "\n")
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self):
+        if self._file is sys.stdout:
+            self._file.flush()
+        else:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ResultWriter:
+    """
+    Writes qualification results as they arrive.
+    JSONL keeps the full result; CSV keeps one summary row per lead with
+    each agent's score (agent columns come from `stages`).
+    """
+
+    def __init__(self, path: str, stages: list, fmt: str = None, flush_every: int = 100):
+        self.path = path
+        self.fmt = fmt or ("jsonl" if path == "-" else detect_format(path))
+        self.flush_every = flush_every
+        self.count = 0
+        self._file = _open_text(path, "w")
+        self._csv = None
+        if self.fmt == "csv":
+            agent_names = [agent.name for stage in stages for agent in stage.agents]
+            self._columns = ["index", "company_name", "final_decision", "rejected_at_stage", "summary"] + agent_names
+            self._csv = csv.DictWriter(self._file, fieldnames=self._columns)
+            self._csv.writeheader()
+
+    def write(self, index: int, lead_data, result: dict):
+        """Append one lead's result."""
+        if self._csv is not None:
+            row = {
+                "index": index,
+                "company_name": lead_data.get("company_name", ""),
+                "final_decision": result["final_decision"],
+                "rejected_at_stage": result.get("rejected_at_stage") or "",
+                "summary": result["summary"],
+            }
+            for stage_result in result["stage_results"]:
+                for agent_result in stage_result["agent_results"]:
+                    score = agent_result.get("score")
+                    row[agent_result["agent"]] = "" if score is None else score
+            self._csv.writerow(row)
+        else:
+            record = {"index": index, "company_name": lead_data.get("company_name"), **result}
+            self._file.write(json.dumps(record, default=str) + "\n")
+
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self):
+        if self._file is sys.stdout:
+            self._file.flush()
+        else:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
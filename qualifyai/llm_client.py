@@ -1,43 +1,766 @@
 """LLM Client for OpenAI API calls."""
 
+import asyncio
+import contextlib
+import contextvars
+import json
 import os
+import time
+import httpx
 import yaml
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, RateLimitError
+from .cache import DEFAULT_CACHE_CONFIG, ResponseCache, make_cache_key
+from .cassette import DEFAULT_CASSETTE_CONFIG, Cassette
+from .hedging import DEFAULT_HEDGING_CONFIG, Hedger
+from . import metrics
+from .scheduler import DEFAULT_RATE_LIMIT_CONFIG, RateScheduler, estimate_tokens
+from .singleflight import SingleFlight
+from .token_budget import DEFAULT_TOKEN_BUDGET_CONFIG, TokenBudget
+from .tracing import DEFAULT_TRACING_CONFIG, NOOP_SPAN, Tracer
+from .usage import UsageTracker
 
 # Get absolute path to config (works from any directory)
 _THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 _PROJECT_ROOT = os.path.dirname(_THIS_DIR)
 CONFIG_PATH = os.path.join(_PROJECT_ROOT, "cfg", "config.yml")
 
+# Defaults for the `llm` section of config.yml
+DEFAULT_LLM_CONFIG = {
+    "model": "gpt-4o-mini",
+    "base_url": None,
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,
+    "connect_timeout": 10.0,
+    "warmup_connections": 0,
+    "coalesce_requests": True,
+}
+
+
 def load_config():
     """Load configuration from config.yml."""
     with open(CONFIG_PATH, "r") as f:
         return yaml.safe_load(f)
 
+
+class LLMClientManager:
+    """
+    Process-wide owner of the config and the OpenAI client.
+    Config is read once (use reload() to pick up edits) and all calls share
+    one AsyncOpenAI client on top of a keep-alive HTTP connection pool.
+    """
+
+    def __init__(self):
+        self._config = None
+        self._client = None
+        self._http_client = None
+        self._loop = None
+        self._cache = None
+        self._scheduler = None
+        self._hedger = None
+        self._tracer = None
+        self._cassette = None
+        self._token_budget = None
+        self._recordings = set()  # calls a cassette is waiting for (see keep_recording)
+        self.single_flight = SingleFlight()
+        self.usage = UsageTracker()
+
+    @property
+    def config(self) -> dict:
+        """Full config.yml contents, loaded on first access."""
+        if self._config is None:
+            self._config = load_config() or {}
+        return self._config
+
+    @property
+    def llm_config(self) -> dict:
+        """`llm` section of the config merged over the defaults."""
+        return {**DEFAULT_LLM_CONFIG, **(self.config.get("llm") or {})}
+
+    @property
+    def cache(self):
+        """Shared ResponseCache, or None when caching is disabled."""
+        if self._cache is None:
+            cfg = {**DEFAULT_CACHE_CONFIG, **(self.config.get("cache") or {})}
+            if not cfg["enabled"]:
+                return None
+            path = cfg["path"]
+            if path and not os.path.isabs(path):
+                path = os.path.join(_PROJECT_ROOT, path)
+            self._cache = ResponseCache(
+                path=path or None,
+                ttl_seconds=cfg["ttl_seconds"],
+                memory_max_entries=cfg["memory_max_entries"],
+                disk_max_entries=cfg["disk_max_entries"],
+            )
+        return self._cache
+
+    @property
+    def rate_limit_config(self) -> dict:
+        """`rate_limits` section of the config merged over the defaults."""
+        return {**DEFAULT_RATE_LIMIT_CONFIG, **(self.config.get("rate_limits") or {})}
+
+    @property
+    def scheduler(self):
+        """Shared RateScheduler, or None when rate limiting is disabled."""
+        if self._scheduler is None:
+            cfg = self.rate_limit_config
+            if not cfg["enabled"]:
+                return None
+            self._scheduler = RateScheduler(
+                requests_per_minute=cfg["requests_per_minute"],
+                tokens_per_minute=cfg["tokens_per_minute"],
+                burst_seconds=cfg["burst_seconds"],
+            )
+        return self._scheduler
+
+    @property
+    def hedger(self):
+        """Shared Hedger, or None when hedging is disabled."""
+        if self._hedger is None:
+            cfg = {**DEFAULT_HEDGING_CONFIG, **(self.config.get("hedging") or {})}
+            if not cfg["enabled"]:
+                return None
+            self._hedger = Hedger(
+                percentile=cfg["percentile"],
+                min_samples=cfg["min_samples"],
+                window=cfg["window"],
+                min_delay_ms=cfg["min_delay_ms"],
+                budget=cfg["budget"],
+            )
+        return self._hedger
+
+    @property
+    def tracer(self):
+        """Shared Tracer, or None when tracing is disabled."""
+        if self._tracer is None:
+            cfg = {**DEFAULT_TRACING_CONFIG, **(self.config.get("tracing") or {})}
+            if not cfg["enabled"]:
+                return None
+            path = cfg["path"]
+            if not os.path.isabs(path):
+                path = os.path.join(_PROJECT_ROOT, path)
+            self._tracer = Tracer(path)
+        return self._tracer
+
+    @property
+    def cassette(self):
+        """Shared Cassette for recording / replaying responses, or None when off."""
+        if self._cassette is None:
+            cfg = {**DEFAULT_CASSETTE_CONFIG, **(self.config.get("cassette") or {})}
+            if cfg["mode"] == "off":
+                return None
+            path = cfg["path"]
+            if not os.path.isabs(path):
+                path = os.path.join(_PROJECT_ROOT, path)
+            self._cassette = Cassette(path, cfg["mode"], cfg["on_miss"], cfg["latency"])
+        return self._cassette
+
+    @property
+    def token_budget(self):
+        """Shared TokenBudget (learned max_tokens per agent), or None when disabled."""
+        if self._token_budget is None:
+            cfg = {**DEFAULT_TOKEN_BUDGET_CONFIG, **(self.config.get("token_budget") or {})}
+            if not cfg["enabled"]:
+                return None
+            self._token_budget = TokenBudget(
+                percentile=cfg["percentile"],
+                headroom=cfg["headroom"],
+                min_samples=cfg["min_samples"],
+                window=cfg["window"],
+                min_tokens=cfg["min_tokens"],
+            )
+        return self._token_budget
+
+    def get_client(self) -> AsyncOpenAI:
+        """Shared client, created on first use in the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # Pooled connections are bound to the loop that opened them
+            self._client = self._build_client()
+            self._loop = loop
+        return self._client
+
+    def _build_client(self) -> AsyncOpenAI:
+        cfg = self.llm_config
+        limits = httpx.Limits(
+            max_connections=cfg["max_connections"],
+            max_keepalive_connections=cfg["max_keepalive_connections"],
+            keepalive_expiry=cfg["keepalive_expiry"],
+        )
+        timeout = httpx.Timeout(600.0, connect=cfg["connect_timeout"])
+        self._http_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+        return AsyncOpenAI(api_key=self.config["openai_api_key"], base_url=cfg["base_url"],
+                           http_client=self._http_client)
+
+    async def warmup(self, connections: int = None):
+        """
+        Open connections ahead of the first real request so it does not pay
+        for DNS + TCP + TLS setup. Defaults to llm.warmup_connections.
+        """
+        if connections is None:
+            connections = self.llm_config["warmup_connections"]
+        if connections <= 0:
+            return
+        client = self.get_client()
+        # Any response (even an auth error) leaves a live connection in the pool
+        await asyncio.gather(*[client.models.list() for _ in range(connections)], return_exceptions=True)
+
+    async def reload(self):
+        """Re-read config.yml and rebuild the client on next use."""
+        await self.aclose()
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+        self._scheduler = None
+        self._hedger = None
+        self._token_budget = None
+        if self._tracer is not None:
+            self._tracer.close()
+            self._tracer = None
+        if self._cassette is not None:
+            self._cassette.close()
+            self._cassette = None
+        self._config = load_config() or {}
+
+    def keep_recording(self, coroutine) -> asyncio.Task:
+        """
+        Run a call whose answer goes on the cassette as a task of its own,
+        which outlives a cancelled caller; aclose() waits for it.
+        """
+        task = asyncio.ensure_future(coroutine)
+        self._recordings.add(task)
+        task.add_done_callback(self._recordings.discard)
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())  # errors go to the caller, if any
+        return task
+
+    async def aclose(self):
+        """Close pooled connections (and flush a cassette being recorded). Safe to call more than once."""
+        if self._recordings:
+            await asyncio.gather(*self._recordings, return_exceptions=True)
+        if self._cassette is not None:
+            self._cassette.close()
+        client = self._client
+        self._client = None
+        self._http_client = None
+        self._loop = None
+        if client is not None:
+            await client.close()
+
+
+_manager = LLMClientManager()
+
+# Counter for provider calls made by the current task (see count_llm_calls)
+_call_counter = contextvars.ContextVar("qualifyai_llm_call_counter", default=None)
+
+
+class LLMCallCounter:
+    """Number of provider calls (cache misses) made under count_llm_calls()."""
+
+    def __init__(self):
+        self.calls = 0
+
+
+def count_llm_calls(counter: LLMCallCounter):
+    """
+    Count provider calls made by the current task, and tasks it creates
+    afterwards, into `counter`. Call at the start of a task's coroutine.
+    """
+    _call_counter.set(counter)
+
+
+class LLMTimeoutError(Exception):
+    """An LLM call did not finish within the lead's time budget (see time_budget)."""
+
+
+# Absolute time.monotonic() by which the current lead must be done (see time_budget)
+_deadline = contextvars.ContextVar("qualifyai_deadline", default=None)
+
+
+@contextlib.contextmanager
+def time_budget(seconds: float = None):
+    """
+    Give everything run inside the block (and tasks it creates) at most
+    `seconds`; LLM calls then time out with what is left of the budget.
+    Nested budgets never extend an outer one. None means no limit.
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def clear_time_budget():
+    """Drop the budget for the current task, e.g. for work shared by several leads."""
+    _deadline.set(None)
+
+
+def remaining_time():
+    """Seconds left in the current time budget, or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+async def with_time_budget(awaitable):
+    """Await within the remaining time budget, raising LLMTimeoutError when it runs out."""
+    remaining = remaining_time()
+    if remaining is None:
+        return await awaitable
+    if remaining <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        elif asyncio.isfuture(awaitable):
+            awaitable.cancel()
+        metrics.ERRORS.inc("timeout")
+        raise LLMTimeoutError("Deadline exceeded before the LLM call was made")
+    try:
+        return await asyncio.wait_for(awaitable, remaining)
+    except asyncio.TimeoutError:
+        metrics.ERRORS.inc("timeout")
+        raise LLMTimeoutError(f"LLM call did not finish within the remaining {remaining:.1f}s of the deadline") from None
+
+
+def trace_span(name: str, kind: str, **attributes):
+    """
+    Context manager for a span around a block (see tracing.py); yields a
+    no-op span when tracing is disabled.
+    """
+    tracer = _manager.tracer
+    if tracer is None:
+        return contextlib.nullcontext(NOOP_SPAN)
+    return tracer.span(name, kind, **attributes)
+
+
+def enable_tracing(path: str = None):
+    """Turn span tracing on for this process, optionally writing to `path`."""
+    config = _manager.config
+    config["tracing"] = {**(config.get("tracing") or {}), **({"path": path} if path else {}), "enabled": True}
+    if _manager._tracer is not None:
+        _manager._tracer.close()
+        _manager._tracer = None
+
+
+def use_cassette(path: str = None, mode: str = "replay", on_miss: str = None, latency=None):
+    """
+    Record or replay LLM responses for this process (see cassette.py);
+    arguments left as None keep their `cassette` config values.
+    """
+    config = _manager.config
+    overrides = {"path": path, "on_miss": on_miss, "latency": latency}
+    config["cassette"] = {**(config.get("cassette") or {}),
+                          **{key: value for key, value in overrides.items() if value is not None}, "mode": mode}
+    if _manager._cassette is not None:
+        _manager._cassette.close()
+        _manager._cassette = None
+
+
+def get_client_manager() -> LLMClientManager:
+    """Process-wide client manager."""
+    return _manager
+
+
 def get_llm_client():
-    """configured OpenAI async client"""
-    config = load_config()
-    return AsyncOpenAI(api_key=config["openai_api_key"])
+    """configured OpenAI async client (shared across calls)"""
+    return _manager.get_client()
+
 
-async def call_llm(prompt: str, system_prompt: str = None, json_mode: bool = False) -> str:
-    """Make an async call to the LLM and return the response text."""
-    client = get_llm_client()
+# Responses supplied up front, e.g. from an offline batch (see use_prefilled_responses)
+_prefilled_responses = contextvars.ContextVar("qualifyai_prefilled_responses", default=None)
 
+
+def use_prefilled_responses(responses: dict):
+    """
+    Answer call_llm() requests whose request_key() is in `responses` from that
+    dict instead of the API, for the current task and tasks it creates.
+    """
+    return _prefilled_responses.set(responses)
+
+
+def add_prefilled_responses(responses: dict):
+    """use_prefilled_responses(), keeping any responses already prefilled in this context."""
+    current = _prefilled_responses.get()
+    return _prefilled_responses.set({**current, **responses} if current else responses)
+
+
+def using_prefilled_responses() -> bool:
+    """True inside a use_prefilled_responses() context."""
+    return _prefilled_responses.get() is not None
+
+
+def build_request(prompt: str, system_prompt: str = None, json_mode: bool = False, max_tokens: int = 1000,
+                  json_schema: dict = None) -> dict:
+    """
+    chat.completions.create() parameters for a call_llm() request.
+    `json_schema` (a response_format json_schema object) implies json_mode.
+    """
     messages = []
     if system_prompt:
         messages.append({"role": "system", "content": system_prompt})
     messages.append({"role": "user", "content": prompt})
 
     params = {
-        "model": "gpt-4o-mini",
+        "model": _manager.llm_config["model"],
         "messages": messages,
         "temperature": 0.1,
-        "max_tokens": 1000
+        "max_tokens": max_tokens
     }
 
-    if json_mode:
+    if json_schema:
+        params["response_format"] = {"type": "json_schema", "json_schema": json_schema}
+    elif json_mode:
         params["response_format"] = {"type": "json_object"}
 
-    response = await client.chat.completions.create(**params)
+    return params
+
+
+def build_call_request(prompt: str, system_prompt: str = None, json_mode: bool = False, agent: str = None,
+                       prompt_version: str = None, max_tokens: int = 1000, json_schema: dict = None) -> dict:
+    """build_request() for call_llm()'s keyword arguments (`agent` and `prompt_version` are not sent)."""
+    return build_request(prompt, system_prompt, json_mode, max_tokens, json_schema)
+
+
+def request_key(params: dict) -> str:
+    """Content hash identifying a request built by build_request()."""
+    messages = params["messages"]
+    system_prompt = messages[0]["content"] if messages[0]["role"] == "system" else None
+    response_format = params.get("response_format") or {}
+    return make_cache_key(params["model"], system_prompt, messages[-1]["content"], params["temperature"],
+                          params["max_tokens"], bool(response_format), response_format.get("json_schema"))
+
+
+async def call_llm(prompt: str, system_prompt: str = None, json_mode: bool = False,
+                   agent: str = None, prompt_version: str = None, max_tokens: int = 1000,
+                   json_schema: dict = None) -> str:
+    """
+    Make an async call to the LLM and return the response text.
+    Identical requests are served from the response cache. `agent` and
+    `prompt_version` tag cache entries so a prompt change invalidates them.
+    With a cassette (`cassette:` in config.yml) responses are recorded or
+    replayed. `max_tokens` is an upper bound: the token budget may send a
+    lower, learned cap, retrying once with `max_tokens` if that cuts the
+    answer off. Inside a time_budget() the call raises LLMTimeoutError once
+    it runs out.
+    """
+    params = build_request(prompt, system_prompt, json_mode, max_tokens, json_schema)
+    json_mode = json_mode or bool(json_schema)
+    key = request_key(params)
+
+    with trace_span(agent or "llm", "llm", agent=agent, prompt_version=prompt_version) as span:
+        start = time.perf_counter()
+        answer = await _answer_without_call(key, agent, prompt_version, span)
+        if answer is not None:
+            return answer
+        cache = _manager.cache
+        cassette = _manager.cassette
+        span.set(cache_hit=False)
+        sent = False  # whether this caller's own fetch ran (False when coalesced onto another)
+
+        async def create(request: dict):
+            return await _create_completion(request, prompt, system_prompt, agent, span)
+
+        async def fetch():
+            nonlocal sent
+            sent = True
+            budget = _manager.token_budget
+            if budget is None:
+                response = await create(params)
+            else:
+                cap = budget.cap(agent, max_tokens)
+                response = await create({**params, "max_tokens": cap} if cap < max_tokens else params)
+                if cap < max_tokens and response.choices[0].finish_reason == "length":
+                    # Cut off by the learned cap: pay for the partial answer, retry at the full allowance
+                    _record_usage(agent, span, getattr(response, "usage", None))
+                    budget.record_truncation(agent, max_tokens)
+                    metrics.ERRORS.inc("truncated")
+                    span.set(truncated_at=cap)
+                    response = await create(params)
+                usage = getattr(response, "usage", None)
+                if usage is not None and usage.completion_tokens is not None:
+                    budget.record(agent, max_tokens, usage.completion_tokens)
+            _record_usage(agent, span, getattr(response, "usage", None))
+            content = response.choices[0].message.content
+            if cache is not None and content is not None and _is_cacheable(content, json_mode):
+                await cache.set(key, content, agent)
+            return content
+
+        # Identical requests already in flight share that call
+        if _manager.llm_config["coalesce_requests"]:
+            call = _manager.single_flight.do(key, fetch)
+        else:
+            call = fetch()
+        if cassette is not None and (remaining_time() is None or remaining_time() > 0):
+            # Recorded even if this caller is cancelled (e.g. stage early exit) before the answer
+            # arrives: a replay in which the call gets further must find it on the cassette
+            recording = _manager.keep_recording(_record_answer(call, cassette, key, agent, start))
+            content = await with_time_budget(asyncio.shield(recording))
+        else:
+            content = await with_time_budget(call)
+        source = "api" if sent else "coalesced"
+        span.set(source=source)
+        metrics.LLM_REQUESTS.inc(agent or "unknown", source)
+        return content
+
+
+async def _record_answer(call, cassette: Cassette, key: str, agent: str, start: float) -> str:
+    """Await a provider call and record its answer on `cassette`."""
+    content = await call
+    cassette.record(key, content, agent, (time.perf_counter() - start) * 1000)
+    return content
+
+
+async def lookup_response(prompt: str, system_prompt: str = None, json_mode: bool = False,
+                          agent: str = None, prompt_version: str = None, max_tokens: int = 1000,
+                          json_schema: dict = None):
+    """
+    call_llm()'s answer if it needs no provider call (prefilled, replayed or
+    cached), recorded like one; None otherwise. Takes call_llm()'s arguments.
+    """
+    params = build_request(prompt, system_prompt, json_mode, max_tokens, json_schema)
+    tracer = _manager.tracer
+    span = tracer.start_span(agent or "llm", "llm", agent=agent, prompt_version=prompt_version) if tracer else NOOP_SPAN
+    answer = await _answer_without_call(request_key(params), agent, prompt_version, span)
+    if answer is not None and tracer:
+        tracer.end_span(span)
+    return answer
+
+
+async def store_response(key: str, content: str, agent: str = None, json_mode: bool = False):
+    """
+    Keep an answer obtained without its own call (e.g. split out of a batched
+    request) under `key`: in the response cache and a cassette being recorded.
+    """
+    cassette = _manager.cassette
+    if cassette is not None:
+        cassette.record(key, content, agent)
+    cache = _manager.cache
+    if cache is not None and _is_cacheable(content, json_mode):
+        await cache.set(key, content, agent)
+
+
+async def _answer_without_call(key: str, agent: str, prompt_version: str, span):
+    """Prefilled, replayed or cached answer for `key` (recorded on `span` and in the metrics), or None."""
+    prefilled = _prefilled_responses.get()
+    if prefilled is not None and key in prefilled:
+        span.set(source="prefilled")
+        metrics.LLM_REQUESTS.inc(agent or "unknown", "prefilled")
+        return prefilled[key]
+
+    cassette = _manager.cassette
+    if cassette is not None and cassette.replaying:
+        replayed = await cassette.replay(key)
+        if replayed is not None:
+            span.set(source="cassette")
+            metrics.LLM_REQUESTS.inc(agent or "unknown", "cassette")
+            return replayed
+
+    cache = _manager.cache
+    if cache is not None:
+        if agent and prompt_version:
+            await cache.sync_template(agent, prompt_version)
+        cached = await cache.get(key)
+        if cached is not None:
+            span.set(source="cache", cache_hit=True)
+            metrics.LLM_REQUESTS.inc(agent or "unknown", "cache")
+            if cassette is not None:
+                cassette.record(key, cached, agent)
+            return cached
+    return None
+
+
+async def stream_llm(prompt: str, system_prompt: str = None, json_mode: bool = False,
+                     agent: str = None, prompt_version: str = None, max_tokens: int = 1000):
+    """
+    call_llm() as an async iterator over the response text while it is
+    generated. Prefilled, replayed and cached responses arrive as a single chunk, and a
+    stream that runs to completion is cached like a call_llm() response.
+    Streams are not coalesced or hedged, and always ask for the full
+    `max_tokens` (text already yielded could not be retried after a cut-off
+    at a learned cap). Inside a time_budget() every chunk
+    must arrive within what is left of it.
+    """
+    params = build_request(prompt, system_prompt, json_mode, max_tokens)
+    key = request_key(params)
+
+    prefilled = _prefilled_responses.get()
+    if prefilled is not None and key in prefilled:
+        yield prefilled[key]
+        return
+
+    cassette = _manager.cassette
+    if cassette is not None and cassette.replaying:
+        replayed = await cassette.replay(key)
+        if replayed is not None:
+            yield replayed
+            return
+    start = time.perf_counter()
+
+    cache = _manager.cache
+    if cache is not None:
+        if agent and prompt_version:
+            await cache.sync_template(agent, prompt_version)
+        cached = await cache.get(key)
+        if cached is not None:
+            if cassette is not None:
+                cassette.record(key, cached, agent)
+            yield cached
+            return
+
+    # Not made current: the stream may be finished by another task (see agents._finish_playbook)
+    tracer = _manager.tracer
+    span = tracer.start_span(agent or "llm", "llm", agent=agent, prompt_version=prompt_version,
+                             source="api", cache_hit=False, stream=True) if tracer else NOOP_SPAN
+    status = "error"
+    parts = []
+    usage = None
+    try:
+        stream = await with_time_budget(_create_completion(
+            params, prompt, system_prompt, agent, span, stream=True, stream_options={"include_usage": True}
+        ))
+        chunks = stream.__aiter__()
+        try:
+            while True:
+                try:
+                    chunk = await with_time_budget(chunks.__anext__())
+                except StopAsyncIteration:
+                    break
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage  # last chunk, with include_usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        finally:
+            if usage is None and hasattr(stream, "close"):
+                await stream.close()  # abandoned early: free the connection
+        status = "ok"
+    except (asyncio.CancelledError, GeneratorExit):
+        status = "cancelled"
+        raise
+    finally:
+        _record_usage(agent, span, usage)
+        if tracer:
+            tracer.end_span(span, status)
+
+    metrics.LLM_REQUESTS.inc(agent or "unknown", "api")
+    scheduler = _manager.scheduler
+    if scheduler is not None and usage is not None:
+        scheduler.settle(estimate_tokens(prompt, system_prompt, max_tokens), usage.total_tokens)
+
+    content = "".join(parts)
+    if cassette is not None:
+        cassette.record(key, content, agent, (time.perf_counter() - start) * 1000)
+    if cache is not None and _is_cacheable(content, json_mode):
+        await cache.set(key, content, agent)
+
+
+async def _create_completion(params: dict, prompt: str, system_prompt: str, agent: str = None, span=NOOP_SPAN,
+                             **options):
+    """
+    Send the request once the rate scheduler grants a slot. A 429 that
+    survives the client's own retries pauses the whole queue and is retried.
+    `options` go to chat.completions.create() as well (e.g. stream=True).
+    Scheduler queue wait and provider latency are recorded on `span` (and
+    the latency in the metrics, under `agent`).
+    """
+    counter = _call_counter.get()
+    if counter is not None:
+        counter.calls += 1
+
+    scheduler = _manager.scheduler
+    if scheduler is None:
+        return await _send(params, agent, span, **options)
+
+    estimate = estimate_tokens(prompt, system_prompt, params["max_tokens"])
+    retries = _manager.rate_limit_config["max_429_retries"]
+    for attempt in range(retries + 1):
+        queued = time.perf_counter()
+        await scheduler.acquire(estimate)
+        span.add("queue_wait_ms", round((time.perf_counter() - queued) * 1000, 3))
+        try:
+            response = await _send(params, agent, span, estimate, **options)
+        except RateLimitError as e:
+            if attempt == retries:
+                raise
+            scheduler.settle(estimate, 0)  # nothing was spent
+            scheduler.pause(_retry_after(e, attempt))
+            continue
+        usage = getattr(response, "usage", None)
+        scheduler.settle(estimate, usage.total_tokens if usage else None)
+        return response
+
+
+async def _send(params: dict, agent: str, span, estimate: int = None, **options):
+    """
+    _timed_create(), hedged when hedging is on (streams are not). The caller
+    already holds a rate-limit slot (`estimate` tokens); a hedge is sent only
+    if the scheduler has a free slot for it right now, and settles its own.
+    """
+    hedger = _manager.hedger
+    if hedger is None or options.get("stream"):
+        return await _timed_create(params, agent, span, **options)
+    scheduler = _manager.scheduler
+    if scheduler is None:
+        return await hedger.run(agent, lambda: _timed_create(params, agent, span, **options))
+
+    async def duplicate():
+        try:
+            response = await _timed_create(params, agent, span, **options)
+        except Exception:
+            scheduler.settle(estimate, 0)  # nothing was spent
+            raise
+        usage = getattr(response, "usage", None)
+        scheduler.settle(estimate, usage.total_tokens if usage else None)
+        return response
+
+    return await hedger.run(agent, lambda: _timed_create(params, agent, span, **options), duplicate,
+                            lambda: scheduler.try_acquire(estimate))
+
+
+async def _timed_create(params: dict, agent: str, span, **options):
+    """chat.completions.create() with its latency (to the response, or the stream's start) recorded."""
+    start = time.perf_counter()
+    try:
+        response = await get_llm_client().chat.completions.create(**params, **options)
+    except RateLimitError:
+        metrics.ERRORS.inc("rate_limit")
+        raise
+    elapsed = time.perf_counter() - start
+    span.set(latency_ms=round(elapsed * 1000, 3))
+    metrics.LLM_SECONDS.observe(elapsed, agent or "unknown")
+    return response
+
+
+def _record_usage(agent: str, span, usage):
+    """Token counts of a response's `usage` block, per agent and on `span`."""
+    _manager.usage.record_usage(agent, usage)
+    metrics.record_usage(agent, usage)
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    span.add("prompt_tokens", usage.prompt_tokens or 0)
+    span.add("cached_prompt_tokens", getattr(details, "cached_tokens", None) or 0)
+    span.add("completion_tokens", usage.completion_tokens or 0)
+
+
+def _retry_after(error: RateLimitError, attempt: int) -> float:
+    """Seconds to back off: the provider's Retry-After, else exponential."""
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return min(2.0 ** attempt, 30.0)
+
 
-    return response.choices[0].message.content
+def _is_cacheable(content: str, json_mode: bool) -> bool:
+    """Never cache malformed JSON, it would make a one-off failure sticky."""
+    if not json_mode:
+        return True
+    try:
+        json.loads(content)
+        return True
+    except ValueError:
+        return False
@@ -0,0 +1,222 @@
+"""
+In-process metrics: counters and latency histograms for the pipeline,
+stages, agents and LLM calls, readable with METRICS.snapshot() and
+exportable in the Prometheus text format (optionally over a local HTTP
+endpoint, see serve_metrics).
+
+Recording is meant for the hot path: a counter increment is a dict update,
+and a histogram observation is a bisect over fixed bucket bounds plus two
+additions. Metrics are kept per label-value tuple; there is no locking, the
+exporter thread reads copies.
+"""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets (seconds), from cache hits to long playbooks
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Counter:
+    """Monotonic count per combination of label values."""
+
+    def __init__(self, name: str, description: str, labelnames: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # label values tuple -> count
+
+    def inc(self, *labelvalues, amount: float = 1):
+        """Add `amount` for the given label values (positional, in labelnames order)."""
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def samples(self) -> list:
+        """[(suffix, labels dict, value)] for exposition."""
+        return [("", dict(zip(self.labelnames, key)), value) for key, value in dict(self._values).items()]
+
+    def snapshot(self) -> dict:
+        return {_label_text(self.labelnames, key): value for key, value in dict(self._values).items()}
+
+    def reset(self):
+        self._values.clear()
+
+
+class Histogram:
+    """Distribution of observed values in fixed buckets, per combination of label values."""
+
+    def __init__(self, name: str, description: str, labelnames: tuple = (), buckets: tuple = DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values tuple -> [bucket counts (+ overflow), sum, count]
+
+    def observe(self, value: float, *labelvalues):
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self) -> list:
+        samples = []
+        for key, (counts, total, count) in dict(self._series).items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), list(counts)):
+                cumulative += n
+                samples.append(("_bucket", {**labels, "le": _format_bound(bound)}, cumulative))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, count))
+        return samples
+
+    def snapshot(self) -> dict:
+        """Count, mean and approximate percentiles (bucket upper bounds) per label set."""
+        snapshot = {}
+        for key, (counts, total, count) in dict(self._series).items():
+            snapshot[_label_text(self.labelnames, key)] = {
+                "count": count,
+                "mean": total / count if count else 0.0,
+                "p50": self._quantile(counts, count, 0.50),
+                "p95": self._quantile(counts, count, 0.95),
+                "p99": self._quantile(counts, count, 0.99),
+            }
+        return snapshot
+
+    def _quantile(self, counts: list, count: int, q: float) -> float:
+        target = q * count
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            cumulative += n
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+    def reset(self):
+        self._series.clear()
+
+
+class MetricsRegistry:
+    """Named counters and histograms, exported together."""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def counter(self, name: str, description: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, description, labelnames))
+
+    def histogram(self, name: str, description: str, labelnames: tuple = (),
+                  buckets: tuple = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, description, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name!r} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> dict:
+        """metric name -> {label text: value (counters) or summary dict (histograms)}."""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def prometheus_text(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, metric in self._metrics.items():
+            kind = "histogram" if isinstance(metric, Histogram) else "counter"
+            lines.append(f"# HELP {name} {metric.description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{name}{suffix}{_prometheus_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+def _label_text(labelnames: tuple, values: tuple) -> str:
+    return ",".join(f"{name}={value}" for name, value in zip(labelnames, values))
+
+
+def _prometheus_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Process-wide registry and the metrics QualifyAI records
+METRICS = MetricsRegistry()
+
+LEADS = METRICS.counter(
+    "qualifyai_leads_total", "Leads qualified, by final decision and rejecting stage",
+    ("final_decision", "rejected_at_stage"))
+LEAD_SECONDS = METRICS.histogram(
+    "qualifyai_lead_seconds", "Time to qualify one lead (to its decision)")
+STAGE_SECONDS = METRICS.histogram(
+    "qualifyai_stage_seconds", "Time to evaluate one stage", ("stage", "decision"))
+AGENT_SECONDS = METRICS.histogram(
+    "qualifyai_agent_seconds", "Time for one agent evaluation", ("agent",))
+LLM_REQUESTS = METRICS.counter(
+    "qualifyai_llm_requests_total", "LLM requests by where the answer came from (api, cache, prefilled, coalesced)",
+    ("agent", "source"))
+LLM_SECONDS = METRICS.histogram(
+    "qualifyai_llm_seconds", "Provider latency of one LLM call", ("agent",))
+LLM_TOKENS = METRICS.counter(
+    "qualifyai_llm_tokens_total", "LLM tokens by type (prompt, cached_prompt, completion)", ("agent", "type"))
+ERRORS = METRICS.counter(
+    "qualifyai_errors_total", "Errors by kind (timeout, rate_limit, parse_failure, fallback_50, truncated)", ("kind",))
+
+
+def record_usage(agent: str, usage):
+    """Token counts of a response's `usage` block."""
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    agent = agent or "unknown"
+    LLM_TOKENS.inc(agent, "prompt", amount=usage.prompt_tokens or 0)
+    LLM_TOKENS.inc(agent, "cached_prompt", amount=getattr(details, "cached_tokens", None) or 0)
+    LLM_TOKENS.inc(agent, "completion", amount=usage.completion_tokens or 0)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = METRICS
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # no per-scrape logging
+
+
+def serve_metrics(port: int = 9464, host: str = "127.0.0.1", registry: MetricsRegistry = METRICS):
+    """
+    Serve `registry` at http://host:port/metrics from a daemon thread.
+    Returns the server; call shutdown() on it to stop.
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="qualifyai-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,189 @@
+"""
+Micro-batching of short LLM requests across leads.
+
+Agents with a `batch_template` (the firmographic ICP / Market Intelligence
+agents) can have their per-lead requests collected for a short window and
+sent as one JSON request that scores up to max_batch_size leads. The static
+rubric is then paid for once per batch instead of once per lead. Results are
+split back to the waiting callers; any lead missing or malformed in the
+batch answer is retried as a normal single-lead call.
+"""
+
+import asyncio
+import json
+from .llm_client import (build_request, call_llm, clear_time_budget, get_client_manager, lookup_response,
+                         request_key, store_response, using_prefilled_responses, with_time_budget)
+
+# Defaults for the `micro_batch` section of config.yml
+DEFAULT_MICRO_BATCH_CONFIG = {
+    "enabled": False,
+    "window_ms": 20,
+    "max_batch_size": 8,
+    "max_tokens_per_lead": 500,
+}
+
+
+class _Item:
+    __slots__ = ("lead_data", "request", "key", "future")
+
+    def __init__(self, lead_data, request: dict, key: str, future: asyncio.Future):
+        self.lead_data = lead_data
+        self.request = request
+        self.key = key
+        self.future = future
+
+
+class MicroBatcher:
+    """Collects per-lead requests per agent and sends them in batches."""
+
+    def __init__(self, window_ms: float = 20, max_batch_size: int = 8, max_tokens_per_lead: int = 500):
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.max_tokens_per_lead = max_tokens_per_lead
+        self._pending = {}  # agent name -> (agent, [_Item], timer handle)
+        self._tasks = set()  # batch calls in progress
+        self.batches = 0  # batched requests sent
+        self.items = 0  # leads answered by a batched request
+        self.fallbacks = 0  # leads retried as single calls
+
+    async def submit(self, agent, lead_data) -> str:
+        """Response text for `agent` on this lead, as a single-lead call would return it."""
+        request = agent.llm_request(lead_data)
+        if using_prefilled_responses():
+            return await call_llm(**request)
+
+        # Cached (or replayed) single-lead answers are used as they are, batched or not
+        answer = await lookup_response(**request)
+        if answer is not None:
+            return answer
+        params = build_request(request["prompt"], request.get("system_prompt"), request.get("json_mode", False))
+        key = request_key(params)
+
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.get(agent.name)
+        if pending is None:
+            timer = asyncio.get_running_loop().call_later(self.window, self._flush, agent.name)
+            pending = self._pending[agent.name] = (agent, [], timer)
+        pending[1].append(_Item(lead_data, request, key, future))
+        if len(pending[1]) >= self.max_batch_size:
+            self._flush(agent.name)
+        # A caller that runs out of time drops out; the batch still answers the others
+        return await with_time_budget(future)
+
+    def _flush(self, agent_name: str):
+        pending = self._pending.pop(agent_name, None)
+        if pending is None:
+            return
+        agent, items, timer = pending
+        timer.cancel()
+        task = asyncio.ensure_future(self._run(agent, items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, agent, items: list):
+        """Send one batch and resolve each item's future."""
+        clear_time_budget()  # shared by several leads; each caller enforces its own deadline
+        # Callers cancelled while waiting (e.g. stage early exit) are dropped
+        items = [item for item in items if not item.future.done()]
+        try:
+            if not items:
+                return
+            if len(items) == 1:
+                await self._run_single(items[0])
+                return
+
+            template = agent.batch_template
+            blocks = [template.render(item.lead_data, lead_id=str(n + 1)) for n, item in enumerate(items)]
+            prompt = f"Score each of these {len(items)} leads.\n\n" + "\n\n".join(blocks)
+            try:
+                response = await call_llm(
+                    prompt,
+                    system_prompt=template.system,
+                    json_mode=True,
+                    agent=f"{agent.name} (batch)",
+                    prompt_version=template.version,
+                    max_tokens=self.max_tokens_per_lead * len(items),
+                )
+                answers = _split_results(response)
+            except Exception:
+                answers = {}
+            self.batches += 1
+
+            answered = []
+            retry = []
+            for n, item in enumerate(items):
+                answer = answers.get(str(n + 1))
+                if answer is None:
+                    retry.append(item)
+                    continue
+                content = json.dumps(answer)
+                self.items += 1
+                answered.append((item, content))
+                if not item.future.done():
+                    item.future.set_result(content)
+
+            self.fallbacks += len(retry)
+            await asyncio.gather(*[self._run_single(item) for item in retry])
+
+            # Stored under the single-lead key, so either mode (and a cassette replay) finds it next time
+            for item, content in answered:
+                await store_response(item.key, content, agent.name, json_mode=True)
+        finally:
+            # Never leave a caller waiting, whatever failed above
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(RuntimeError(f"Micro-batch for {agent.name} ended without an answer"))
+
+    async def _run_single(self, item: _Item):
+        if item.future.done():
+            return
+        try:
+            content = await call_llm(**item.request)
+        except Exception as e:
+            if not item.future.done():
+                item.future.set_exception(e)
+            return
+        if not item.future.done():
+            item.future.set_result(content)
+
+    def stats(self) -> dict:
+        """Batched requests sent, leads they answered, and single-call fallbacks."""
+        return {
+            "batches": self.batches,
+            "batched_leads": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "fallbacks": self.fallbacks,
+        }
+
+
+def _split_results(response: str) -> dict:
+    """lead id -> result dict (without the id) for every well-formed entry."""
+    results = json.loads(response).get("results")
+    answers = {}
+    for entry in results if isinstance(results, list) else []:
+        if not isinstance(entry, dict) or not isinstance(entry.get("score"), (int, float)):
+            continue
+        answers[str(entry.get("id"))] = {k: v for k, v in entry.items() if k != "id"}
+    return answers
+
+
+_batcher = None
+_batcher_config = None
+
+
+def get_micro_batcher():
+    """Shared MicroBatcher built from the `micro_batch` config, or None when disabled."""
+    global _batcher, _batcher_config
+    cfg = {**DEFAULT_MICRO_BATCH_CONFIG, **(get_client_manager().config.get("micro_batch") or {})}
+    if cfg != _batcher_config:
+        _batcher_config = cfg
+        _batcher = None
+        if cfg["enabled"]:
+            _batcher = MicroBatcher(cfg["window_ms"], cfg["max_batch_size"], cfg["max_tokens_per_lead"])
+    return _batcher
+
+
+def enable_micro_batching(**overrides):
+    """Turn micro-batching on for this process (e.g. for a bulk run), with optional config overrides."""
+    config = get_client_manager().config
+    config["micro_batch"] = {**(config.get("micro_batch") or {}), **overrides, "enabled": True}
@@ -0,0 +1,259 @@
+"""
+Local stand-in for the OpenAI chat completions API, for load tests and
+benchmarks that should not spend API money.
+
+    server = MockLLMServer(latency_ms=300, rate_limit_rate=0.01)
+    base_url = await server.start()          # http://127.0.0.1:<port>/v1
+    get_client_manager().config["llm"]["base_url"] = base_url
+
+It answers POST /v1/chat/completions (plain and streamed) and GET
+/v1/models. Latency is drawn from a log-normal distribution, a share of
+requests can fail with 500 or 429 (with Retry-After), and answers are canned
+JSON shaped like each agent's real one: the prompt template is recognised
+from the system prompt (prompts.py), so single, decision-only, micro-batched,
+fused and playbook-section requests all get a well-formed answer. Scores
+are derived from a hash of the agent and the lead's fields, so a lead gets
+the same score from every kind of request, like a low-temperature model.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from .fused import FUSED_HEADER
+from .prompts import all_templates
+
+_PLAYBOOK = """EXECUTIVE SUMMARY
+Strong fit with an engaged champion; lead with a focused pilot that proves time to value.
+
+PHASE 1: FOUNDATION BUILDING (Weeks 1-2)
+Align with the champion on the business case and map the buying committee.
+PRIORITY: HIGH
+Actions: 1) Discovery workshop, 2) Stakeholder map, 3) Pilot success criteria
+
+PHASE 2: VALUE VALIDATION (Weeks 3-4)
+Run a two-week pilot on the highest-value workflow.
+Success metrics: 20% faster cycle time, 3 teams onboarded
+CONFIDENCE_LEVEL: Medium
+
+PHASE 3: NEGOTIATION & CLOSE (Weeks 5-6)
+Present pilot results to the decision maker and agree commercial terms.
+
+RISKS: Budget freeze, competing internal priorities.
+
+RECOMMENDED NEXT STEPS: [1] Book discovery (1 week), [2] Start pilot (3 weeks), [3] Exec review (6 weeks)"""
+
+_BATCH_ID = re.compile(r"^(?:Lead|Prospect) (\S+):", re.MULTILINE)
+_FUSED_KEY = re.compile(r"^ASSESSMENT (\S+):\n", re.MULTILINE)
+_SECTION = re.compile(r"Write the (.+?) section")
+
+
+class MockLLMServer:
+    """Minimal HTTP/1.1 server speaking the chat completions API."""
+
+    def __init__(self, latency_ms: float = 300, latency_sigma: float = 0.5, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, score_range: tuple = (60, 100), seed: int = None):
+        """
+        latency_ms: median response time; latency_sigma: log-normal spread
+        (0 = constant). error_rate / rate_limit_rate: share of requests
+        answered with 500 / 429. score_range: scores handed out (inclusive).
+        """
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.score_range = score_range
+        self._random = random.Random(seed)
+        self._templates = {template.system: name for name, template in all_templates().items()}
+        self._server = None
+        self.base_url = None
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start listening (port 0 = any free port); returns the base URL for the client."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}/v1"
+        return self.base_url
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "errors": self.errors, "rate_limited": self.rate_limited}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path = request_line.decode("latin-1").split(" ")[:2]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                await self._respond(method, path.split("?")[0], body, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter):
+        if method == "GET" and path.endswith("/models"):
+            await _send_json(writer, 200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+            return
+        if method != "POST" or not path.endswith("/chat/completions"):
+            await _send_json(writer, 404, {"error": {"message": f"No route for {method} {path}"}})
+            return
+
+        self.requests += 1
+        params = json.loads(body)
+        await asyncio.sleep(self._latency() * (0.2 if params.get("stream") else 1.0))
+
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            self.rate_limited += 1
+            await _send_json(writer, 429, {"error": {"message": "Rate limit reached (mock)", "type": "requests"}},
+                             {"retry-after": "0.1"})
+            return
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.errors += 1
+            await _send_json(writer, 500, {"error": {"message": "Internal error (mock)", "type": "server_error"}})
+            return
+
+        content = self._content(params)
+        prompt_tokens = sum(len(m["content"]) for m in params["messages"]) // 4
+        limit = params.get("max_tokens") or 4096
+        finish_reason = "stop"
+        if len(content) // 4 > limit:
+            content = content[:limit * 4]
+            finish_reason = "length"
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": max(1, len(content) // 4),
+            "total_tokens": prompt_tokens + max(1, len(content) // 4),
+            # The system prompt is the shared prefix the provider would have cached
+            "prompt_tokens_details": {"cached_tokens": len(params["messages"][0]["content"]) // 4
+                                      if len(params["messages"]) > 1 else 0},
+        }
+        completion_id = f"chatcmpl-mock-{self.requests}"
+        if params.get("stream"):
+            await self._stream(writer, params, completion_id, content, finish_reason, usage)
+            return
+        await _send_json(writer, 200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": params.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": finish_reason}],
+            "usage": usage,
+        })
+
+    async def _stream(self, writer, params: dict, completion_id: str, content: str, finish_reason: str,
+                      usage: dict):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+        base = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": params.get("model", "mock")}
+        parts = [content[i:i + 40] for i in range(0, len(content), 40)] or [""]
+        delay = self._latency() * 0.8 / len(parts)  # the rest of the response time, spread over the chunks
+        for n, part in enumerate(parts):
+            last = n == len(parts) - 1
+            _write_event(writer, {**base, "choices": [{"index": 0, "delta": {"content": part},
+                                                       "finish_reason": finish_reason if last else None}]})
+            await writer.drain()
+            await asyncio.sleep(delay)
+        if (params.get("stream_options") or {}).get("include_usage"):
+            _write_event(writer, {**base, "choices": [], "usage": usage})
+        _write_chunk(writer, b"data: [DONE]\n\n")
+        _write_chunk(writer, b"")
+        await writer.drain()
+
+    def _latency(self) -> float:
+        """Seconds, log-normal around the median."""
+        return self.latency_ms / 1000 * math.exp(self._random.gauss(0, self.latency_sigma))
+
+    def _score(self, text: str) -> int:
+        low, high = self.score_range
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return low + int.from_bytes(digest[:4], "big") % (high - low + 1)
+
+    def _content(self, params: dict) -> str:
+        """Canned answer for the agent whose prompt template produced this request."""
+        messages = params["messages"]
+        system = messages[0]["content"] if messages[0]["role"] == "system" else ""
+        user = messages[-1]["content"]
+        template = self._templates.get(system, "")
+
+        if system.startswith(FUSED_HEADER):
+            parts = _FUSED_KEY.split(user)[1:]  # key, prompt, key, prompt, ...
+            return json.dumps({key: self._assessment(key + _lead_fields(prompt))
+                               for key, prompt in zip(parts[::2], parts[1::2])})
+        if template.endswith("_batch"):
+            family = template[:-len("_batch")]
+            return json.dumps({"results": [{"id": lead_id, **self._assessment(family + fields)}
+                                           for lead_id, fields in _batch_leads(user)]})
+        if template.endswith("_decision"):
+            return json.dumps({"score": self._score(template[:-len("_decision")] + _lead_fields(user))})
+        if template == "strategy_section":
+            match = _SECTION.search(user)
+            return f"{match.group(1) if match else 'SECTION'}\n" + "Mock section text. " * 20
+        assessment = self._assessment(template + _lead_fields(user))
+        if template == "strategy":
+            assessment["reasoning"] = _PLAYBOOK
+        return json.dumps(assessment)
+
+    def _assessment(self, text: str) -> dict:
+        score = self._score(text)
+        return {
+            "score": score,
+            "reasoning": f"Mock assessment: score {score} based on the lead's fields.",
+            "recommendation": "PROCEED" if score >= 70 else "REJECT",
+        }
+
+
+def _lead_fields(user: str) -> str:
+    """Lead fields of a single-lead prompt (without the instruction and the block header)."""
+    block = user.split("\n\n", 1)[-1]
+    return block.split("\n", 1)[-1].strip()
+
+
+def _batch_leads(user: str) -> list:
+    """(lead id, lead fields) for each lead in a micro-batched prompt."""
+    matches = list(_BATCH_ID.finditer(user))
+    leads = []
+    for n, match in enumerate(matches):
+        end = matches[n + 1].start() if n + 1 < len(matches) else len(user)
+        leads.append((match.group(1), user[match.end():end].strip()))
+    return leads
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload: dict, headers: dict = None):
+    body = json.dumps(payload).encode("utf-8")
+    reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error"}[status]
+    head = [f"HTTP/1.1 {status} {reason}", "Content-Type: application/json", f"Content-Length: {len(body)}"]
+    head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+def _write_event(writer: asyncio.StreamWriter, payload: dict):
+    _write_chunk(writer, b"data: " + json.dumps(payload).encode("utf-8") + b"\n\n")
+
+
+def _write_chunk(writer: asyncio.StreamWriter, data: bytes):
+    """One chunk of a chunked transfer-encoded body (empty data ends the body)."""
+    writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
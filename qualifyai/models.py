@@ -0,0 +1,256 @@
+"""
+Typed lead records.
+
+Lead: slotted record for a single lead, normalizes text fields once.
+LeadBatch: columnar container backed by NumPy arrays for large lead sets.
+Both convert to and from the plain dict format used by the agents.
+"""
+
+import sys
+import numpy as np
+
+# Lead schema, grouped by storage type
+NUMERIC_FIELDS = ["employee_count", "annual_revenue", "budget", "deal_size"]
+TEXT_FIELDS = [
+    "company_name", "industry", "funding_stage", "growth_rate", "market_position",
+    "current_solution", "satisfaction_with_current", "our_advantage",
+    "decision_maker", "decision_maker_title", "champion", "champion_title", "champion_engagement",
+    "blockers", "integration_complexity", "technical_requirements",
+    "timeline", "implementation_complexity",
+]
+FLAG_FIELDS = ["budget_freeze", "recent_layoffs", "competitor_relationship", "has_champion"]
+LIST_FIELDS = ["competitors", "tech_stack", "stakeholders"]
+FIELDS = NUMERIC_FIELDS + TEXT_FIELDS + FLAG_FIELDS + LIST_FIELDS
+
+# Low-cardinality fields whose values are interned (one shared string per distinct value)
+ENUM_FIELDS = [
+    "industry", "funding_stage", "current_solution", "satisfaction_with_current",
+    "integration_complexity", "timeline", "implementation_complexity",
+]
+
+# Fields the rule-based agents compare case-insensitively; Lead stores them lower-cased too
+LOWERED_FIELDS = [
+    "funding_stage", "current_solution", "satisfaction_with_current", "our_advantage",
+    "integration_complexity", "technical_requirements", "timeline", "implementation_complexity",
+]
+
+_LOWERED_SLOTS = {field: f"_{field}_lower" for field in LOWERED_FIELDS}
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Lead:
+    """
+    Single lead with one slot per known field (no per-instance dict).
+
+    Behaves like the lead dict for reading (get / [] / in), so it can be passed
+    to agents and stages directly. Unset fields act like missing dict keys.
+    Unknown keys are kept in `extra`.
+    """
+
+    __slots__ = tuple(FIELDS) + tuple(_LOWERED_SLOTS.values()) + ("extra",)
+
+    def __init__(self, **fields):
+        extra = None
+        for key, value in fields.items():
+            if key in _FIELD_SET:
+                if key in _ENUM_SET:
+                    value = _intern(value)
+                setattr(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        self.extra = extra
+        for field, slot in _LOWERED_SLOTS.items():
+            value = getattr(self, field, None)
+            if type(value) is str:
+                setattr(self, slot, sys.intern(value.lower()) if field in _ENUM_SET else value.lower())
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Lead":
+        """Build from the lead dict format."""
+        return cls(**data)
+
+    def to_dict(self) -> dict:
+        """Lead dict with exactly the fields that were set."""
+        data = {}
+        for field in FIELDS:
+            value = getattr(self, field, _MISSING)
+            if value is not _MISSING:
+                data[field] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def get(self, key: str, default=None):
+        """dict.get() equivalent."""
+        if key in _FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            return default if value is _MISSING else value
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def lower(self, field: str) -> str:
+        """Same as get(field, "").lower(), precomputed for the rule-based text fields."""
+        slot = _LOWERED_SLOTS.get(field)
+        if slot is not None:
+            value = getattr(self, slot, None)
+            if value is not None:
+                return value
+        return self.get(field, "").lower()
+
+    def __getitem__(self, key: str):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __repr__(self):
+        return f"Lead({self.get('company_name', '?')!r})"
+
+
+_MISSING = object()
+_FIELD_SET = frozenset(FIELDS)
+_ENUM_SET = frozenset(ENUM_FIELDS)
+
+
+def lower_field(lead_data, field: str) -> str:
+    """lead_data.get(field, "").lower() for lead dicts and Lead records alike."""
+    if type(lead_data) is Lead:
+        return lead_data.lower(field)
+    return lead_data.get(field, "").lower()
+
+
+class _Categorical:
+    """String column stored as distinct values + int32 codes (-1 = missing)."""
+
+    __slots__ = ("categories", "codes")
+
+    def __init__(self, categories: list, codes: np.ndarray):
+        self.categories = categories
+        self.codes = codes
+
+    @classmethod
+    def encode(cls, values, count: int) -> "_Categorical":
+        index = {}
+
+        def code(value):
+            if value is _MISSING:
+                return -1
+            return index.setdefault(_intern(value), len(index))
+
+        codes = np.fromiter((code(v) for v in values), dtype=np.int32, count=count)
+        return cls(list(index), codes)
+
+    def value(self, i: int):
+        code = self.codes[i]
+        return _MISSING if code < 0 else self.categories[code]
+
+    def lowered(self) -> tuple:
+        """(lower-cased categories, codes) with missing mapped to ""."""
+        categories = [str(c).lower() for c in self.categories] + [""]
+        codes = np.where(self.codes < 0, len(self.categories), self.codes).astype(np.int32)
+        return categories, codes
+
+
+class LeadBatch:
+    """
+    Columnar collection of leads.
+
+    numeric fields -> float64 arrays (NaN = missing)
+    text fields -> categorical (shared distinct values + int32 codes)
+    flags -> int8 arrays (-1 = missing)
+    lists -> int32 lengths (-1 = missing) + categorical of the flattened items
+    """
+
+    def __init__(self, size: int, numeric: dict, text: dict, flags: dict, lists: dict, extras: dict):
+        self.size = size
+        self.numeric = numeric
+        self.text = text
+        self.flags = flags
+        self.lists = lists
+        self.extras = extras  # row index -> dict of unknown keys
+        self._offsets = {}
+
+    @classmethod
+    def from_dicts(cls, leads) -> "LeadBatch":
+        """Build from lead dicts (or Lead records)."""
+        rows = [lead.to_dict() if type(lead) is Lead else lead for lead in leads]
+        size = len(rows)
+
+        numeric = {}
+        for field in NUMERIC_FIELDS:
+            values = (row.get(field) for row in rows)
+            numeric[field] = np.fromiter((np.nan if v is None else v for v in values), dtype=np.float64, count=size)
+
+        text = {field: _Categorical.encode((row.get(field, _MISSING) for row in rows), size) for field in TEXT_FIELDS}
+
+        flags = {}
+        for field in FLAG_FIELDS:
+            values = (row.get(field, _MISSING) for row in rows)
+            flags[field] = np.fromiter((-1 if v is _MISSING else int(bool(v)) for v in values), dtype=np.int8, count=size)
+
+        lists = {}
+        for field in LIST_FIELDS:
+            values = [row.get(field) for row in rows]
+            lengths = np.fromiter((-1 if v is None else len(v) for v in values), dtype=np.int32, count=size)
+            items = (item for v in values if v is not None for item in v)
+            lists[field] = (lengths, _Categorical.encode(items, int(lengths[lengths > 0].sum())))
+
+        extras = {}
+        for i, row in enumerate(rows):
+            unknown = {k: v for k, v in row.items() if k not in _FIELD_SET}
+            if unknown:
+                extras[i] = unknown
+
+        return cls(size, numeric, text, flags, lists, extras)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def row(self, i: int) -> dict:
+        """Lead dict for row i (only the fields that were set)."""
+        data = {}
+        for field, column in self.numeric.items():
+            value = column[i]
+            if not np.isnan(value):
+                data[field] = int(value) if value.is_integer() else float(value)
+        for field, column in self.text.items():
+            value = column.value(i)
+            if value is not _MISSING:
+                data[field] = value
+        for field, column in self.flags.items():
+            if column[i] >= 0:
+                data[field] = bool(column[i])
+        for field, (lengths, items) in self.lists.items():
+            if lengths[i] >= 0:
+                start = self._list_offsets(field)[i]
+                data[field] = [items.categories[c] for c in items.codes[start:start + lengths[i]]]
+        if i in self.extras:
+            data.update(self.extras[i])
+        return data
+
+    def __getitem__(self, i: int) -> Lead:
+        return Lead.from_dict(self.row(i))
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self[i]
+
+    def to_dicts(self) -> list:
+        """All rows as lead dicts."""
+        return [self.row(i) for i in range(self.size)]
+
+    def _list_offsets(self, field: str) -> np.ndarray:
+        """Start of each row's items in the flattened list column (cached)."""
+        if field not in self._offsets:
+            lengths = np.maximum(self.lists[field][0], 0)
+            self._offsets[field] = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+        return self._offsets[field]
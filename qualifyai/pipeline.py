@@ -1,70 +1,357 @@
 """Qualify Pipeline"""
 
+import asyncio
+import time
+from . import metrics
+from .agents import LazyReasoning
+from .llm_client import LLMCallCounter, LLMTimeoutError, count_llm_calls, time_budget, trace_span
 from .stages import Stage1, Stage2, Stage3
 
+# Speculation policies for LeadQualifyPipeline
+SPECULATION_POLICIES = ["never", "always", "deal_size"]
+
+# Which leads get their lazily generated narratives (decision-only mode) filled in
+NARRATIVE_POLICIES = ["all", "qualified"]
+
 
 class QualifyPipeline:
     """Base pipeline class - Main orchestrator"""
 
-    def __init__(self, stages: list):
+    def __init__(self, stages: list, verbose: bool = True):
         """Initialize with list of Stage objects (must be exactly 3)."""
         self.stages = stages  # Must be exactly 3
+        self.verbose = verbose  # Print stage progress (turn off for bulk runs)
 
-    async def qualify(self, lead_data: dict) -> dict:
+    async def qualify(self, lead_data: dict, deadline: float = None) -> dict:
         """
         Run lead through all stages sequentially.
         Stop at first rejection or complete all stages.
+        `deadline`: seconds the lead may take in total (None = no limit).
 
         Returns:
         {
-            'final_decision': 'QUALIFIED' or 'REJECTED',
+            'final_decision': 'QUALIFIED', 'REJECTED' or 'TIMEOUT',
             'rejected_at_stage': str or None,
             'stage_results': [...],
             'summary': str
         }
+        (plus 'timed_out_at_stage' for a TIMEOUT)
         """
         raise NotImplementedError
 
+    async def qualify_many(self, leads, concurrency: int = 10, ordered: bool = True, deadline: float = None) -> list:
+        """
+        Qualify many leads with at most `concurrency` running at once.
+        Returns results in input order (or completion order if ordered=False).
+        """
+        return [result async for _, result in self.qualify_iter(leads, concurrency, ordered, deadline)]
+
+    async def qualify_iter(self, leads, concurrency: int = 10, ordered: bool = False, deadline: float = None):
+        """
+        Async generator yielding (index, result) as leads finish.
+
+        `leads` may be a regular or async iterable and is consumed lazily, so
+        only a bounded number of leads is held in memory. With ordered=True
+        results are yielded in input order; a slow lead then holds back at most
+        a window of finished ones. A lead that raises yields an ERROR result
+        instead of stopping the run. `deadline` is the per-lead time budget
+        in seconds, counted from when the lead starts.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+
+        source = _as_async_iterator(leads)
+        reorder_window = concurrency * 4
+        pending = {}  # task -> input index
+        finished = {}  # input index -> result, waiting for its turn (ordered mode)
+        next_index = 0  # next index to hand out
+        next_to_yield = 0  # next index to yield (ordered mode)
+        exhausted = False
+
+        try:
+            while True:
+                # Top up in-flight work
+                while not exhausted and len(pending) < concurrency:
+                    if ordered and next_index - next_to_yield >= reorder_window:
+                        break
+                    try:
+                        lead_data = await source.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    task = asyncio.create_task(self._qualify_isolated(lead_data, deadline))
+                    pending[task] = next_index
+                    next_index += 1
+
+                if not pending:
+                    break
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = pending.pop(task)
+                    if ordered:
+                        finished[index] = task.result()
+                    else:
+                        yield index, task.result()
+
+                while next_to_yield in finished:
+                    yield next_to_yield, finished.pop(next_to_yield)
+                    next_to_yield += 1
+        finally:
+            # Consumer stopped early or was cancelled
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _qualify_isolated(self, lead_data: dict, deadline: float = None) -> dict:
+        """qualify() that reports failures as a result instead of raising."""
+        try:
+            return await self.qualify(lead_data, deadline)
+        except Exception as e:
+            metrics.LEADS.inc("ERROR", "")
+            return {
+                "final_decision": "ERROR",
+                "rejected_at_stage": None,
+                "stage_results": [],
+                "summary": f"Qualification failed: {str(e)}",
+                "error": str(e)
+            }
+
+
+async def _as_async_iterator(items):
+    """Iterate a regular or async iterable asynchronously."""
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
 
 class LeadQualifyPipeline(QualifyPipeline):
     """Runs lead through all stages sequentially."""
 
-    async def qualify(self, lead_data: dict) -> dict:
+    def __init__(self, stages: list, verbose: bool = True, speculation: str = "never",
+                 speculation_min_deal_size: int = 0, defer_reasoning: bool = False, narratives: str = "all"):
+        """
+        speculation: "never" (default), "always", or "deal_size" to speculate
+        only for leads with deal_size >= speculation_min_deal_size.
+        defer_reasoning: return as soon as the decision is made, leaving
+        narratives that are still streaming (Stage3(stream_strategy=True)) or
+        not generated yet (decision_only stages) for the caller to collect
+        with resolve_reasoning().
+        narratives: "all", or "qualified" to generate decision-only narratives
+        for QUALIFIED leads only.
+        """
+        super().__init__(stages, verbose)
+        if narratives not in NARRATIVE_POLICIES:
+            raise ValueError(f"narratives must be one of {NARRATIVE_POLICIES}, got {narratives!r}")
+        self.defer_reasoning = defer_reasoning
+        self.narratives = narratives
+        if speculation not in SPECULATION_POLICIES:
+            raise ValueError(f"speculation must be one of {SPECULATION_POLICIES}, got {speculation!r}")
+        self.speculation = speculation
+        self.speculation_min_deal_size = speculation_min_deal_size
+
+    def should_speculate(self, lead_data: dict) -> bool:
+        """Whether this lead gets the speculative (all stages at once) path."""
+        if self.speculation == "always":
+            return True
+        if self.speculation == "deal_size":
+            return lead_data.get("deal_size", 0) >= self.speculation_min_deal_size
+        return False
+
+    async def qualify(self, lead_data: dict, deadline: float = None) -> dict:
         """
         Run lead through all stages sequentially.
         Stop at first rejection or complete all the stages.
+
+        In speculative mode every stage starts immediately; decisions are still
+        taken in stage order and later stages are cancelled on a rejection.
+
+        `deadline` is the time budget in seconds for the whole lead. Each LLM
+        call gets what is left of it; if it runs out the lead is reported as
+        TIMEOUT at the stage that was running.
+
+        With tracing enabled (`tracing:` in config.yml) the lead is recorded
+        as one trace of lead / stage / agent / LLM spans.
         """
+        with time_budget(deadline), trace_span("lead", "lead", company_name=lead_data.get("company_name")) as span:
+            start = time.perf_counter()
+            result = await self._qualify(lead_data)
+            metrics.LEAD_SECONDS.observe(time.perf_counter() - start)
+            metrics.LEADS.inc(result["final_decision"], result["rejected_at_stage"] or "")
+            span.set(final_decision=result["final_decision"],
+                     decided_at_stage=result.get("rejected_at_stage") or result.get("timed_out_at_stage"))
+            return result
+
+    async def _qualify(self, lead_data: dict) -> dict:
+        speculate = self.should_speculate(lead_data)
         stage_results = []
         rejected_at_stage = None
+        timed_out_at_stage = None
+
+        if speculate:
+            counters = [LLMCallCounter() for _ in self.stages]
+            tasks = [
+                asyncio.create_task(_evaluate_counted(stage, lead_data, counter))
+                for stage, counter in zip(self.stages, counters)
+            ]
+
+        try:
+            # Run each stage
+            for i, stage in enumerate(self.stages):
+                if self.verbose:
+                    print(f"\n{'='*50}")
+                    print(f"Running {stage.name}...")
+                    print('='*50)
 
-        # Run each stage
-        for stage in self.stages:
-            print(f"\n{'='*50}")
-            print(f"Running {stage.name}...")
-            print('='*50)
+                try:
+                    if speculate:
+                        result = await tasks[i]
+                    else:
+                        result = await _evaluate_stage(stage, lead_data)
+                except LLMTimeoutError as e:
+                    timed_out_at_stage = stage.name
+                    stage_results.append({
+                        "stage": stage.name,
+                        "decision": "TIMEOUT",
+                        "agent_results": [],
+                        "reasoning": str(e)
+                    })
+                    if self.verbose:
+                        print(f"Decision: TIMEOUT ({e})")
+                    break
+                stage_results.append(result)
 
-            result = await stage.evaluate(lead_data)
-            stage_results.append(result)
+                if self.verbose:
+                    print(f"Decision: {result['decision']}")
+                    print(f"Reasoning: {result['reasoning']}")
 
-            print(f"Decision: {result['decision']}")
-            print(f"Reasoning: {result['reasoning']}")
+                # Stop if rejected
+                if result["decision"] in ["REJECT", "REJECTED"]:
+                    rejected_at_stage = stage.name
+                    break
+        finally:
+            if speculate:
+                # Cancel stages made pointless by a rejection (or by an error)
+                unfinished = [task for task in tasks if not task.done()]
+                for task in unfinished:
+                    task.cancel()
+                if unfinished:
+                    await asyncio.gather(*unfinished, return_exceptions=True)
+                # Stages that finished but were dropped may still be streaming a playbook
+                for task in tasks[len(stage_results):]:
+                    if task.done() and not task.cancelled() and task.exception() is None:
+                        await cancel_pending_reasoning(task.result())
 
-            # Stop if rejected
-            if result["decision"] in ["REJECT", "REJECTED"]:
-                rejected_at_stage = stage.name
-                break
+        result = build_final_result(stage_results, rejected_at_stage, timed_out_at_stage)
+        if self.narratives == "qualified" and result["final_decision"] != "QUALIFIED":
+            skip_lazy_reasoning(result)
+        if not self.defer_reasoning:
+            await resolve_reasoning(result)
 
-        # Final decision
-        if rejected_at_stage:
-            final_decision = "REJECTED"
-            summary = f"Lead rejected at {rejected_at_stage}."
-        else:
-            final_decision = "QUALIFIED"
-            summary = "Lead passed all stages and is qualified."
+        if speculate:
+            # LLM calls made by stages that ran ahead of the decision
+            ahead = counters[1:]
+            wasted = counters[len(stage_results):]
+            result["speculation"] = {
+                "speculative_calls": sum(c.calls for c in ahead),
+                "wasted_calls": sum(c.calls for c in wasted)
+            }
 
+        return result
+
+
+def build_final_result(stage_results: list, rejected_at_stage: str = None, timed_out_at_stage: str = None) -> dict:
+    """
+    Pipeline result for a lead that was rejected at `rejected_at_stage`, ran
+    out of time at `timed_out_at_stage`, or passed every stage.
+    """
+    if timed_out_at_stage:
         return {
-            "final_decision": final_decision,
-            "rejected_at_stage": rejected_at_stage,
+            "final_decision": "TIMEOUT",
+            "rejected_at_stage": None,
+            "timed_out_at_stage": timed_out_at_stage,
             "stage_results": stage_results,
-            "summary": summary
+            "summary": f"Lead ran out of time at {timed_out_at_stage}."
         }
+    if rejected_at_stage:
+        final_decision = "REJECTED"
+        summary = f"Lead rejected at {rejected_at_stage}."
+    else:
+        final_decision = "QUALIFIED"
+        summary = "Lead passed all stages and is qualified."
+
+    return {
+        "final_decision": final_decision,
+        "rejected_at_stage": rejected_at_stage,
+        "stage_results": stage_results,
+        "summary": summary
+    }
+
+
+def has_pending_reasoning(result: dict) -> bool:
+    """Whether any agent narrative in a pipeline result is still streaming."""
+    return any(
+        "reasoning_pending" in agent_result
+        for stage_result in result["stage_results"]
+        for agent_result in stage_result.get("agent_results", [])
+    )
+
+
+def skip_lazy_reasoning(result: dict):
+    """Drop narratives that would only be generated on request (decision-only mode)."""
+    for stage_result in result["stage_results"]:
+        for agent_result in stage_result.get("agent_results", []):
+            pending = agent_result.get("reasoning_pending")
+            if isinstance(pending, LazyReasoning) and not pending.started:
+                del agent_result["reasoning_pending"]
+                agent_result["reasoning"] = "Not generated (decision-only mode, lead not qualified)"
+
+
+async def cancel_pending_reasoning(stage_result: dict):
+    """Stop narratives of a stage result that is being discarded (e.g. a playbook still streaming)."""
+    pending = [agent_result.pop("reasoning_pending") for agent_result in stage_result.get("agent_results", [])
+               if "reasoning_pending" in agent_result]
+    running = []
+    for reasoning in pending:
+        if isinstance(reasoning, LazyReasoning):
+            reasoning = reasoning.task
+        if reasoning is not None and not reasoning.done():
+            reasoning.cancel()
+            running.append(reasoning)
+    if running:
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+async def resolve_reasoning(result: dict) -> dict:
+    """Wait for narratives still pending in a pipeline result (concurrently) and fill them in."""
+    agent_results = [
+        agent_result
+        for stage_result in result["stage_results"]
+        for agent_result in stage_result.get("agent_results", [])
+        if "reasoning_pending" in agent_result
+    ]
+    texts = await asyncio.gather(*[agent_result["reasoning_pending"] for agent_result in agent_results])
+    for agent_result, text in zip(agent_results, texts):
+        del agent_result["reasoning_pending"]
+        agent_result["reasoning"] = text
+    return result
+
+
+async def _evaluate_stage(stage, lead_data: dict) -> dict:
+    """stage.evaluate() in a stage span (and timed)."""
+    with trace_span(stage.name, "stage") as span:
+        start = time.perf_counter()
+        result = await stage.evaluate(lead_data)
+        metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage.name, result["decision"])
+        span.set(decision=result["decision"])
+        return result
+
+
+async def _evaluate_counted(stage, lead_data: dict, counter: LLMCallCounter) -> dict:
+    """stage.evaluate() with its LLM calls counted into `counter`."""
+    count_llm_calls(counter)
+    return await _evaluate_stage(stage, lead_data)
@@ -0,0 +1,295 @@
+"""
+Prompt template registry for the LLM agents.
+
+Each template splits a prompt into a static, versioned system prefix (rubric,
+scoring sheet, output format) and a short user message holding only the
+lead-specific fields. The prefix is byte-identical across leads, so the
+provider can reuse its prompt cache instead of re-processing those tokens.
+Templates are parsed once at import; rendering just joins the pieces.
+"""
+
+import hashlib
+import string
+
+_FORMATTER = string.Formatter()
+
+
+class PromptTemplate:
+    """Static system prefix + compiled user template for one agent."""
+
+    def __init__(self, name: str, version: str, system: str, user: str, defaults: dict = None):
+        self.name = name
+        self.system = system
+        self.user = user
+        self.defaults = defaults or {}  # per-field fallback when the lead lacks it ("Unknown" otherwise)
+
+        # Compile: (literal text, field name, format spec) pieces
+        self._pieces = [
+            (literal, field, spec or "")
+            for literal, field, spec, _ in _FORMATTER.parse(user)
+        ]
+        self.fields = [field for _, field, _ in self._pieces if field]
+
+        # Any edit to the text changes the version, so cached answers for the old text are dropped
+        digest = hashlib.sha256((system + "\0" + user).encode("utf-8")).hexdigest()[:10]
+        self.version = f"{version}-{digest}"
+
+    def render(self, lead_data, **values) -> str:
+        """User message for a lead. Keyword values override lead fields."""
+        out = []
+        for literal, field, spec in self._pieces:
+            out.append(literal)
+            if field:
+                if field in values:
+                    value = values[field]
+                else:
+                    value = lead_data.get(field, self.defaults.get(field, "Unknown"))
+                out.append(format(value, spec))
+        return "".join(out)
+
+
+_REGISTRY = {}
+
+
+def register(template: PromptTemplate) -> PromptTemplate:
+    """Add a template to the registry (replacing one with the same name)."""
+    _REGISTRY[template.name] = template
+    return template
+
+
+def get_template(name: str) -> PromptTemplate:
+    """Registered template by name."""
+    return _REGISTRY[name]
+
+
+def all_templates() -> dict:
+    """name -> PromptTemplate for every registered template."""
+    return dict(_REGISTRY)
+
+
+# Output instructions; the *_BATCH templates score several leads in one request
+_SINGLE_RESULT = "Return valid JSON with exactly these fields:\n"
+_BATCH_RESULTS = """You will be given several leads, each introduced with its id. Score each one independently.
+Return valid JSON with a "results" array holding one object per lead, in the order given, each with exactly these fields:
+- id: string (the lead's id as given)
+"""
+
+
+_ICP_RUBRIC = """You analyze sales leads against our Ideal Customer Profile (ICP).
+
+Our ICP:
+- Target Industries: B2B SaaS, Technology, FinTech, Enterprise Software
+- Company Size: 100-5,000 employees
+- Annual Revenue: $10M+
+
+Score guidelines:
+- 90-100: Perfect ICP match
+- 70-89: Good fit with minor gaps
+- 50-69: Moderate fit, some concerns
+- Below 50: Poor fit"""
+
+_ICP_RESULT_FIELDS = """- score: number (0-100)
+- reasoning: string (explanation of fit assessment)
+- recommendation: string (PROCEED or REJECT)"""
+
+_ICP_LEAD_FIELDS = """- Company: {company_name}
+- Industry: {industry}
+- Employee Count: {employee_count}
+- Annual Revenue: ${annual_revenue}"""
+
+ICP_TEMPLATE = register(PromptTemplate(
+    name="icp",
+    version="2",
+    system=_ICP_RUBRIC + "\n\n" + _SINGLE_RESULT + _ICP_RESULT_FIELDS,
+    user="Analyze this lead against our Ideal Customer Profile (ICP).\n\nLead Information:\n" + _ICP_LEAD_FIELDS,
+))
+
+ICP_BATCH_TEMPLATE = register(PromptTemplate(
+    name="icp_batch",
+    version="1",
+    system=_ICP_RUBRIC + "\n\n" + _BATCH_RESULTS + _ICP_RESULT_FIELDS,
+    user="Lead {lead_id}:\n" + _ICP_LEAD_FIELDS,
+))
+
+
+_MARKET_INTEL_RUBRIC = """You evaluate a prospect's market fit. Score each criterion and sum for total.
+
+Scoring sheet (max 100 points):
+
+1. INDUSTRY ALIGNMENT (0-40 points):
+   - Exact match (B2B SaaS, Technology, FinTech, Enterprise Software): 40 pts
+   - Related tech industry (Healthcare Tech, EdTech, etc.): 25 pts
+   - Non-tech but uses software heavily: 15 pts
+   - Non-tech/traditional industry: 0 pts
+
+2. GROWTH RATE (0-35 points):
+   - 15%+ YoY growth: 35 pts
+   - 10-14% YoY growth: 25 pts
+   - 5-9% YoY growth: 15 pts
+   - Below 5% or flat/declining: 0 pts
+
+3. MARKET POSITION (0-25 points):
+   - Market leader or dominant player: 25 pts
+   - Strong challenger or fast-growing: 20 pts
+   - Established mid-market player: 15 pts
+   - Small/local/niche player: 5 pts"""
+
+_MARKET_INTEL_RESULT_FIELDS = """- score: number (0-100, sum of all criteria)
+- reasoning: string (narrative analysis starting with "After analyzing the market landscape..." and include points for each criterion)"""
+
+_MARKET_INTEL_LEAD_FIELDS = """- Industry: {industry}
+- Growth Rate: {growth_rate}
+- Market Position: {market_position}"""
+
+MARKET_INTEL_TEMPLATE = register(PromptTemplate(
+    name="market_intel",
+    version="2",
+    system=_MARKET_INTEL_RUBRIC + "\n\n" + _SINGLE_RESULT + _MARKET_INTEL_RESULT_FIELDS,
+    user="Evaluate this prospect's market fit.\n\nPROSPECT DATA:\n" + _MARKET_INTEL_LEAD_FIELDS,
+))
+
+MARKET_INTEL_BATCH_TEMPLATE = register(PromptTemplate(
+    name="market_intel_batch",
+    version="1",
+    system=_MARKET_INTEL_RUBRIC + "\n\n" + _BATCH_RESULTS + _MARKET_INTEL_RESULT_FIELDS,
+    user="Prospect {lead_id}:\n" + _MARKET_INTEL_LEAD_FIELDS,
+))
+
+
+_STAKEHOLDER_RUBRIC = """You analyze the stakeholder dynamics of B2B deals. Score each criterion and sum for total.
+
+SCORING RUBRIC (max 100 points):
+
+1. CHAMPION STRENGTH (0-40 points):
+   - Strong champion with budget authority: 40 pts
+   - Engaged champion without direct authority: 30 pts
+   - Weak or passive champion: 15 pts
+   - No identified champion: 0 pts
+
+2. DECISION MAKER ACCESS (0-40 points):
+   - Direct access to final decision maker: 40 pts
+   - Access through champion: 30 pts
+   - Indirect access only: 15 pts
+   - No access identified: 0 pts
+
+3. BLOCKER RISK (0-20 points):
+   - No known blockers: 20 pts
+   - Minor blockers (can be managed): 10 pts
+   - Significant blockers present: 5 pts
+   - Strong opposition identified: 0 pts"""
+
+_STAKEHOLDER_LEAD_FIELDS = """- Decision Maker: {decision_maker}
+- Decision Maker Title: {decision_maker_title}
+- Champion: {champion}
+- Champion Title: {champion_title}
+- Champion Engagement: {champion_engagement}
+- Known Blockers: {blockers}"""
+
+_STAKEHOLDER_DEFAULTS = {"champion": "None", "blockers": "None"}
+
+STAKEHOLDER_TEMPLATE = register(PromptTemplate(
+    name="stakeholder",
+    version="2",
+    system=_STAKEHOLDER_RUBRIC + "\n\n" + _SINGLE_RESULT + """- score: number (0-100, sum of all criteria)
+- reasoning: string (narrative stakeholder mapping starting with "Stakeholder mapping reveals the following key players:" then describe PRIMARY DECISION MAKER, CHAMPION, any BLOCKERS)""",
+    user="Analyze the stakeholder dynamics for this deal.\n\nSTAKEHOLDER DATA:\n" + _STAKEHOLDER_LEAD_FIELDS,
+    defaults=_STAKEHOLDER_DEFAULTS,
+))
+
+
+# Playbook sections (heading, format); the parallel playbook mode asks for each one separately
+STRATEGY_SECTIONS = [
+    ("EXECUTIVE SUMMARY", """EXECUTIVE SUMMARY
+[2-3 sentences describing the opportunity and recommended approach]"""),
+    ("PHASE 1", """PHASE 1: FOUNDATION BUILDING (Weeks 1-2)
+[Describe immediate priorities and champion enablement]
+PRIORITY: [CRITICAL/HIGH/MEDIUM]
+Actions: 1) [specific action], 2) [specific action], 3) [specific action]"""),
+    ("PHASE 2", """PHASE 2: VALUE VALIDATION (Weeks 3-4)
+[Describe pilot/POC approach and success metrics]
+Success metrics: [specific measurable outcomes]
+CONFIDENCE_LEVEL: [High/Medium/Low]"""),
+    ("PHASE 3", """PHASE 3: NEGOTIATION & CLOSE (Weeks 5-6)
+[Describe closing approach and timeline]"""),
+    ("RISKS", "RISKS: [Key risks that could derail the deal]"),
+    ("RECOMMENDED NEXT STEPS", "RECOMMENDED NEXT STEPS: [1] [action with deadline (weeks / months)], "
+                               "[2] [action with deadline], [3] [action with deadline]"),
+]
+
+_STRATEGY_PLAYBOOK = "Generate a playbook with these sections:\n\n" + "\n\n".join(
+    section for _, section in STRATEGY_SECTIONS)
+
+_STRATEGY_SCORING = """SCORING GUIDE:
+- Clear path to decision maker (35 pts): Do we have access?
+- Addressable blockers (35 pts): Can concerns be overcome?
+- Realistic timeline (30 pts): Is the timeline achievable?"""
+
+_STRATEGY_LEAD_FIELDS = """- Company: {company_name}
+- Deal Size: ${deal_size:,}
+- Timeline: {timeline}
+- Decision Maker: {decision_maker} ({decision_maker_title})
+- Champion: {champion}
+- Blockers: {blockers}
+- Competitors: {competitors}
+- Key Stakeholders:
+{stakeholders_list}"""
+
+_STRATEGY_DEFAULTS = {"deal_size": 0, "champion": "None", "blockers": "None", "competitors": []}
+
+STRATEGY_TEMPLATE = register(PromptTemplate(
+    name="strategy",
+    version="2",
+    system="You develop strategic closing playbooks for B2B deals.\n\n" + _STRATEGY_PLAYBOOK + "\n\n"
+           + _STRATEGY_SCORING + "\n\n" + _SINGLE_RESULT + """- score: number (0-100, sum based on scoring guide)
+- reasoning: string (full playbook following the format above)""",
+    user="Develop a strategic closing playbook for this deal.\n\nDEAL CONTEXT:\n" + _STRATEGY_LEAD_FIELDS,
+    defaults=_STRATEGY_DEFAULTS,
+))
+
+
+# One playbook section per request. System prompt and deal context are the same
+# for every section, so only the last line of the prompt differs.
+STRATEGY_SECTION_TEMPLATE = register(PromptTemplate(
+    name="strategy_section",
+    version="1",
+    system="You develop strategic closing playbooks for B2B deals.\n\n" + _STRATEGY_PLAYBOOK + "\n\n"
+           + "You are asked for one section at a time. Reply with that section only, as plain text, "
+           + "starting with its heading line and following the format above.",
+    user="DEAL CONTEXT:\n" + _STRATEGY_LEAD_FIELDS + "\n\nWrite the {section} section of the closing playbook.",
+    defaults=_STRATEGY_DEFAULTS,
+))
+
+# Decision-only variants: same rubric and lead fields, but only a score comes back
+_DECISION_RESULT = """Return valid JSON with exactly one field:
+- score: number (0-100)
+Do not explain the score."""
+
+ICP_DECISION_TEMPLATE = register(PromptTemplate(
+    name="icp_decision",
+    version="1",
+    system=_ICP_RUBRIC + "\n\n" + _DECISION_RESULT,
+    user="Score this lead against our Ideal Customer Profile (ICP).\n\nLead Information:\n" + _ICP_LEAD_FIELDS,
+))
+
+MARKET_INTEL_DECISION_TEMPLATE = register(PromptTemplate(
+    name="market_intel_decision",
+    version="1",
+    system=_MARKET_INTEL_RUBRIC + "\n\n" + _DECISION_RESULT,
+    user="Score this prospect's market fit.\n\nPROSPECT DATA:\n" + _MARKET_INTEL_LEAD_FIELDS,
+))
+
+STAKEHOLDER_DECISION_TEMPLATE = register(PromptTemplate(
+    name="stakeholder_decision",
+    version="1",
+    system=_STAKEHOLDER_RUBRIC + "\n\n" + _DECISION_RESULT,
+    user="Score the stakeholder dynamics for this deal.\n\nSTAKEHOLDER DATA:\n" + _STAKEHOLDER_LEAD_FIELDS,
+    defaults=_STAKEHOLDER_DEFAULTS,
+))
+
+STRATEGY_DECISION_TEMPLATE = register(PromptTemplate(
+    name="strategy_decision",
+    version="1",
+    system="You score how well a B2B deal can be closed.\n\n" + _STRATEGY_SCORING + "\n\n" + _DECISION_RESULT,
+    user="Score the path to close for this deal.\n\nDEAL CONTEXT:\n" + _STRATEGY_LEAD_FIELDS,
+    defaults=_STRATEGY_DEFAULTS,
+))
@@ -0,0 +1,151 @@
+"""Rate-limit aware scheduling of LLM requests (requests/min and tokens/min)."""
+
+import asyncio
+import time
+
+# Defaults for the `rate_limits` section of config.yml
+DEFAULT_RATE_LIMIT_CONFIG = {
+    "enabled": True,
+    "requests_per_minute": 500,
+    "tokens_per_minute": 200000,
+    "burst_seconds": 10,  # how much of a minute's allowance may be spent at once
+    "max_429_retries": 3,
+}
+
+# Rough chat-format overhead per message, in tokens
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(prompt: str, system_prompt: str = None, max_tokens: int = 0) -> int:
+    """
+    Upper-bound token cost of a request as counted by the provider:
+    prompt tokens (~4 characters each) plus the completion allowance.
+    """
+    chars = len(prompt) + len(system_prompt or "")
+    messages = 2 if system_prompt else 1
+    return chars // 4 + 1 + messages * _MESSAGE_OVERHEAD_TOKENS + (max_tokens or 0)
+
+
+class TokenBucket:
+    """Bucket refilled continuously at `per_minute` units per minute."""
+
+    def __init__(self, per_minute: float, capacity: float):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (requests larger than the bucket wait for a full one)."""
+        self._refill(now)
+        needed = min(amount, self.capacity) - self.tokens
+        return max(0.0, needed / self.rate)
+
+    def consume(self, amount: float):
+        # May go negative for oversized requests; later callers then wait it off
+        self.tokens -= amount
+
+    def refund(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateScheduler:
+    """
+    Paces LLM requests to stay inside the provider's RPM and TPM limits.
+
+    Callers queue in FIFO order (asyncio.Lock hands off in arrival order) and
+    the head of the queue sleeps until both buckets can cover its request.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, burst_seconds: float = 10):
+        burst = burst_seconds / 60.0
+        self.requests = TokenBucket(requests_per_minute, max(1, requests_per_minute * burst))
+        self.tokens = TokenBucket(tokens_per_minute, max(1, tokens_per_minute * burst))
+        self._lock = None
+        self._lock_loop = None
+        self._paused_until = 0.0
+
+        self.queue_depth = 0  # callers currently waiting
+        self.requests_scheduled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def acquire(self, estimated_tokens: int) -> float:
+        """Wait for a slot for a request of `estimated_tokens`. Returns seconds waited."""
+        start = time.monotonic()
+        self.queue_depth += 1
+        try:
+            async with self._get_lock():
+                while True:
+                    now = time.monotonic()
+                    wait = max(
+                        self._paused_until - now,
+                        self.requests.time_until(1, now),
+                        self.tokens.time_until(estimated_tokens, now),
+                    )
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+                self.requests.consume(1)
+                self.tokens.consume(estimated_tokens)
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.monotonic() - start
+        self.requests_scheduled += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.last_wait = waited
+        return waited
+
+    def try_acquire(self, estimated_tokens: int) -> bool:
+        """
+        Take a slot only if one is free right now and nobody is queued;
+        never waits. For optional requests such as hedges.
+        """
+        if self.queue_depth or self._get_lock().locked():
+            return False
+        now = time.monotonic()
+        if max(self._paused_until - now, self.requests.time_until(1, now),
+               self.tokens.time_until(estimated_tokens, now)) > 0:
+            return False
+        self.requests.consume(1)
+        self.tokens.consume(estimated_tokens)
+        self.requests_scheduled += 1
+        return True
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """Correct the token bucket once the real usage is known."""
+        if actual_tokens is None:
+            return
+        difference = estimated_tokens - actual_tokens
+        if difference > 0:
+            self.tokens.refund(difference)
+        else:
+            self.tokens.consume(-difference)
+
+    def pause(self, seconds: float):
+        """Hold every queued request for `seconds` (used after a 429)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict:
+        """Queue depth and wait-time counters."""
+        return {
+            "queue_depth": self.queue_depth,
+            "requests_scheduled": self.requests_scheduled,
+            "avg_wait": self.total_wait / self.requests_scheduled if self.requests_scheduled else 0.0,
+            "max_wait": self.max_wait,
+            "last_wait": self.last_wait,
+        }
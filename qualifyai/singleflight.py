@@ -0,0 +1,66 @@
+"""Single-flight coalescing: concurrent identical requests share one call."""
+
+import asyncio
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    The first caller for a key starts the call; callers arriving with the
+    same key while it is still running await the same result. The call is
+    cancelled only when every caller waiting on it has been cancelled; the
+    next caller for that key then starts a new call.
+    This does not keep results around once the call finishes (see cache.py).
+    """
+
+    def __init__(self):
+        self._flights = {}  # key -> _Flight
+        self.leaders = 0  # calls actually started
+        self.followers = 0  # callers served by another caller's call
+
+    async def do(self, key: str, fn):
+        """Return the result of `fn()` (a coroutine function), shared per key."""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.leaders += 1
+        else:
+            self.followers += 1
+
+        flight.waiters += 1
+        try:
+            # Shield so one caller's cancellation does not cancel the shared call
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                # Until the task has finished cancelling, a new caller must not join it
+                self._forget(key, flight)
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> dict:
+        """Calls started vs callers coalesced onto them."""
+        requests = self.leaders + self.followers
+        return {
+            "calls": self.leaders,
+            "coalesced": self.followers,
+            "coalescing_ratio": self.followers / requests if requests else 0.0,
+            "in_flight": self.in_flight,
+        }
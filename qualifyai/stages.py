@@ -1,6 +1,10 @@
 """Stage implementations with decision logic."""
 
 import asyncio
+import time
+from . import metrics
+from .fused import FusedCall
+from .llm_client import add_prefilled_responses, trace_span
 from .agents import (
     ICPAgent, BudgetAgent, MarketIntelAgent,
     CompetitionAgent, StakeholderAgent, TechnicalFitAgent,
@@ -11,14 +15,121 @@ from .agents import (
 class Stage:
     """Base stage class."""
 
-    def __init__(self, name: str, agents: list):
+    def __init__(self, name: str, agents: list, early_exit: bool = True, fused: bool = False,
+                 decision_only: bool = False):
         self.name = name
         self.agents = agents  # Must be exactly 3
+        self.early_exit = early_exit  # Skip / cancel LLM agents once the decision is known
+        llm_agents = [agent for agent in agents if agent.uses_llm]
+        # LLM agents ask for a score only; narratives are generated lazily
+        for agent in llm_agents:
+            agent.decision_only = decision_only
+        # One combined request for the stage's LLM agents (only with 2+ of them, and
+        # not in decision-only mode, whose score requests are already minimal)
+        self.fused_call = FusedCall(llm_agents) if fused and not decision_only and len(llm_agents) > 1 else None
 
     async def evaluate(self, lead_data: dict) -> dict:
         """Run all 3 agents in parallel and make decision."""
         raise NotImplementedError
 
+    def early_decision(self, results: list):
+        """
+        Decision already implied by the finished agents, or None if the
+        agents still pending could change it. `results` holds None for
+        pending agents. Only rejections can be known early.
+        """
+        return None
+
+    async def run_agents(self, lead_data: dict) -> list:
+        """
+        Run the stage's agents, cheap rule-based agents first.
+
+        LLM agents are started only if the rule-based results leave the
+        decision open, and are cancelled as soon as early_decision() settles
+        it. Agents that did not finish get a skipped result (score None) in
+        their slot, so results keep the same order as self.agents.
+        In fused mode the LLM agents are answered by one FusedCall request.
+        """
+        if not self.early_exit:
+            answers = await self.fused_call.answers(lead_data) if self.fused_call else None
+            return await _gather_agents([_evaluate(agent, lead_data, answers) for agent in self.agents])
+
+        results = [None] * len(self.agents)
+        rule_slots = [i for i, agent in enumerate(self.agents) if not agent.uses_llm]
+        llm_slots = [i for i, agent in enumerate(self.agents) if agent.uses_llm]
+
+        rule_results = await _gather_agents([_evaluate(self.agents[i], lead_data) for i in rule_slots])
+        for i, result in zip(rule_slots, rule_results):
+            results[i] = result
+
+        if llm_slots and self.early_decision(results) is None:
+            answers = await self.fused_call.answers(lead_data) if self.fused_call else None
+            tasks = {asyncio.create_task(_evaluate(self.agents[i], lead_data, answers)): i for i in llm_slots}
+            pending = set(tasks)
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    # Retrieve every error (e.g. several agents timing out together), raise the first
+                    errors = [task.exception() for task in done if task.exception() is not None]
+                    if errors:
+                        raise errors[0]
+                    for task in done:
+                        results[tasks[task]] = task.result()
+                    if pending and self.early_decision(results) is not None:
+                        break
+            finally:
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+
+        for i, result in enumerate(results):
+            if result is None:
+                results[i] = {
+                    "agent": self.agents[i].name,
+                    "score": None,
+                    "skipped": True,
+                    "reasoning": "Skipped: stage decision was already determined",
+                    "recommendation": None
+                }
+        return results
+
+
+async def _evaluate(agent, lead_data, answers: dict = None) -> dict:
+    """
+    agent.evaluate() in an agent span (and timed), with its LLM call
+    answered from `answers` (request_key -> text) if there.
+    """
+    if answers:
+        add_prefilled_responses(answers)
+    with trace_span(agent.name, "agent", uses_llm=agent.uses_llm) as span:
+        start = time.perf_counter()
+        result = await agent.evaluate(lead_data)
+        metrics.AGENT_SECONDS.observe(time.perf_counter() - start, agent.name)
+        span.set(score=result.get("score"), recommendation=result.get("recommendation"))
+        return result
+
+
+async def _gather_agents(coroutines: list) -> list:
+    """
+    Results of agent evaluations run concurrently, in order. If one raises
+    (e.g. LLMTimeoutError), the others are cancelled and drained before the
+    error propagates, so none keeps running or leaves an unretrieved error.
+    """
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return list(await asyncio.gather(*tasks))
+    finally:
+        unfinished = [task for task in tasks if not task.done()]
+        for task in unfinished:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _score_label(result: dict) -> str:
+    """Score for reasoning strings ('skipped' for agents that did not run)."""
+    return "skipped" if result.get("skipped") else str(result["score"])
+
 
 class Stage1(Stage):
     """
@@ -27,30 +138,35 @@ class Stage1(Stage):
     Decision Rule: PROCEED if ALL three agents score >= 70
     """
 
-    def __init__(self):
+    def __init__(self, early_exit: bool = True, fused: bool = False, decision_only: bool = False):
         agents = [ICPAgent(), BudgetAgent(), MarketIntelAgent()]
-        super().__init__("Fit Assessment", agents)
+        super().__init__("Fit Assessment", agents, early_exit, fused, decision_only)
+
+    def early_decision(self, results: list):
+        """Any finished agent below 70 rejects the stage."""
+        if any(r is not None and r["score"] < 70 for r in results):
+            return "REJECT"
+        return None
 
     async def evaluate(self, lead_data: dict) -> dict:
         """Run all 3 agents in parallel and check if ALL scored >= 70."""
-        # Run agents in parallel
-        results = await asyncio.gather(*[agent.evaluate(lead_data) for agent in self.agents])
+        results = await self.run_agents(lead_data)
 
-        # Get all scores
-        scores = [r["score"] for r in results]
+        # Get all scores (agents skipped after an early reject have none)
+        scores = [r["score"] for r in results if not r.get("skipped")]
 
         # Decision: ALL must be >= 70
-        all_pass = all(score >= 70 for score in scores)
+        all_pass = len(scores) == len(results) and all(score >= 70 for score in scores)
         decision = "PROCEED" if all_pass else "REJECT"
 
         # Build reasoning
-        score_parts = [f"{r['agent']}: {r['score']}" for r in results]
+        score_parts = [f"{r['agent']}: {_score_label(r)}" for r in results]
         reasoning = f"Scores: {', '.join(score_parts)}. "
 
         if all_pass:
             reasoning += "All agents scored >= 70."
         else:
-            failed = [r["agent"] for r in results if r["score"] < 70]
+            failed = [r["agent"] for r in results if not r.get("skipped") and r["score"] < 70]
             reasoning += f"Failed agents (< 70): {', '.join(failed)}."
 
         return {
@@ -68,26 +184,39 @@ class Stage2(Stage):
     Decision Rule: PROCEED if average score >= 75 AND no individual score < 60
     """
 
-    def __init__(self):
+    def __init__(self, early_exit: bool = True, fused: bool = False, decision_only: bool = False):
         agents = [CompetitionAgent(), StakeholderAgent(), TechnicalFitAgent()]
-        super().__init__("Win Probability", agents)
+        super().__init__("Win Probability", agents, early_exit, fused, decision_only)
+
+    def early_decision(self, results: list):
+        """Reject once a finished score is < 60 or the best possible average is < 75."""
+        scores = [r["score"] for r in results if r is not None]
+        if any(score < 60 for score in scores):
+            return "REJECT"
+        # Pending agents score at most 100
+        best_avg = (sum(scores) + 100 * (len(results) - len(scores))) / len(results)
+        if best_avg < 75:
+            return "REJECT"
+        return None
 
     async def evaluate(self, lead_data: dict) -> dict:
         """Run all 3 agents in parallel. PROCEED if average >= 75 AND min >= 60."""
-        # Run agents in parallel
-        results = await asyncio.gather(*[agent.evaluate(lead_data) for agent in self.agents])
+        results = await self.run_agents(lead_data)
 
-        # Calculate average and minimum
-        scores = [r["score"] for r in results]
-        avg_score = sum(scores) / len(scores)
+        # Calculate average and minimum. Skipped agents (early reject) count
+        # as 100, so avg is then an upper bound that is already below 75.
+        scores = [r["score"] for r in results if not r.get("skipped")]
+        skipped = len(results) - len(scores)
+        avg_score = (sum(scores) + 100 * skipped) / len(results)
         min_score = min(scores)
 
         # Decision: avg >= 75 AND min >= 60
-        decision = "PROCEED" if (avg_score >= 75 and min_score >= 60) else "REJECT"
+        decision = "PROCEED" if (avg_score >= 75 and min_score >= 60 and not skipped) else "REJECT"
 
         # Build reasoning
-        score_parts = [f"{r['agent']}: {r['score']}" for r in results]
-        reasoning = f"Scores: {', '.join(score_parts)}. Avg: {avg_score:.1f}, Min: {min_score}. "
+        score_parts = [f"{r['agent']}: {_score_label(r)}" for r in results]
+        avg_label = f"Avg: <= {avg_score:.1f}" if skipped else f"Avg: {avg_score:.1f}"
+        reasoning = f"Scores: {', '.join(score_parts)}. {avg_label}, Min: {min_score}. "
 
         if decision == "PROCEED":
             reasoning += "Passed (avg >= 75, min >= 60)."
@@ -113,26 +242,40 @@ class Stage3(Stage):
     Decision Rule: QUALIFIED if risk_level <= MEDIUM AND resource_score >= 70 AND strategy_score >= 70
     """
 
-    def __init__(self):
-        agents = [RiskAgent(), ResourceAgent(), StrategyAgent()]
-        super().__init__("Strategy & Execution", agents)
+    def __init__(self, early_exit: bool = True, fused: bool = False, stream_strategy: bool = False,
+                 decision_only: bool = False, parallel_playbook: bool = False):
+        strategy = StrategyAgent(stream=stream_strategy, parallel_playbook=parallel_playbook)
+        agents = [RiskAgent(), ResourceAgent(), strategy]
+        super().__init__("Strategy & Execution", agents, early_exit, fused, decision_only)
+
+    def early_decision(self, results: list):
+        """HIGH risk, resource < 70 or strategy < 70 each reject on their own."""
+        risk, resource, strategy = results
+        if risk is not None and risk.get("risk_level", "HIGH") not in ["LOW", "MEDIUM"]:
+            return "REJECT"
+        if resource is not None and resource["score"] < 70:
+            return "REJECT"
+        if strategy is not None and strategy["score"] < 70:
+            return "REJECT"
+        return None
 
     async def evaluate(self, lead_data: dict) -> dict:
         """Run all 3 agents. QUALIFIED if risk <= MEDIUM AND resource >= 70 AND strategy >= 70."""
-        # Run agents in parallel
-        results = await asyncio.gather(*[agent.evaluate(lead_data) for agent in self.agents])
+        results = await self.run_agents(lead_data)
 
         # Extract scores (RiskAgent, ResourceAgent, StrategyAgent)
         risk_level = results[0].get("risk_level", "HIGH")
         resource_score = results[1]["score"]
         strategy_score = results[2]["score"]
+        strategy_skipped = results[2].get("skipped", False)
 
         # Decision: risk OK AND resource >= 70 AND strategy >= 70
         risk_ok = risk_level in ["LOW", "MEDIUM"]
-        decision = "QUALIFIED" if (risk_ok and resource_score >= 70 and strategy_score >= 70) else "REJECT"
+        strategy_ok = not strategy_skipped and strategy_score >= 70
+        decision = "QUALIFIED" if (risk_ok and resource_score >= 70 and strategy_ok) else "REJECT"
 
         # Build reasoning
-        reasoning = f"Risk: {risk_level}, Resource: {resource_score}, Strategy: {strategy_score}. "
+        reasoning = f"Risk: {risk_level}, Resource: {resource_score}, Strategy: {_score_label(results[2])}. "
 
         if decision == "QUALIFIED":
             reasoning += "All criteria met."
@@ -142,7 +285,7 @@ class Stage3(Stage):
                 issues.append(f"risk {risk_level} too high")
             if resource_score < 70:
                 issues.append(f"resource {resource_score} < 70")
-            if strategy_score < 70:
+            if not strategy_skipped and strategy_score < 70:
                 issues.append(f"strategy {strategy_score} < 70")
             reasoning += f"Failed: {', '.join(issues)}."
 
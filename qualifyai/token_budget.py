@@ -0,0 +1,87 @@
+"""
+Learned output-token caps (max_tokens) per agent.
+
+Callers ask for a generous max_tokens (1000 by default), but most agents
+answer in a few dozen tokens. The budget keeps a sliding window of actual
+completion lengths per agent and, once it has enough of them, sends
+max_tokens = p-th percentile x headroom instead (never more than the caller
+asked for). A smaller cap bounds the worst-case generation time and lets the
+rate scheduler reserve fewer tokens per request. An answer cut off by the
+learned cap (finish_reason "length") is retried once with the caller's
+max_tokens, and its length goes into the window so the cap adapts.
+
+Caps are kept per (agent, requested max_tokens), so e.g. micro-batches of
+different sizes learn separately. Request keys (cache, cassette, batch jobs)
+always use the requested max_tokens, so learned caps never change them.
+"""
+
+import math
+from collections import deque
+
+# Defaults for the `token_budget` section of config.yml
+DEFAULT_TOKEN_BUDGET_CONFIG = {
+    "enabled": True,
+    "percentile": 99,  # cap at this percentile of recent completion lengths...
+    "headroom": 1.25,  # ...times this
+    "min_samples": 20,  # per agent, before any cap
+    "window": 500,  # recent completion lengths kept per agent
+    "min_tokens": 16,  # never cap below this
+}
+
+
+class TokenBudget:
+    """Per-agent max_tokens learned from completion lengths."""
+
+    def __init__(self, percentile: float = 99, headroom: float = 1.25, min_samples: int = 20, window: int = 500,
+                 min_tokens: int = 16):
+        self.percentile = percentile
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self.window = window
+        self.min_tokens = min_tokens
+        self._lengths = {}  # (agent, requested max_tokens) -> deque of completion tokens
+        self._truncations = {}  # (agent, requested max_tokens) -> retries after hitting the cap
+        self.capped = 0  # requests sent with a learned cap
+        self.retries = 0
+
+    def cap(self, agent: str, requested: int) -> int:
+        """max_tokens to send for a request that asked for `requested`."""
+        cap = self._learned_cap(self._lengths.get((agent or "unknown", requested)), requested)
+        if cap < requested:
+            self.capped += 1
+        return cap
+
+    def _learned_cap(self, lengths, requested: int) -> int:
+        if lengths is None or len(lengths) < self.min_samples:
+            return requested
+        ordered = sorted(lengths)
+        learned = ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))]
+        return min(requested, max(self.min_tokens, math.ceil(learned * self.headroom)))
+
+    def record(self, agent: str, requested: int, completion_tokens: int):
+        """Completion length of an answer that was not cut off by a learned cap."""
+        key = (agent or "unknown", requested)
+        lengths = self._lengths.get(key)
+        if lengths is None:
+            lengths = self._lengths[key] = deque(maxlen=self.window)
+        lengths.append(completion_tokens)
+
+    def record_truncation(self, agent: str, requested: int):
+        """An answer hit the learned cap and is being retried."""
+        key = (agent or "unknown", requested)
+        self._truncations[key] = self._truncations.get(key, 0) + 1
+        self.retries += 1
+
+    def stats(self) -> dict:
+        """Current cap and observed lengths per "agent / requested max_tokens"."""
+        agents = {}
+        for (agent, requested), lengths in self._lengths.items():
+            ordered = sorted(lengths)
+            agents[f"{agent} / {requested}"] = {
+                "samples": len(ordered),
+                "p50": ordered[len(ordered) // 2],
+                "max": ordered[-1],
+                "cap": self._learned_cap(lengths, requested),
+                "truncations": self._truncations.get((agent, requested), 0),
+            }
+        return {"capped_requests": self.capped, "truncation_retries": self.retries, "agents": agents}
@@ -0,0 +1,223 @@
+"""
+Span tracing for the pipeline, exported to a local JSONL file.
+
+Spans follow OpenTelemetry's model (trace id, span id, parent id, start / end
+time, attributes, status) without needing a collector: every lead is one
+trace, with stage spans under it, agent spans under those and one span per
+LLM call. LLM spans carry the time spent waiting for the rate scheduler,
+the provider latency, token counts and whether the response came from the
+cache. A span ends with status "ok", "error" or "cancelled" (e.g. an agent
+cancelled by a stage's early exit).
+
+`summarize_spans(path)` reads the file back and breaks down each stage's
+critical path (the chain of spans that finished last).
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import secrets
+import time
+from contextlib import contextmanager
+
+# Defaults for the `tracing` section of config.yml
+DEFAULT_TRACING_CONFIG = {
+    "enabled": False,
+    "path": "traces/spans.jsonl",  # relative to project root
+}
+
+# Span of the code running in the current task (parent of new spans)
+_current_span = contextvars.ContextVar("qualifyai_current_span", default=None)
+
+
+class Span:
+    """One timed operation. Attributes can be set until the span ends."""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start", "end", "status", "attributes")
+
+    def __init__(self, name: str, kind: str, parent=None, attributes: dict = None):
+        self.name = name
+        self.kind = kind  # lead / stage / agent / llm
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start = time.time()
+        self.end = None
+        self.status = None
+        self.attributes = dict(attributes or {})
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, name: str, amount: float):
+        """Add to a numeric attribute (e.g. tokens of several provider calls)."""
+        self.attributes[name] = self.attributes.get(name, 0) + amount
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "end": self.end,
+            "duration_ms": round((self.end - self.start) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a Span when tracing is disabled."""
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, name: str, amount: float):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Creates spans and appends each finished span to a JSONL file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self.spans_written = 0
+
+    def start_span(self, name: str, kind: str, **attributes) -> Span:
+        """Span under the current one; not made current (see span()), end it with end_span()."""
+        return Span(name, kind, _current_span.get(), attributes)
+
+    def end_span(self, span: Span, status: str = "ok"):
+        span.end = time.time()
+        span.status = status
+        self._write(span.to_dict())
+
+    @contextmanager
+    def span(self, name: str, kind: str, **attributes):
+        """Span around a block, current for everything started inside it (including tasks)."""
+        span = self.start_span(name, kind, **attributes)
+        token = _current_span.set(span)
+        status = "ok"
+        try:
+            yield span
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            status = "error"
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span, status)
+
+    def _write(self, record: dict):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self.spans_written += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def current_span():
+    """Span of the running code, or None outside any span."""
+    return _current_span.get()
+
+
+def read_spans(path: str) -> list:
+    """All span dicts in a JSONL trace file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _critical_path(span: dict, children: dict) -> list:
+    """`span` and, recursively, its child that finished last."""
+    path = [span]
+    while children.get(path[-1]["span_id"]):
+        path.append(max(children[path[-1]["span_id"]], key=lambda child: child["end"]))
+    return path
+
+
+def _percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def _provider_ms(span: dict) -> float:
+    """Provider latency of an LLM span; a coalesced call waited on another caller's request."""
+    if span["attributes"].get("source") == "coalesced":
+        return span["duration_ms"]
+    return span["attributes"].get("latency_ms", 0)
+
+
+def summarize_spans(path: str) -> str:
+    """
+    Per-stage critical-path breakdown of a trace file: stage latency, which
+    agent the stage waited on, and how that agent's time splits into rate
+    scheduler queue wait, provider latency and everything else.
+    """
+    spans = read_spans(path)
+    children = {}
+    for span in spans:
+        if span["parent_id"]:
+            children.setdefault(span["parent_id"], []).append(span)
+
+    leads = [span for span in spans if span["kind"] == "lead"]
+    stages = {}  # stage name -> per-span breakdowns
+    for span in spans:
+        if span["kind"] != "stage":
+            continue
+        critical = _critical_path(span, children)
+        llm = [s for s in critical if s["kind"] == "llm"]
+        agent = next((s["name"] for s in critical if s["kind"] == "agent"), None)
+        queue = sum(s["attributes"].get("queue_wait_ms", 0) for s in llm)
+        provider = sum(_provider_ms(s) for s in llm)
+        stages.setdefault(span["name"], []).append({
+            "duration": span["duration_ms"],
+            "agent": agent,
+            "queue": queue,
+            "provider": provider,
+            "other": max(0.0, span["duration_ms"] - queue - provider),
+            "cancelled": sum(1 for s in children.get(span["span_id"], []) if s["status"] == "cancelled"),
+        })
+
+    lines = [f"{len(leads):,} leads, {len(spans):,} spans"]
+    if leads:
+        durations = [span["duration_ms"] for span in leads]
+        lines.append(f"Lead latency: p50 {_percentile(durations, 50):,.0f} ms, "
+                     f"p95 {_percentile(durations, 95):,.0f} ms, max {max(durations):,.0f} ms")
+    for name, rows in stages.items():
+        n = len(rows)
+        durations = [row["duration"] for row in rows]
+        mean = sum(durations) / n
+        lines.append("")
+        lines.append(f"{name}: {n:,} runs, p50 {_percentile(durations, 50):,.0f} ms, "
+                     f"p95 {_percentile(durations, 95):,.0f} ms")
+        for part, label in [("queue", "rate queue wait"), ("provider", "LLM latency"), ("other", "other")]:
+            part_mean = sum(row[part] for row in rows) / n
+            share = part_mean / mean if mean else 0.0
+            lines.append(f"  {label:<18}{part_mean:>10,.0f} ms{share:>8.0%}")
+        waited_on = {}
+        for row in rows:
+            if row["agent"]:
+                waited_on[row["agent"]] = waited_on.get(row["agent"], 0) + 1
+        for agent, count in sorted(waited_on.items(), key=lambda item: -item[1]):
+            lines.append(f"  critical agent: {agent:<28}{count / n:>6.0%}")
+        cancelled = sum(row["cancelled"] for row in rows)
+        if cancelled:
+            lines.append(f"  agents cancelled by early exit: {cancelled:,}")
+    return "\n".join(lines)
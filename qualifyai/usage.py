@@ -0,0 +1,50 @@
+"""Per-agent token usage, taken from the `usage` block of API responses."""
+
+
+class UsageTracker:
+    """
+    Totals of prompt, cached-prompt and completion tokens per agent.
+    Cached prompt tokens are the part of the prompt prefix the provider
+    served from its prompt cache (cheaper and faster than fresh tokens).
+    """
+
+    def __init__(self):
+        self._agents = {}  # agent -> totals dict
+
+    def record(self, agent: str, response):
+        """Add one chat completion response's usage to `agent`'s totals."""
+        self.record_usage(agent, getattr(response, "usage", None))
+
+    def record_usage(self, agent: str, usage):
+        """Add a `usage` block (e.g. from the last chunk of a stream) to `agent`'s totals."""
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or 0
+
+        totals = self._agents.setdefault(agent or "unknown", {
+            "calls": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0,
+        })
+        totals["calls"] += 1
+        totals["prompt_tokens"] += usage.prompt_tokens or 0
+        totals["cached_prompt_tokens"] += cached
+        totals["completion_tokens"] += usage.completion_tokens or 0
+
+    def stats(self) -> dict:
+        """agent -> totals, plus the share of prompt tokens served from cache."""
+        stats = {}
+        for agent, totals in self._agents.items():
+            prompt = totals["prompt_tokens"]
+            stats[agent] = {**totals, "cached_ratio": totals["cached_prompt_tokens"] / prompt if prompt else 0.0}
+        return stats
+
+    def report(self) -> str:
+        """Human-readable per-agent table."""
+        lines = [f"{'Agent':<36}{'Calls':>8}{'Prompt':>12}{'Cached':>12}{'Cached %':>10}{'Completion':>12}"]
+        for agent, s in sorted(self.stats().items()):
+            lines.append(f"{agent:<36}{s['calls']:>8,}{s['prompt_tokens']:>12,}{s['cached_prompt_tokens']:>12,}"
+                         f"{s['cached_ratio']:>10.1%}{s['completion_tokens']:>12,}")
+        return "\n".join(lines)
+
+    def reset(self):
+        self._agents.clear()
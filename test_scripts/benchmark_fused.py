@@ -0,0 +1,57 @@
+"""Benchmark fused vs split LLM calls in Stage 1 (latency and tokens; makes real API calls)"""
+
+import sys
+sys.path.insert(0, '..')
+
+import asyncio
+import statistics
+import time
+from qualifyai.llm_client import get_client_manager
+from qualifyai.stages import Stage1
+from qualifyai.test_cases import TEST_CASES
+
+ROUNDS = 3
+
+
+async def run_mode(fused: bool, leads: list) -> dict:
+    """Stage 1 latency per lead and the tokens it used."""
+    manager = get_client_manager()
+    manager.usage.reset()
+    stage = Stage1(early_exit=False, fused=fused)
+
+    latencies = []
+    for lead in leads:
+        start = time.perf_counter()
+        await stage.evaluate(lead)
+        latencies.append(time.perf_counter() - start)
+
+    totals = manager.usage.stats().values()
+    return {
+        "calls": sum(t["calls"] for t in totals),
+        "prompt_tokens": sum(t["prompt_tokens"] for t in totals),
+        "completion_tokens": sum(t["completion_tokens"] for t in totals),
+        "p50": statistics.median(latencies),
+        "mean": statistics.mean(latencies),
+    }
+
+
+async def main():
+    # Every request must reach the API, or the second mode would be served from cache
+    get_client_manager().config["cache"] = {"enabled": False}
+    leads = [lead["data"] for lead in TEST_CASES.values()] * ROUNDS
+
+    print("Fused vs split Stage 1 benchmark")
+    print(f"Leads: {len(leads)}\n")
+    print(f"{'Mode':<8}{'Calls':>8}{'Prompt tok':>12}{'Compl. tok':>12}{'p50 (s)':>10}{'mean (s)':>10}")
+    print('-'*60)
+    try:
+        for mode, fused in [("split", False), ("fused", True)]:
+            r = await run_mode(fused, leads)
+            print(f"{mode:<8}{r['calls']:>8}{r['prompt_tokens']:>12,}{r['completion_tokens']:>12,}"
+                  f"{r['p50']:>10.2f}{r['mean']:>10.2f}")
+    finally:
+        await get_client_manager().aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
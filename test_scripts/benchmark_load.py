@@ -0,0 +1,128 @@
+"""
+Load benchmark: the full pipeline against the local mock OpenAI server (no API cost).
+
+Runs LeadQualifyPipeline over synthetic leads (qualifyai/lead_generator.py)
+at several concurrency levels and reports leads/sec, p50 / p95 / p99 lead
+latency and LLM calls per lead.
+Results are also written as JSON (--output) so runs can be compared.
+
+    python benchmark_load.py --leads 500 --concurrency 1 10 50 --latency-ms 300
+"""
+
+import sys
+sys.path.insert(0, '..')
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import time
+from qualifyai.lead_generator import LeadGenerator
+from qualifyai.llm_client import get_client_manager
+from qualifyai.mock_server import MockLLMServer
+from qualifyai.pipeline import LeadQualifyPipeline
+from qualifyai.stages import Stage1, Stage2, Stage3
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+async def run_level(server: MockLLMServer, concurrency: int, leads: list) -> dict:
+    """Qualify `leads` with `concurrency` in flight; latency per lead and totals."""
+    pipeline = LeadQualifyPipeline([Stage1(), Stage2(), Stage3()], verbose=False)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    decisions = {}
+
+    async def qualify(lead):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                decision = (await pipeline.qualify(lead))["final_decision"]
+            except Exception:
+                decision = "ERROR"
+            latencies.append(time.perf_counter() - start)
+            decisions[decision] = decisions.get(decision, 0) + 1
+
+    requests_before = server.requests
+    start = time.perf_counter()
+    await asyncio.gather(*[qualify(lead) for lead in leads])
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "leads": len(leads),
+        "seconds": round(elapsed, 3),
+        "leads_per_sec": round(len(leads) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1),
+        "calls_per_lead": round((server.requests - requests_before) / len(leads), 2),
+        "decisions": decisions,
+    }
+
+
+async def main(args):
+    server = MockLLMServer(args.latency_ms, args.latency_sigma, args.error_rate, args.rate_limit_rate,
+                           seed=args.seed)
+    base_url = await server.start()
+
+    # Every lead must reach the (mock) API; the mock sets no real rate limits
+    config = get_client_manager().config
+    config["openai_api_key"] = "mock"
+    config["llm"] = {**(config.get("llm") or {}), "base_url": base_url,
+                     "max_connections": max(100, max(args.concurrency) * 3)}
+    config["cache"] = {"enabled": False}
+    config["rate_limits"] = {"enabled": False}
+
+    print("Load benchmark (mock OpenAI server)")
+    print(f"Leads per level: {args.leads}, median latency {args.latency_ms:.0f} ms, "
+          f"errors {args.error_rate:.1%}, 429s {args.rate_limit_rate:.1%}\n")
+    print(f"{'Conc.':>6}{'Leads/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Calls/lead':>12}")
+    print('-'*58)
+
+    results = []
+    try:
+        for concurrency in args.concurrency:
+            # A different seed per level, so levels do not share leads
+            generator = LeadGenerator(args.seed + concurrency, duplicate_rate=args.duplicate_rate,
+                                      near_duplicate_rate=args.near_duplicate_rate)
+            leads = list(generator.generate(args.leads))
+            r = await run_level(server, concurrency, leads)
+            results.append(r)
+            print(f"{concurrency:>6}{r['leads_per_sec']:>10.1f}{r['p50_ms']:>10.0f}{r['p95_ms']:>10.0f}"
+                  f"{r['p99_ms']:>10.0f}{r['calls_per_lead']:>12.2f}")
+    finally:
+        await get_client_manager().aclose()
+        await server.close()
+
+    report = {
+        "benchmark": "load",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "settings": {key: value for key, value in vars(args).items() if key != "output"},
+        "server": server.stats(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWritten to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--leads", type=int, default=200, help="Leads per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latency-ms", type=float, default=300, help="Mock median response time")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--duplicate-rate", type=float, default=0.0, help="Share of leads repeating an earlier one")
+    parser.add_argument("--near-duplicate-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="benchmark_load.json", help="JSON results file")
+    asyncio.run(main(parser.parse_args()))
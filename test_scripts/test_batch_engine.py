@@ -0,0 +1,86 @@
+"""Testing for the vectorized rule-based batch engine (must match the agents exactly)"""
+
+import sys
+sys.path.insert(0, '..')
+
+import asyncio
+import random
+import time
+from qualifyai.agents import BudgetAgent, CompetitionAgent, TechnicalFitAgent, RiskAgent, ResourceAgent
+from qualifyai.batch_engine import RuleBatchEngine, to_columns
+
+FUNDING = ["Series A", "Series B", "Series C", "Series D", "IPO", "Seed", "Bootstrapped", ""]
+SATISFACTION = ["low", "Medium", "HIGH", ""]
+COMPLEXITY = ["Low", "Medium", "High", ""]
+TIMELINES = ["Q2 decision", "URGENT - need ASAP", "asap", "Next year", ""]
+TECH = ["AWS", "Kubernetes", "Docker", "Python", "React", "Java", ".NET", "Oracle", "GitHub", "Node.js"]
+
+
+def random_lead(rng: random.Random) -> dict:
+    """Random lead covering every branch of the rule-based agents."""
+    return {
+        "budget": rng.choice([0, 5000, 49999, 50000, 99999, 100000, 250000]),
+        "funding_stage": rng.choice(FUNDING),
+        "competitors": rng.sample(["Jenkins", "CircleCI", "GitLab"], rng.randint(0, 3)),
+        "current_solution": rng.choice(["None", "", "Jenkins", "Custom scripts"]),
+        "satisfaction_with_current": rng.choice(SATISFACTION),
+        "our_advantage": rng.choice(["Strong AI", "Unique integration", "Faster builds", ""]),
+        "tech_stack": rng.sample(TECH, rng.randint(0, 6)),
+        "integration_complexity": rng.choice(COMPLEXITY),
+        "technical_requirements": rng.choice(["SOC2 compliance", "Security first", "Legacy mainframe", ""]),
+        "budget_freeze": rng.random() < 0.2,
+        "recent_layoffs": rng.random() < 0.2,
+        "competitor_relationship": rng.random() < 0.2,
+        "has_champion": rng.random() < 0.8,
+        "deal_size": rng.choice([0, 150000, 200000, 500000, 500001, 900000]),
+        "timeline": rng.choice(TIMELINES),
+        "implementation_complexity": rng.choice(COMPLEXITY),
+    }
+
+
+async def main():
+    rng = random.Random(7)
+    leads = [random_lead(rng) for _ in range(5000)]
+
+    print("Testing Rule Batch Engine")
+
+    engine = RuleBatchEngine()
+    result = engine.evaluate(leads)
+
+    agents = {
+        "budget_score": BudgetAgent(),
+        "competition_score": CompetitionAgent(),
+        "technical_score": TechnicalFitAgent(),
+        "resource_score": ResourceAgent(),
+    }
+    risk_agent = RiskAgent()
+
+    mismatches = 0
+    for i, lead in enumerate(leads):
+        for column, agent in agents.items():
+            expected = (await agent.evaluate(lead))["score"]
+            if result[column][i] != expected:
+                mismatches += 1
+                print(f"Mismatch lead {i} {column}: batch {result[column][i]} vs agent {expected}")
+        risk = await risk_agent.evaluate(lead)
+        if result["risk_score"][i] != risk["score"] or result["risk_level"][i] != risk["risk_level"]:
+            mismatches += 1
+            print(f"Mismatch lead {i} risk: batch {result['risk_level'][i]} vs agent {risk['risk_level']}")
+
+    print(f"Leads compared: {len(leads)}")
+    print(f"Mismatches: {mismatches}")
+    print(f"Pre-screen rejects: {int(result['prescreen_reject'].sum())}")
+
+    # Throughput on a larger batch
+    big = leads * 200
+    start = time.perf_counter()
+    columns = to_columns(big)
+    convert = time.perf_counter() - start
+    start = time.perf_counter()
+    engine.evaluate(columns)
+    score = time.perf_counter() - start
+    print(f"\n{len(big):,} leads: columns {convert:.2f}s, scoring {score:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+"""Testing that offline batch files cover every request the stages make (no live fallbacks)"""
+
+import sys
+sys.path.insert(0, '..')
+
+import asyncio
+import os
+import tempfile
+from qualifyai.batch_jobs import BatchQualifier, LocalBatchBackend
+from qualifyai.lead_generator import LeadGenerator
+from qualifyai.llm_client import get_client_manager
+from qualifyai.mock_server import MockLLMServer
+from qualifyai.stages import Stage1, Stage2, Stage3
+
+# Stage setups whose requests differ from the agents' plain ones (max_tokens, json_schema, sections)
+SETUPS = {
+    "default": lambda: [Stage1(), Stage2(), Stage3()],
+    "decision-only": lambda: [Stage1(decision_only=True), Stage2(decision_only=True), Stage3(decision_only=True)],
+    "fused": lambda: [Stage1(fused=True), Stage2(fused=True), Stage3(fused=True)],
+    "parallel playbook": lambda: [Stage1(), Stage2(), Stage3(parallel_playbook=True)],
+    "decision-only + parallel playbook": lambda: [
+        Stage1(decision_only=True), Stage2(decision_only=True), Stage3(decision_only=True, parallel_playbook=True)
+    ],
+}
+
+
+async def main():
+    print("Testing batch job request coverage")
+    # Requests the batch misses would go live: send them to the mock API, not a paid one
+    server = MockLLMServer(latency_ms=1)
+    base_url = await server.start()
+    manager = get_client_manager()
+    config = manager.config
+    config["openai_api_key"] = "mock"
+    config["llm"] = {**(config.get("llm") or {}), "base_url": base_url}
+    config["cache"] = {"enabled": False}
+
+    leads = list(LeadGenerator(seed=3).generate(20))
+    try:
+        for name, stages in SETUPS.items():
+            job_dir = tempfile.mkdtemp()
+            backend = LocalBatchBackend(os.path.join(job_dir, "local_backend"))
+            qualifier = BatchQualifier(stages(), backend, job_dir, poll_interval=0, verbose=False)
+            results = await qualifier.run(leads)
+            decisions = [result["final_decision"] for result in results]
+            print(f"{name:<35} live calls: {qualifier.live_calls:<4} "
+                  f"qualified: {decisions.count('QUALIFIED')}/{len(decisions)}")
+            assert qualifier.live_calls == 0, f"{name}: the batch missed {qualifier.live_calls} requests"
+    finally:
+        await manager.aclose()
+        await server.close()
+    print("\nBatch requests cover every call: OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
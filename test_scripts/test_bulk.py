@@ -0,0 +1,42 @@
+"""Test bulk qualification (qualify_many / qualify_iter)"""
+
+import sys
+sys.path.insert(0, '..')
+
+import asyncio
+import time
+from qualifyai.pipeline import LeadQualifyPipeline
+from qualifyai.stages import Stage1, Stage2, Stage3
+from qualifyai.test_cases import TEST_CASES
+
+
+async def main():
+    pipeline = LeadQualifyPipeline([Stage1(), Stage2(), Stage3()], verbose=False)
+
+    names = list(TEST_CASES.keys())
+    leads = [TEST_CASES[name]["data"] for name in names]
+
+    print("Bulk qualification test")
+    print(f"Leads: {len(leads)}")
+
+    start = time.perf_counter()
+    results = await pipeline.qualify_many(leads, concurrency=5)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'Case':<20} {'Expected':<25} {'Actual':<15}")
+    print('-'*60)
+    for name, result in zip(names, results):
+        actual = result["final_decision"]
+        if result["rejected_at_stage"]:
+            actual += f" at {result['rejected_at_stage']}"
+        print(f"{name:<20} {TEST_CASES[name]['expected']:<25} {actual:<15}")
+
+    print(f"\nCompleted in {elapsed:.2f}s")
+
+    print("\n--- Streaming (completion order) ---")
+    async for index, result in pipeline.qualify_iter(leads, concurrency=2):
+        print(f"{names[index]}: {result['final_decision']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""Testing record / replay of LLM responses with stage early exit (the default)"""
+
+import sys
+sys.path.insert(0, '..')
+
+import asyncio
+import os
+import tempfile
+from qualifyai.lead_generator import LeadGenerator
+from qualifyai.llm_client import get_client_manager, use_cassette
+from qualifyai.mock_server import MockLLMServer
+from qualifyai.pipeline import LeadQualifyPipeline
+from qualifyai.stages import Stage1, Stage2, Stage3
+
+
+def outcome(result: dict) -> tuple:
+    """Decision plus every agent's score (None for agents skipped by early exit)."""
+    scores = tuple(agent_result.get("score")
+                   for stage_result in result["stage_results"]
+                   for agent_result in stage_result["agent_results"])
+    return result["final_decision"], result["rejected_at_stage"], scores
+
+
+async def run(cassette: str, mode: str, leads: list) -> list:
+    """Qualify `leads` against the mock API, recording to / replaying from `cassette`."""
+    # Unseeded, spread-out latency: which agents finish before an early exit differs between runs
+    server = MockLLMServer(latency_ms=50, latency_sigma=0.8)
+    base_url = await server.start()
+    manager = get_client_manager()
+    await manager.reload()
+    config = manager.config
+    config["openai_api_key"] = "mock"
+    config["llm"] = {**(config.get("llm") or {}), "base_url": base_url}
+    config["cache"] = {"enabled": False}
+    config["rate_limits"] = {"enabled": False}
+    use_cassette(cassette, mode)
+
+    pipeline = LeadQualifyPipeline([Stage1(), Stage2(), Stage3()], verbose=False)
+    try:
+        results = await pipeline.qualify_many(leads, concurrency=20)
+    finally:
+        await manager.aclose()
+        await server.close()
+    print(f"{mode}: {server.requests} API requests, cassette {manager.cassette.stats()}")
+    return [outcome(result) for result in results]
+
+
+async def main():
+    print("Testing cassette record / replay (early exit on)")
+    leads = list(LeadGenerator(seed=9).generate(80))
+    cassette = os.path.join(tempfile.mkdtemp(), "llm.jsonl.gz")
+
+    recorded = await run(cassette, "record", leads)
+    for attempt in range(3):
+        replayed = await run(cassette, "replay", leads)
+        assert all(decision != "ERROR" for decision, _, _ in replayed), "replay hit a request missing from the cassette"
+        for (decision, stage, scores), (decision_then, stage_then, scores_then) in zip(replayed, recorded):
+            assert (decision, stage) == (decision_then, stage_then), f"replay {attempt + 1} changed a decision"
+            # Which agents an early exit cut short depends on timing; the ones that answered must agree
+            assert all(score == score_then for score, score_then in zip(scores, scores_then)
+                       if score is not None and score_then is not None), f"replay {attempt + 1} changed a score"
+    print("\nReplay matches the recording: OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""Testing the incremental JSON field parser (JSONFieldStream) against json.loads, offline"""
+
+import sys
+sys.path.insert(0, '..')
+
+import json
+import random
+from qualifyai.jsonstream import JSONFieldStream
+
+# Canned strategy-style responses covering the tricky cases
+RESPONSES = {
+    "plain": '{"score": 85, "reasoning": "Strong fit.", "recommendation": "PROCEED"}',
+    "reasoning first": '{"reasoning": "EXECUTIVE SUMMARY\\nClose in Q3.", "score": 72}',
+    "escaped quotes": r'{"reasoning": "CFO said \"not this year\" \\ then \"maybe\"", "score": 64}',
+    "unicode": r'{"reasoning": "Caf\u00e9 \u201cdeal\u201d \ud83d\ude80 and literal “quotes” 🚀", "score": 90}',
+    "score inside a string": '{"reasoning": "The \\"score\\": 99 they quoted is stale; \\"score\\": 12", "score": 55}',
+    "nested objects": '{"details": {"score": 10, "inner": {"score": 5, "text": "} ] {"}}, "score": 77, '
+                      '"tags": ["a", {"score": 1}, "]"], "recommendation": "PROCEED"}',
+    "numbers": '{"score": -12.5e2, "confidence": 0.875, "count": 0, "big": 12345678901234}',
+    "literals": '{"qualified": true, "blocked": false, "owner": null, "score": 70}',
+    "whitespace": '{\n  "score" :\t 81 ,\r\n  "reasoning" : "spaced out"\n}\n',
+    "empty containers": '{"phases": [], "meta": {}, "score": 66, "notes": ""}',
+}
+
+
+def expected_fields(text: str) -> dict:
+    """Top-level scalar fields, which is what JSONFieldStream reports."""
+    return {key: value for key, value in json.loads(text).items() if not isinstance(value, (dict, list))}
+
+
+def random_chunks(text: str, rng: random.Random) -> list:
+    """`text` cut at random points (chunks of 1 to 8 characters)."""
+    chunks = []
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, 8)
+        chunks.append(text[i:i + size])
+        i += size
+    return chunks
+
+
+def parse(chunks: list) -> dict:
+    parser = JSONFieldStream()
+    completed = {}
+    for chunk in chunks:
+        completed.update(parser.feed(chunk))
+    assert completed == parser.fields, "feed() return values disagree with fields"
+    return parser.fields
+
+
+def main():
+    print("Testing JSONFieldStream")
+    rng = random.Random(0)
+    for name, text in RESPONSES.items():
+        expected = expected_fields(text)
+        assert parse([text]) == expected, f"{name}: whole text parsed as {parse([text])}"
+        assert parse(list(text)) == expected, f"{name}: one character at a time parsed as {parse(list(text))}"
+        for _ in range(200):
+            chunks = random_chunks(text, rng)
+            fields = parse(chunks)
+            assert fields == expected, f"{name}: {chunks} parsed as {fields}"
+        print(f"{name:<25} OK  {expected}")
+
+    # The score is reported as soon as its value is complete, before the rest arrives
+    text = RESPONSES["nested objects"]
+    end = text.index('"score": 77') + len('"score": 77,')
+    parser = JSONFieldStream()
+    parser.feed(text[:end - 1])
+    assert "score" not in parser.fields, "score reported before its number was complete"
+    parser.feed(text[end - 1:end])
+    assert parser.fields.get("score") == 77, f"score not available after its delimiter: {parser.fields}"
+    print("\nIncremental parsing matches json.loads: OK")
+
+
+if __name__ == "__main__":
+    main()
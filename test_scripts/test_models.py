@@ -0,0 +1,64 @@
+"""Testing for Lead records and the columnar LeadBatch"""
+
+import sys
+sys.path.insert(0, '..')
+
+import asyncio
+import copy
+import random
+import tracemalloc
+from qualifyai.agents import BudgetAgent, CompetitionAgent, TechnicalFitAgent, RiskAgent, ResourceAgent
+from qualifyai.batch_engine import RuleBatchEngine
+from qualifyai.models import Lead, LeadBatch
+from qualifyai.test_cases import TEST_CASES
+from test_batch_engine import random_lead
+
+
+def measure(build):
+    """Bytes allocated by build() (result kept alive while measuring)."""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+async def main():
+    print("Testing Lead / LeadBatch")
+
+    # Round trip through both formats
+    leads = [case["data"] for case in TEST_CASES.values()]
+    leads.append({"company_name": "Sparse Co", "custom_field": 42})
+    assert [Lead.from_dict(lead).to_dict() for lead in leads] == leads
+    assert LeadBatch.from_dicts(leads).to_dicts() == leads
+    print("\nRound trip: OK")
+
+    # Agents give the same result for dicts and Lead records
+    agents = [BudgetAgent(), CompetitionAgent(), TechnicalFitAgent(), RiskAgent(), ResourceAgent()]
+    for lead in leads:
+        for agent in agents:
+            assert await agent.evaluate(lead) == await agent.evaluate(Lead.from_dict(lead))
+    print("Agents on Lead records: OK")
+
+    # Batch engine on a LeadBatch matches the dict path
+    rng = random.Random(3)
+    sample = [random_lead(rng) for _ in range(2000)]
+    engine = RuleBatchEngine()
+    from_dicts = engine.evaluate(sample)
+    from_batch = engine.evaluate(LeadBatch.from_dicts(sample))
+    assert all((from_dicts[k] == from_batch[k]).all() for k in from_dicts)
+    print("Batch engine on LeadBatch: OK")
+
+    # Memory for 20,000 full leads
+    base = [copy.deepcopy(random.choice(leads[:5])) for _ in range(20000)]
+    _, dict_bytes = measure(lambda: [copy.deepcopy(lead) for lead in base])
+    _, record_bytes = measure(lambda: [Lead.from_dict(lead) for lead in base])
+    _, batch_bytes = measure(lambda: LeadBatch.from_dicts(base))
+    print(f"\nMemory for {len(base):,} leads:")
+    print(f"dicts:     {dict_bytes / 1e6:.1f} MB")
+    print(f"Lead:      {record_bytes / 1e6:.1f} MB")
+    print(f"LeadBatch: {batch_bytes / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
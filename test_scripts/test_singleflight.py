@@ -0,0 +1,98 @@
+"""Testing single-flight coalescing of identical concurrent LLM requests (mock API, offline)"""
+
+import sys
+sys.path.insert(0, '..')
+
+import asyncio
+from qualifyai.llm_client import call_llm, get_client_manager
+from qualifyai.mock_server import MockLLMServer
+
+SYSTEM = "Score the lead. Return JSON with score and reasoning."
+
+
+def ask(prompt: str):
+    return call_llm(prompt, system_prompt=SYSTEM, json_mode=True, agent="Test Agent")
+
+
+async def test_identical(server, manager):
+    """N identical concurrent requests: one provider call, one answer for all."""
+    before = server.requests
+    answers = await asyncio.gather(*[ask("Lead: Acme") for _ in range(20)])
+    assert server.requests - before == 1, f"{server.requests - before} provider calls for 20 identical requests"
+    assert len(set(answers)) == 1
+    print(f"20 identical requests -> {server.requests - before} provider call: OK")
+
+
+async def test_no_cross_wiring(server, manager):
+    """Several keys in flight together: each caller gets its own key's answer."""
+    prompts = [f"Lead: Company {n}" for n in range(5)]
+    before = server.requests
+    answers = await asyncio.gather(*[ask(prompt) for prompt in prompts for _ in range(4)])
+    assert server.requests - before == 5, f"{server.requests - before} provider calls for 5 distinct requests"
+    # The mock answer depends only on the prompt; fetch each one again on its own
+    solo = [await ask(prompt) for prompt in prompts]
+    assert answers == [answer for answer in solo for _ in range(4)], "a caller got another request's answer"
+    print("5 keys x 4 callers -> 5 provider calls, answers matched to their requests: OK")
+
+
+async def test_one_waiter_cancelled(server, manager):
+    """A cancelled waiter leaves the shared call running for the others."""
+    before = server.requests
+    tasks = [asyncio.create_task(ask("Lead: Globex")) for _ in range(5)]
+    await asyncio.sleep(0.05)  # all five are waiting on the one call
+    tasks[0].cancel()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert all(isinstance(result, str) for result in results[1:]), results[1:]
+    assert len(set(results[1:])) == 1
+    assert server.requests - before == 1
+    print("1 of 5 waiters cancelled -> the other 4 still answered by the one call: OK")
+
+
+async def test_all_waiters_cancelled(server, manager):
+    """
+    The shared call is cancelled when its last waiter leaves, and the key is
+    free at once: a request arriving right after starts a fresh call instead
+    of joining the cancelled one (and getting its CancelledError).
+    """
+    single_flight = manager.single_flight
+    tasks = [asyncio.create_task(ask("Lead: Initech")) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    (flight,) = single_flight._flights.values()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert single_flight.in_flight == 0, "cancelled call still registered under its key"
+
+    before = server.requests
+    answer = await ask("Lead: Initech")
+    assert isinstance(answer, str) and server.requests - before == 1
+    assert flight.task.cancelled(), "shared call kept running with no one waiting"
+    print("All 3 waiters cancelled -> shared call cancelled, next request starts a new one: OK")
+
+
+async def main():
+    print("Testing single-flight coalescing")
+    server = MockLLMServer(latency_ms=200, latency_sigma=0.0)
+    base_url = await server.start()
+    manager = get_client_manager()
+    config = manager.config
+    config["openai_api_key"] = "mock"
+    config["llm"] = {**(config.get("llm") or {}), "base_url": base_url, "coalesce_requests": True}
+    config["cache"] = {"enabled": False}  # every non-coalesced request reaches the mock API
+    config["rate_limits"] = {"enabled": False}
+    config["hedging"] = {"enabled": False}
+    try:
+        await test_identical(server, manager)
+        await test_no_cross_wiring(server, manager)
+        await test_one_waiter_cancelled(server, manager)
+        await test_all_waiters_cancelled(server, manager)
+        print(f"\nSingle-flight stats: {manager.single_flight.stats()}")
+    finally:
+        await manager.aclose()
+        await server.close()
+    print("Single-flight coalescing: OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""Testing learned max_tokens caps (TokenBudget) and the retry after a cut-off answer, offline"""
+
+import sys
+sys.path.insert(0, '..')
+
+import asyncio
+import json
+from qualifyai import metrics
+from qualifyai.llm_client import call_llm, get_client_manager
+from qualifyai.mock_server import MockLLMServer
+from qualifyai.token_budget import TokenBudget
+
+
+class RecordingServer(MockLLMServer):
+    """Mock API that records the max_tokens of each request and can give an unusually long answer."""
+
+    def __init__(self):
+        super().__init__(latency_ms=1)
+        self.sent_max_tokens = []
+        self.long_answer = None
+
+    def _content(self, params: dict) -> str:
+        self.sent_max_tokens.append(params["max_tokens"])
+        return self.long_answer or super()._content(params)
+
+
+def test_caps():
+    print("--- TokenBudget caps ---")
+    budget = TokenBudget(percentile=99, headroom=1.25, min_samples=20, window=500, min_tokens=16)
+
+    # Below min_samples the caller's max_tokens is sent unchanged
+    for n in range(19):
+        budget.record("ICP Agent", 1000, 40)
+        assert budget.cap("ICP Agent", 1000) == 1000, f"capped after only {n + 1} samples"
+    assert budget.capped == 0
+
+    # From min_samples on: p99 x headroom
+    budget.record("ICP Agent", 1000, 40)
+    assert budget.cap("ICP Agent", 1000) == 50, budget.cap("ICP Agent", 1000)
+    assert budget.capped == 1
+    # Learned separately per agent and per requested max_tokens
+    assert budget.cap("Budget Agent", 1000) == 1000
+    assert budget.cap("ICP Agent", 500) == 500
+
+    # A long answer in the window raises the cap (p99 of 21 samples is the longest)
+    budget.record("ICP Agent", 1000, 200)
+    assert budget.cap("ICP Agent", 1000) == 250, budget.cap("ICP Agent", 1000)
+
+    # Never below min_tokens, never above what the caller asked for
+    for _ in range(20):
+        budget.record("Decision", 20, 2)
+        budget.record("Verbose", 100, 400)
+    assert budget.cap("Decision", 20) == 16, budget.cap("Decision", 20)
+    assert budget.cap("Verbose", 100) == 100, budget.cap("Verbose", 100)
+    print(f"Caps OK: {json.dumps(budget.stats()['agents'])}")
+
+
+async def test_truncation_retry():
+    print("\n--- Retry after an answer cut off by the learned cap (mock API) ---")
+    server = RecordingServer()
+    base_url = await server.start()
+    manager = get_client_manager()
+    config = manager.config
+    config["openai_api_key"] = "mock"
+    config["llm"] = {**(config.get("llm") or {}), "base_url": base_url}
+    config["cache"] = {"enabled": False}
+    config["rate_limits"] = {"enabled": False}
+    config["hedging"] = {"enabled": False}
+    config["token_budget"] = {"min_samples": 5}
+
+    try:
+        # Short answers: the first min_samples requests go out uncapped
+        for n in range(5):
+            await call_llm(f"Lead {n}", json_mode=True, agent="Test Agent")
+        assert server.sent_max_tokens == [1000] * 5, server.sent_max_tokens
+        cap = manager.token_budget.cap("Test Agent", 1000)
+        assert cap < 1000, "no cap learned after min_samples answers"
+
+        # The next request is sent with the learned cap
+        await call_llm("Lead 5", json_mode=True, agent="Test Agent")
+        assert server.sent_max_tokens[-1] == cap, (server.sent_max_tokens, cap)
+
+        # An answer longer than the cap is cut off, then retried at the full allowance
+        server.long_answer = json.dumps({"score": 80, "reasoning": "x" * (cap * 4 * 3)})
+        truncated_before = metrics.ERRORS.value("truncated")
+        sent_before = len(server.sent_max_tokens)
+        answer = await call_llm("Lead 6", json_mode=True, agent="Test Agent")
+        assert server.sent_max_tokens[sent_before:] == [cap, 1000], server.sent_max_tokens[sent_before:]
+        assert answer == server.long_answer, "retried answer is not the full answer"
+        assert manager.token_budget.retries == 1
+        assert metrics.ERRORS.value("truncated") == truncated_before + 1
+        print(f"Cap {cap} -> cut off -> retried at 1000, full answer ({len(answer)} chars): OK")
+    finally:
+        await manager.aclose()
+        await server.close()
+
+
+async def main():
+    test_caps()
+    await test_truncation_retry()
+    print("\nToken budget: OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())